@@ -0,0 +1,161 @@
+"""Habit analytics over the check-in log.
+
+``complete_habit`` sets one bit in the habit's ``HabitCheckin`` row for the
+month. Reading a user's history is then a single query of a dozen rows per
+habit and year, which ``unpack`` turns into a boolean matrix of habits by
+days with array operations. Streaks, completion rates and heatmaps are all
+computed on that matrix for every habit at once, with no Python loop over
+habits or days.
+
+Days are UTC dates, like ``Habit.last_completed``. A streak stays current
+until the end of the day after its last check-in, so a habit not yet done
+today doesn't show as broken.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import select
+
+import counters
+from models import db, Habit, HabitCheckin
+
+DAY_BITS = np.arange(31, dtype=np.int64)
+
+
+def record_checkin(user_id, habit_id, day):
+    """Mark ``day`` as done, inside the caller's transaction."""
+    counters.set_bits(HabitCheckin, {'user_id': user_id, 'habit_id': habit_id, 'month': day.replace(day=1)},
+                      days=1 << (day.day - 1))
+
+
+def unpack(habit_ids, rows, start, end):
+    """Boolean matrix of ``habit_ids`` (sorted) by the days ``start``..``end``.
+
+    ``rows`` are ``(habit_id, month, days)`` check-in rows; months outside
+    the range are clipped.
+    """
+    n_days = (end - start).days + 1
+    matrix = np.zeros((len(habit_ids), n_days), dtype=bool)
+    if not rows:
+        return matrix
+
+    ids, months, bits = zip(*rows)
+    habit_index = np.searchsorted(habit_ids, ids)
+    offsets = (np.array(months, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+    done = (np.array(bits, dtype=np.int64)[:, None] >> DAY_BITS) & 1 == 1
+    columns = offsets[:, None] + DAY_BITS
+    row, day = np.nonzero(done & (columns >= 0) & (columns < n_days))
+    matrix[habit_index[row], columns[row, day]] = True
+    return matrix
+
+
+def trailing_run(matrix):
+    """Length of the run of check-ins ending on the last day, per habit."""
+    if matrix.shape[1] == 0:
+        return np.zeros(matrix.shape[0], dtype=np.int64)
+    misses = ~matrix[:, ::-1]
+    return np.where(misses.any(axis=1), misses.argmax(axis=1), matrix.shape[1])
+
+
+def current_streaks(matrix):
+    return np.where(matrix[:, -1], trailing_run(matrix), trailing_run(matrix[:, :-1]))
+
+
+def longest_streaks(matrix):
+    padded = np.zeros((matrix.shape[0], matrix.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix
+    edges = np.diff(padded, axis=1)
+    # Runs start at +1 edges and end at -1 edges, in the same row-major order
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    longest = np.zeros(matrix.shape[0], dtype=np.int64)
+    np.maximum.at(longest, rows, ends - starts)
+    return longest
+
+
+def completion_rates(matrix, first_day, window):
+    """Share of the last ``window`` days done, counting days since each habit's ``first_day`` column."""
+    n_days = matrix.shape[1]
+    window = min(window, n_days)
+    active = n_days - np.maximum(first_day, n_days - window)
+    return matrix[:, n_days - window:].sum(axis=1) / np.maximum(active, 1)
+
+
+def rolling_rates(matrix, first_day, window=7):
+    """Trailing ``window``-day completion rate across all habits, for each day."""
+    n_days = matrix.shape[1]
+    done = np.concatenate(([0], np.cumsum(matrix.sum(axis=0))))
+    active = np.concatenate(([0], np.cumsum((first_day[:, None] <= np.arange(n_days)).sum(axis=0))))
+    ends = np.arange(1, n_days + 1)
+    starts = np.maximum(ends - window, 0)
+    return (done[ends] - done[starts]) / np.maximum(active[ends] - active[starts], 1)
+
+
+def load(user_id, today):
+    """``(habits, first_day, matrix, start)`` for all of a user's history up to ``today``.
+
+    ``habits`` are ``(id, name)`` rows in id order and ``first_day`` the
+    matrix column of each habit's creation or first check-in.
+    """
+    habits = db.session.execute(
+        select(Habit.id, Habit.name, Habit.created_at).where(Habit.user_id == user_id).order_by(Habit.id)
+    ).all()
+    rows = db.session.execute(
+        select(HabitCheckin.habit_id, HabitCheckin.month, HabitCheckin.days)
+        .where(HabitCheckin.user_id == user_id, HabitCheckin.month <= today)
+    ).all()
+
+    start = min([today] + [month for _, month, _ in rows]
+                + [created.date() for _, _, created in habits if created is not None])
+    habit_ids = np.array([habit.id for habit in habits], dtype=np.int64)
+    created = np.array([(habit.created_at or datetime.combine(start, datetime.min.time())).date()
+                        for habit in habits], dtype='datetime64[D]')
+    first_day = (created - np.datetime64(start, 'D')).astype(np.int64)
+    matrix = unpack(habit_ids, rows, start, today)
+    # Imported or backfilled check-ins may predate the habit row
+    first_day = np.where(matrix.any(axis=1), np.minimum(first_day, matrix.argmax(axis=1)), first_day)
+    return [(habit.id, habit.name) for habit in habits], first_day, matrix, start
+
+
+def habit_stats(user_id, days=365, per_habit=False, today=None):
+    """Streaks, 7 and 30 day completion rates and a ``days`` long heatmap."""
+    today = today or datetime.utcnow().date()
+    habits, first_day, matrix, _ = load(user_id, today)
+
+    current = current_streaks(matrix)
+    longest = longest_streaks(matrix)
+    weekly = completion_rates(matrix, first_day, 7)
+    monthly = completion_rates(matrix, first_day, 30)
+
+    days = min(days, matrix.shape[1])
+    window = matrix[:, -days:]
+    result = {
+        'start': (today - timedelta(days=days - 1)).isoformat(),
+        'heatmap': window.sum(axis=0).tolist(),
+        'rolling_rate_7d': np.round(rolling_rates(matrix, first_day)[-days:], 4).tolist(),
+        'habits': [{
+            'id': habit_id,
+            'name': name,
+            'current_streak': int(current[i]),
+            'longest_streak': int(longest[i]),
+            'completion_rate_7d': round(float(weekly[i]), 4),
+            'completion_rate_30d': round(float(monthly[i]), 4),
+        } for i, (habit_id, name) in enumerate(habits)],
+    }
+    if per_habit:
+        for entry, row in zip(result['habits'], window.astype(np.int8).tolist()):
+            entry['heatmap'] = row
+    return result
+
+
+def progress(user_id, window=None, today=None):
+    """Habit section of /api/progress: current streaks and completion over ``window`` days."""
+    today = today or datetime.utcnow().date()
+    habits, first_day, matrix, _ = load(user_id, today)
+    current = current_streaks(matrix)
+    rates = completion_rates(matrix, first_day, window or matrix.shape[1])
+    return {
+        'total': len(habits),
+        'active_streaks': int((current > 0).sum()),
+        'average_streak': float(current.mean()) if len(habits) else 0,
+    }, {name: round(float(rate) * 100, 2) for (_, name), rate in zip(habits, rates)}
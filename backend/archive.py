@@ -0,0 +1,161 @@
+"""Cold storage for old pomodoro sessions and completed tasks.
+
+Left alone, the hot tables grow with account age. ``archive`` moves
+pomodoro sessions started and tasks completed before a horizon
+(``ARCHIVE_AFTER_DAYS``, run by ``flask --app app archive``) out of them in
+batches of ``BATCH_SIZE`` rows. Each batch is one transaction that
+
+1. adds the rows' counts to ``archive_rollup`` (per user and day, in the
+   DailyStat columns), so the rollup and leaderboard rebuilds, which only
+   read the hot tables, still count them;
+2. packs the rows into ``archive_segment``: one row per entity, user and
+   month holding every column of the moved rows, column by column, as
+   zlib-compressed JSON;
+3. deletes them from the hot table.
+
+The live counters (DailyStat, LeaderboardEntry) are not touched, so
+/api/progress and the leaderboard report the same totals as before.
+``rows`` reads archived rows back for the exports.
+"""
+import json
+import zlib
+from datetime import datetime
+from itertools import groupby, repeat
+
+from sqlalchemy import DateTime, and_, delete, select
+
+import counters
+from models import db, Task, PomodoroSession, ArchiveSegment, ArchiveRollup
+from serializers import iso
+
+BATCH_SIZE = 5000
+SEGMENT_YIELD_PER = 100
+COUNTERS = ('tasks_created', 'tasks_completed', 'pomodoro_sessions', 'pomodoro_completed', 'pomodoro_minutes')
+
+
+# Counted on the same days as rollups.rebuild() counts the live rows
+def _task_counts(row):
+    return ((row.created_at.date(), {'tasks_created': 1}),
+            (row.completed_at.date(), {'tasks_completed': 1}))
+
+
+def _pomodoro_counts(row):
+    counts = [(row.start_time.date(), {'pomodoro_sessions': 1})]
+    if row.completed:
+        counts.append(((row.end_time or row.start_time).date(),
+                       {'pomodoro_completed': 1, 'pomodoro_minutes': row.duration}))
+    return counts
+
+
+# entity -> (model, rows to archive before a cutoff, column dating a row, rollup counts of a row)
+ENTITIES = {
+    'tasks': (Task, lambda cutoff: and_(Task.completed == True, Task.completed_at < cutoff),
+              'created_at', _task_counts),
+    'pomodoro': (PomodoroSession, lambda cutoff: PomodoroSession.start_time < cutoff,
+                 'start_time', _pomodoro_counts),
+}
+
+
+def _datetime_columns(table):
+    return {column.name for column in table.columns if isinstance(column.type, DateTime)}
+
+
+def encode(table, rows):
+    """Pack ``rows`` of ``table``, every column but user_id, column by column."""
+    stamps = _datetime_columns(table)
+    columns = {}
+    for name in table.columns.keys():
+        if name != 'user_id':
+            values = [getattr(row, name) for row in rows]
+            columns[name] = [iso(value) for value in values] if name in stamps else values
+    return zlib.compress(json.dumps(columns, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def decode(table, data):
+    """A segment's ``{column: values}``, with datetimes parsed back."""
+    columns = json.loads(zlib.decompress(data))
+    for name in _datetime_columns(table) & columns.keys():
+        columns[name] = [datetime.fromisoformat(value) if value is not None else None
+                         for value in columns[name]]
+    return columns
+
+
+def _archive_batch(entity, cutoff, after_id, batch_size):
+    model, eligible, dated_by, counts = ENTITIES[entity]
+    table = model.__table__
+    # Keyset over the id so rows kept in the hot table are not scanned again
+    rows = db.session.execute(
+        select(table).where(eligible(cutoff), table.c.id > after_id).order_by(table.c.id).limit(batch_size)
+    ).all()
+    if not rows:
+        return rows
+
+    totals = {}
+    for row in rows:
+        for day, values in counts(row):
+            total = totals.setdefault((row.user_id, day), dict.fromkeys(COUNTERS, 0))
+            for name, value in values.items():
+                total[name] += value or 0
+    counters.increment_many(ArchiveRollup, ('user_id', 'day'), [
+        dict(values, user_id=user_id, day=day) for (user_id, day), values in totals.items()])
+
+    def segment_key(row):
+        return row.user_id, getattr(row, dated_by).date().replace(day=1)
+
+    now = datetime.utcnow()
+    segments = []
+    for (user_id, month), group in groupby(sorted(rows, key=segment_key), key=segment_key):
+        group = list(group)
+        segments.append({'entity': entity, 'user_id': user_id, 'month': month, 'row_count': len(group),
+                         'data': encode(table, group), 'created_at': now})
+    db.session.execute(ArchiveSegment.__table__.insert(), segments)
+
+    db.session.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+    db.session.commit()
+    return rows
+
+
+def archive(older_than, batch_size=BATCH_SIZE, now=None):
+    """Archive rows older than ``older_than``.
+
+    Returns ``({entity: rows moved}, ids of the users they belonged to)``.
+    """
+    cutoff = (now or datetime.utcnow()) - older_than
+    moved, user_ids = {}, set()
+    for entity in ENTITIES:
+        moved[entity], after_id = 0, 0
+        while True:
+            rows = _archive_batch(entity, cutoff, after_id, batch_size)
+            if not rows:
+                break
+            moved[entity] += len(rows)
+            user_ids.update(row.user_id for row in rows)
+            after_id = rows[-1].id
+    return moved, user_ids
+
+
+def rows(conn, entity, names, key, user_id=None, user_range=None):
+    """Archived rows of ``entity`` as tuples of the columns ``names``.
+
+    For one user or a range of user ids, like ``export.select_rows``, and
+    sorted by ``key`` within each user and month. Segments are decoded one
+    user and month at a time, so memory stays bounded by that.
+    """
+    table = ENTITIES[entity][0].__table__
+    stmt = select(ArchiveSegment.user_id, ArchiveSegment.month, ArchiveSegment.data)\
+        .where(ArchiveSegment.entity == entity)
+    if user_id is not None:
+        stmt = stmt.where(ArchiveSegment.user_id == user_id)
+    else:
+        stmt = stmt.where(ArchiveSegment.user_id.between(*user_range))
+    stmt = stmt.order_by(ArchiveSegment.user_id, ArchiveSegment.month, ArchiveSegment.id)\
+        .execution_options(yield_per=SEGMENT_YIELD_PER)
+
+    for (owner, _), segments in groupby(conn.execute(stmt), key=lambda segment: segment[:2]):
+        month = []
+        for segment in segments:
+            columns = decode(table, segment.data)
+            columns['user_id'] = repeat(owner)
+            month.extend(zip(*[columns[name] for name in names]))
+        month.sort(key=key)
+        yield from month
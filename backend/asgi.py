@@ -0,0 +1,175 @@
+"""ASGI application for the async serving mode.
+
+The polling endpoints (leaderboard and pomodoro history) are served by
+native coroutines on the async engine, so an idle connection waiting on the
+database holds no thread. Every other route is handed to the Flask app
+through asgiref's WSGI adapter and behaves exactly as in sync mode; those
+requests run on a pool of ``WEB_THREADS`` threads (default 8), like a
+gthread worker's.
+``GET /api/events`` is the server-sent events stream (see sse.py).
+
+Run it with ``SERVER_MODE=async python serve.py``.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask_jwt_extended import decode_token
+from jwt import ExpiredSignatureError, PyJWTError
+from sqlalchemy import select
+
+import async_db
+import db_config
+import leaderboard
+import serializers
+import sse
+from app import create_app
+from models import PomodoroSession
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """asgiref's WSGI adapter, calling the app on a pool of ``threads``.
+
+    WsgiToAsgi runs the app through ``sync_to_async`` with the default
+    ``thread_sensitive=True``, so every request of the process would share
+    one thread and run one at a time.
+    """
+
+    def __init__(self, wsgi_application, threads):
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope, receive, send):
+        await _PooledInstance(self.wsgi_application, self.duplicate_header_limit, self.executor)(
+            scope, receive, send)
+
+
+class _PooledInstance(WsgiToAsgiInstance):
+    def __init__(self, wsgi_application, duplicate_header_limit, executor):
+        super().__init__(wsgi_application, duplicate_header_limit)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        # The undecorated method (attribute access would bind the wrapper)
+        run = partial(WsgiToAsgiInstance.__dict__['run_wsgi_app'].func, self)
+        await sync_to_async(run, thread_sensitive=False, executor=self.executor)(body)
+
+
+flask_app = create_app(migrations=False)
+wsgi_fallback = PooledWsgiToAsgi(flask_app, int(os.getenv('WEB_THREADS', 8)))
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def send_json(send, payload, status=200):
+    body = serializers.dumps(payload)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def current_user_id(scope, token=None):
+    """User id from the Bearer token, or from ``token`` when given."""
+    if token is None:
+        headers = dict(scope['headers'])
+        auth = headers.get(b'authorization', b'').decode('latin-1')
+        if not auth.startswith('Bearer '):
+            raise HTTPError(401, 'Missing Authorization Header')
+        token = auth[len('Bearer '):]
+    try:
+        with flask_app.app_context():
+            return decode_token(token)['sub']
+    except ExpiredSignatureError:
+        raise HTTPError(401, 'Token has expired')
+    except PyJWTError as e:
+        raise HTTPError(422, str(e))
+
+
+async def get_leaderboard(user_id, args):
+    period, limit = leaderboard.normalize(args.get('timeframe', 'weekly'), int(args.get('limit', 10)))
+    bucket = leaderboard.bucket_for(period)
+
+    async with async_db.session() as session:
+        top = (await session.execute(leaderboard.select_top(period, bucket, limit))).all()
+        result = {
+            'timeframe': period,
+            'leaderboard': [leaderboard.entry_dict(*row) for row in top],
+        }
+        me = (await session.execute(leaderboard.select_user_entry(user_id, period, bucket))).first()
+        if me is not None:
+            ahead = (await session.execute(leaderboard.select_ahead(period, bucket, me[3], me[4]))).scalar()
+            result['me'] = leaderboard.entry_dict(*me, rank=ahead + 1)
+    return result
+
+
+async def get_pomodoro(user_id, args):
+    async with async_db.session() as session:
+        sessions = (await session.execute(
+            select(*serializers.POMODORO.columns())
+            .where(PomodoroSession.user_id == user_id)
+            .order_by(PomodoroSession.start_time.desc())
+            .limit(10)
+        )).all()
+    return {'sessions': serializers.POMODORO.rows(sessions)}
+
+
+ASYNC_ROUTES = {
+    ('GET', '/api/leaderboard'): get_leaderboard,
+    ('GET', '/api/pomodoro'): get_pomodoro,
+}
+EVENTS_ROUTE = ('GET', '/api/events')
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            url = flask_app.config['SQLALCHEMY_DATABASE_URI']
+            async_db.init_engine(url, **db_config.engine_options(url, async_engine=True))
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await sse.watcher.stop()
+            await async_db.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    route = (scope.get('method'), scope.get('path'))
+    handler = ASYNC_ROUTES.get(route)
+    if handler is None and route != EVENTS_ROUTE:
+        return await wsgi_fallback(scope, receive, send)
+
+    args = {k: v[-1] for k, v in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+    if handler is None:
+        # EventSource can't set headers, so the token may come in the query string
+        try:
+            user_id = current_user_id(scope, args.get('access_token'))
+        except HTTPError as e:
+            return await send_json(send, {'msg': str(e)}, status=e.status)
+        return await sse.stream(receive, send, user_id)
+
+    try:
+        payload = await handler(current_user_id(scope), args)
+    except HTTPError as e:
+        return await send_json(send, {'msg': str(e)}, status=e.status)
+    except ValueError:
+        return await send_json(send, {'error': 'Invalid query parameter'}, status=400)
+    await send_json(send, payload)
@@ -0,0 +1,44 @@
+"""Async SQLAlchemy engine for the ASGI serving mode.
+
+The engine is built from the same SQLALCHEMY_DATABASE_URI as the Flask app,
+swapping in the async driver for the dialect (aiosqlite for SQLite, asyncpg
+for PostgreSQL). The models and statements are shared with the sync app.
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+_engine = None
+_sessionmaker = None
+
+
+def async_url(url):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend}')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def init_engine(url, **options):
+    global _engine, _sessionmaker
+    _engine = create_async_engine(async_url(url), **options)
+    _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+def session():
+    if _sessionmaker is None:
+        raise RuntimeError('Async engine is not initialized')
+    return _sessionmaker()
+
+
+async def dispose():
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = _sessionmaker = None
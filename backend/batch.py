@@ -0,0 +1,171 @@
+"""Batched task operations for /api/tasks/batch.
+
+Every operation is validated and applied to in-memory state first; the
+resulting inserts, updates and deletes are then flushed together (the ORM
+groups them into multi-row statements) and committed once. Coins and
+counters from the whole batch go out as one deferred event (see effects.py).
+
+Modes:
+
+* ``atomic``      - any invalid operation rejects the whole batch.
+* ``best_effort`` - invalid operations are reported and skipped.
+"""
+from datetime import datetime
+
+import effects
+from models import db, Task
+
+MAX_BATCH_SIZE = 500
+MODES = ('atomic', 'best_effort')
+UPDATABLE_FIELDS = ('title', 'description', 'coins_reward', 'priority', 'category')
+
+
+class BatchError(ValueError):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_due_date(data):
+    try:
+        return datetime.fromisoformat(data['due_date']) if data.get('due_date') else None
+    except (TypeError, ValueError):
+        raise BatchError('Invalid due_date')
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _optional_text(value):
+    return value is None or isinstance(value, str)
+
+
+# field -> (check, error); all of a task's fields are checked before any is set
+FIELD_CHECKS = {
+    'title': (lambda v: isinstance(v, str) and v.strip() and len(v) <= 200,
+              'title must be a non-empty string of at most 200 characters'),
+    'description': (_optional_text, 'description must be a string'),
+    'coins_reward': (_is_int, 'coins_reward must be an integer'),
+    'priority': (lambda v: isinstance(v, str) and len(v) <= 20, 'priority must be a string of at most 20 characters'),
+    'category': (lambda v: _optional_text(v) and (v is None or len(v) <= 50),
+                 'category must be a string of at most 50 characters'),
+}
+
+
+def _validated(data):
+    """The task fields of ``data``, checked; raises BatchError."""
+    if not isinstance(data, dict):
+        raise BatchError('data must be an object')
+    for field, (check, error) in FIELD_CHECKS.items():
+        if field in data and not check(data[field]):
+            raise BatchError(error)
+    fields = {field: data[field] for field in UPDATABLE_FIELDS if field in data}
+    if 'due_date' in data:
+        fields['due_date'] = _parse_due_date(data)
+    return fields
+
+
+def _create(user_id, data):
+    fields = _validated(data)
+    if 'title' not in fields:
+        raise BatchError('title is required')
+    return Task(
+        user_id=user_id,
+        title=fields['title'],
+        description=fields.get('description'),
+        coins_reward=fields.get('coins_reward', 10),
+        due_date=fields.get('due_date'),
+        priority=fields.get('priority', 'medium'),
+        category=fields.get('category')
+    )
+
+
+def _lookup(tasks, op):
+    if not _is_int(op.get('id')):
+        raise BatchError('id must be an integer')
+    task = tasks.get(op['id'])
+    if task is None:
+        raise BatchError('Task not found', status=404)
+    return task
+
+
+def apply(user_id, operations, mode='atomic'):
+    """Apply ``operations`` for ``user_id``.
+
+    Returns ``(results, coins_earned, applied)``. In atomic mode nothing is
+    written unless every operation is valid.
+    """
+    if mode not in MODES:
+        raise BatchError(f'mode must be one of: {", ".join(MODES)}')
+    if not isinstance(operations, list) or not operations:
+        raise BatchError('operations must be a non-empty list')
+    if len(operations) > MAX_BATCH_SIZE:
+        raise BatchError(f'At most {MAX_BATCH_SIZE} operations per batch')
+
+    # One query for every task the batch refers to
+    ids = {op['id'] for op in operations if isinstance(op, dict) and _is_int(op.get('id'))}
+    tasks = {task.id: task for task in Task.query.filter(Task.user_id == user_id, Task.id.in_(ids))} if ids else {}
+    deleted = set()
+
+    now = datetime.utcnow()
+    results = []
+    created = []
+    coins_earned = 0
+    completed = 0
+
+    for index, op in enumerate(operations):
+        kind = op.get('op') if isinstance(op, dict) else None
+        result = {'index': index, 'op': kind}
+        try:
+            data = op.get('data') if isinstance(op, dict) else None
+            data = {} if data is None else data
+            if kind == 'create':
+                task = _create(user_id, data)
+                created.append((result, task))
+                result['status'] = 201
+            elif kind == 'update':
+                task = _lookup(tasks, op)
+                for field, value in _validated(data).items():
+                    setattr(task, field, value)
+                result.update(id=task.id, status=200)
+            elif kind == 'complete':
+                task = _lookup(tasks, op)
+                if task.completed:
+                    raise BatchError('Task already completed')
+                task.completed = True
+                task.completed_at = now
+                coins_earned += task.coins_reward or 0
+                completed += 1
+                result.update(id=task.id, status=200, coins_earned=task.coins_reward)
+            elif kind == 'delete':
+                task = tasks.pop(_lookup(tasks, op).id)
+                deleted.add(task)
+                result.update(id=task.id, status=200)
+            else:
+                raise BatchError('op must be one of: create, update, complete, delete')
+        except BatchError as e:
+            result.update(status=e.status, error=str(e))
+        results.append(result)
+
+    failed = [r for r in results if 'error' in r]
+    if failed and mode == 'atomic':
+        # Nothing has been flushed yet, so dropping the pending state is enough
+        db.session.rollback()
+        for result in results:
+            if 'error' not in result:
+                result.pop('coins_earned', None)
+                result.update(status=424, error='Not applied')
+        return results, 0, 0
+
+    db.session.add_all(task for _, task in created)
+    for task in deleted:
+        db.session.delete(task)
+    if created or completed:
+        effects.task_batch(user_id, len(created), completed, coins_earned, at=now)
+    db.session.flush()
+
+    for result, task in created:
+        result['id'] = task.id
+
+    return results, coins_earned, len(results) - len(failed)
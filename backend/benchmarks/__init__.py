@@ -0,0 +1 @@
+"""Benchmarks, load tests and synthetic data. Run modules from backend/ with ``python -m benchmarks.<name>``."""
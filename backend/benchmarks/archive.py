@@ -0,0 +1,144 @@
+"""Archiving old history: hot table size, archive size and read-through cost.
+
+Generates a database with ``benchmarks.datagen`` (up to two years of
+history per user), then archives pomodoro sessions and completed tasks
+older than ``--days``. Reports the hot tables' rows and on-disk size
+(tables plus indexes, after VACUUM) before and after, the archive
+throughput, how small the compressed segments are next to the same rows as
+plain JSON, and the time of the rollup and leaderboard rebuilds and of the
+heaviest user's export before and after, where the export reads through to
+the archive.
+
+    cd backend
+    python -m benchmarks.archive --users 2000 --days 180 --output archive.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import zlib
+from datetime import timedelta
+
+from sqlalchemy import create_engine, func, select, text
+
+from benchmarks import datagen
+from benchmarks.stats import summarize
+
+
+def table_sizes(db, models):
+    """Rows and bytes (table and its indexes) of each model's table."""
+    db.session.commit()
+    with db.engine.connect() as conn:
+        conn.execution_options(isolation_level='AUTOCOMMIT').exec_driver_sql('VACUUM')
+    sizes = {}
+    for model in models:
+        name = model.__tablename__
+        pages = db.session.execute(text(
+            'SELECT SUM(pgsize) FROM dbstat JOIN sqlite_master ON sqlite_master.name = dbstat.name '
+            'WHERE sqlite_master.tbl_name = :name'), {'name': name}).scalar()
+        sizes[name] = {'rows': db.session.query(func.count()).select_from(model).scalar(), 'bytes': pages or 0}
+    return sizes
+
+
+def measure(app, repeat, user_id):
+    import export
+    import leaderboard
+    import rollups
+    from models import db
+
+    results = {}
+    with app.app_context():
+        for name, work in (('rebuild_rollups', rollups.rebuild), ('rebuild_leaderboard', leaderboard.rebuild)):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                work()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = summarize(timings)
+
+        timings, size = [], 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size = sum(len(chunk) for chunk in export.stream(db.session, tuple(export.ENTITIES), 'ndjson',
+                                                             user_id=user_id))
+            timings.append((time.perf_counter() - started) * 1000)
+        results['export_heaviest_user'] = dict(summarize(timings), bytes=size)
+        db.session.remove()
+    return results
+
+
+def run(users, days, batch_size, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'archive.db')}"
+        engine = create_engine(url)
+        datagen.generate(engine, users)
+        engine.dispose()
+        app = datagen.load_app(url)
+        datagen.rebuild_materialized(app)
+
+        import archive
+        from models import db, Task, PomodoroSession, ArchiveSegment
+
+        with app.app_context():
+            heaviest = db.session.execute(
+                select(Task.user_id).group_by(Task.user_id).order_by(func.count(Task.id).desc()).limit(1)
+            ).scalar()
+            before = table_sizes(db, (Task, PomodoroSession, ArchiveSegment))
+        timings_before = measure(app, repeat, heaviest)
+
+        with app.app_context():
+            started = time.perf_counter()
+            moved, _ = archive.archive(timedelta(days=days), batch_size)
+            elapsed = time.perf_counter() - started
+            after = table_sizes(db, (Task, PomodoroSession, ArchiveSegment))
+            stored = plain = segments = 0
+            for (data,) in db.session.execute(select(ArchiveSegment.data)):
+                segments += 1
+                stored += len(data)
+                plain += len(zlib.decompress(data))
+            db.session.remove()
+        timings_after = measure(app, repeat, heaviest)
+
+    return {
+        'users': users,
+        'days': days,
+        'tables': {'before': before, 'after': after},
+        'archived': moved,
+        'archive_seconds': round(elapsed, 3),
+        'rows_per_second': round(sum(moved.values()) / elapsed) if elapsed else None,
+        'segments': segments,
+        'segment_bytes': stored,
+        'uncompressed_bytes': plain,
+        'timings': {'before': timings_before, 'after': timings_after},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=180, help='archive rows older than this many days')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = run(args.users, args.days, args.batch_size, args.repeat)
+    for table, before in report['tables']['before'].items():
+        after = report['tables']['after'][table]
+        print(f"{table:<18} {before['rows']:>8} rows {before['bytes']:>10} bytes -> "
+              f"{after['rows']:>8} rows {after['bytes']:>10} bytes")
+    print(f"Archived {sum(report['archived'].values())} rows in {report['archive_seconds']}s "
+          f"({report['rows_per_second']} rows/s) into {report['segments']} segments, "
+          f"{report['segment_bytes']} bytes ({report['uncompressed_bytes']} uncompressed)")
+    for name, before in report['timings']['before'].items():
+        after = report['timings']['after'][name]
+        print(f"  {name:<22} p50 {before['p50_ms']:>9} ms -> {after['p50_ms']:>9} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""First-screen latency: five separate requests against one /api/dashboard.
+
+For a sample of seeded users, times through the test client
+
+* ``separate``         - /api/user/profile, /api/tasks?limit=20, /api/habits,
+                         /api/pomodoro and /api/progress one after another;
+* ``dashboard_serial`` - /api/dashboard with its sections computed one after
+                         another on the request thread (``DASHBOARD_WORKERS=0``);
+* ``dashboard``        - /api/dashboard with the sections run concurrently.
+
+SQLite answers in microseconds from the page cache, so ``--latency-ms``
+adds a sleep before every statement to stand in for the round trip to a
+database server (the sleep, like a socket read, releases the GIL). The
+response cache is off.
+
+    cd backend
+    python -m benchmarks.dashboard --users 2000 --latency-ms 0,1,3 --output dashboard.json
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+
+from benchmarks import datagen
+from benchmarks.endpoints import auth_headers
+from benchmarks.stats import summarize
+
+SEPARATE = ('/api/user/profile', '/api/tasks?limit=20', '/api/habits', '/api/pomodoro', '/api/progress')
+
+
+def timed(client, paths, headers):
+    start = time.perf_counter()
+    for path in paths:
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, (path, response.status_code)
+    return (time.perf_counter() - start) * 1000
+
+
+def run(app, users, iterations, latency_ms, warmup=10, seed=7):
+    from dashboard import loader
+    from models import db
+
+    rng = random.Random(seed)
+    sample = [rng.randint(1, users) for _ in range(iterations)]
+    headers = auth_headers(app, set(sample))
+    client = app.test_client()
+
+    def round_trip(*_):
+        time.sleep(latency_ms / 1000)
+
+    with app.app_context():
+        engine = db.engine
+    if latency_ms:
+        event.listen(engine, 'before_cursor_execute', round_trip)
+    executor = loader._executor
+    results = {}
+    try:
+        for name, paths, concurrent in (('separate', SEPARATE, True),
+                                        ('dashboard_serial', ('/api/dashboard',), False),
+                                        ('dashboard', ('/api/dashboard',), True)):
+            loader._executor = executor if concurrent else None
+            for user_id in sample[:warmup]:
+                timed(client, paths, headers[user_id])
+            results[name] = summarize([timed(client, paths, headers[user_id]) for user_id in sample])
+    finally:
+        loader._executor = executor
+        if latency_ms:
+            event.remove(engine, 'before_cursor_execute', round_trip)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--latency-ms', default='0,1,3', help='comma-separated simulated per-statement latencies')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = 'sqlite:///' + os.path.join(tmp, 'dashboard.db')
+        engine = create_engine(url)
+        datagen.generate(engine, args.users)
+        engine.dispose()
+        app = datagen.load_app(url)
+        datagen.rebuild_materialized(app)
+
+        from cache import response_cache
+        response_cache.backend = None
+
+        results = {latency: run(app, args.users, args.iterations, float(latency))
+                   for latency in args.latency_ms.split(',') if latency}
+
+    print(f"{'latency':<10}{'scenario':<18}{'p50 ms':>10}{'p95 ms':>10}")
+    for latency, scenarios in results.items():
+        for name, summary in scenarios.items():
+            print(f"{latency + ' ms':<10}{name:<18}{summary['p50_ms']:>10}{summary['p95_ms']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'users': args.users, 'iterations': args.iterations, 'latency_ms': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Seeded synthetic data generator.
+
+Builds N users with heavy-tailed activity: most users have a handful of
+tasks, habits and pomodoro sessions, a few power users have hundreds.
+Every user's password is ``password``. The same seed always produces the
+same data, so runs against different code are comparable.
+
+    cd backend
+    python -m benchmarks.datagen --users 10000 --database-url sqlite:////tmp/bench.db
+
+Works against SQLite or a local PostgreSQL database; the schema is created
+from the models and the materialized tables (leaderboard, daily rollups,
+ledger snapshots) are rebuilt afterwards through the app.
+"""
+import argparse
+import random
+from datetime import datetime, time as dt_time, timedelta
+
+import bcrypt
+from sqlalchemy import create_engine
+
+import search  # creates the task search index along with the task table
+from models import db, User, Task, Habit, Reward, PomodoroSession
+
+CHUNK = 20000
+PASSWORD = 'password'
+CATEGORIES = ('work', 'home', 'study', 'health', None)
+PRIORITIES = ('low', 'medium', 'high')
+
+
+def _activity(rng):
+    # Pareto-distributed activity multiplier, capped so one user stays bounded
+    return min(rng.paretovariate(1.6), 60.0)
+
+
+def generate(engine, users, seed=42, now=None):
+    """Insert ``users`` users and their history; returns row counts per table."""
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+    password = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(4))
+    db.metadata.create_all(engine)
+
+    buffers = {table: [] for table in (User.__table__, Task.__table__, Habit.__table__,
+                                       PomodoroSession.__table__, Reward.__table__)}
+    counts = {table.name: 0 for table in buffers}
+
+    def flush(table, force=False):
+        rows = buffers[table]
+        if rows and (force or len(rows) >= CHUNK):
+            with engine.begin() as conn:
+                conn.execute(table.insert(), rows)
+            counts[table.name] += len(rows)
+            rows.clear()
+
+    buffers[Reward.__table__].extend({
+        'user_id': None, 'name': f'System reward {i}', 'description': 'Built-in reward',
+        'coins_cost': 50 * (i + 1), 'is_premium': i % 4 == 0, 'created_at': now - timedelta(days=800)
+    } for i in range(20))
+
+    for user_id in range(1, users + 1):
+        activity = _activity(rng)
+        is_premium = rng.random() < 0.1
+        created = now - timedelta(days=rng.randint(1, 720))
+        age_minutes = int((now - created).total_seconds() // 60)
+
+        buffers[User.__table__].append({
+            'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+            'password': password, 'coins': 0, 'is_premium': is_premium, 'created_at': created})
+
+        for _ in range(int(activity * 6)):
+            task_created = created + timedelta(minutes=rng.randint(0, age_minutes))
+            completed = rng.random() < 0.65
+            buffers[Task.__table__].append({
+                'user_id': user_id, 'title': f'Task {rng.randint(1, 10 ** 6)}',
+                'description': 'Lorem ipsum dolor sit amet ' * rng.randint(0, 8) or None,
+                'completed': completed, 'coins_reward': rng.choice((5, 10, 10, 20, 50)),
+                'due_date': created + timedelta(days=rng.randint(0, 760)) if rng.random() < 0.5 else None,
+                'priority': rng.choice(PRIORITIES), 'category': rng.choice(CATEGORIES),
+                'created_at': task_created,
+                'completed_at': min(task_created + timedelta(days=rng.expovariate(1 / 3)), now) if completed else None})
+
+        for _ in range(min(int(activity * 1.5), 50)):
+            streak = rng.randint(0, 90)
+            buffers[Habit.__table__].append({
+                'user_id': user_id, 'name': rng.choice(('Read', 'Exercise', 'Meditate', 'Journal', 'Walk')),
+                'description': None, 'streak': streak, 'target_days': rng.choice((7, 30, 66)),
+                'reminder_time': dt_time(rng.randint(5, 22), rng.choice((0, 15, 30, 45))) if rng.random() < 0.7 else None,
+                'last_completed': now - timedelta(hours=rng.randint(0, 72)) if streak else None,
+                'created_at': created, 'updated_at': created})
+
+        for _ in range(int(activity * 4)):
+            start = created + timedelta(minutes=rng.randint(0, age_minutes))
+            duration = rng.choice((25, 25, 25, 50, 15))
+            completed = rng.random() < 0.8
+            buffers[PomodoroSession.__table__].append({
+                'user_id': user_id, 'start_time': start, 'duration': duration,
+                'end_time': start + timedelta(minutes=duration) if completed else None,
+                'completed': completed})
+
+        if is_premium:
+            for i in range(rng.randint(1, 5)):
+                buffers[Reward.__table__].append({
+                    'user_id': user_id, 'name': f'Custom reward {i}', 'description': None,
+                    'coins_cost': rng.randint(20, 500), 'is_premium': False, 'created_at': created})
+
+        for table in buffers:
+            flush(table)
+
+    for table in buffers:
+        flush(table, force=True)
+    return counts
+
+
+def rebuild_materialized(app):
+    """Fill the counters the routes read from, as a fresh deployment would."""
+    import leaderboard
+    import ledger
+    import rollups
+
+    with app.app_context():
+        # Coins as if every completed task had been credited
+        db.session.execute(db.text(
+            'UPDATE "user" SET coins = (SELECT COALESCE(SUM(coins_reward), 0) FROM task '
+            'WHERE task.user_id = "user".id AND task.completed = :done)'), {'done': True})
+        db.session.commit()
+        leaderboard.rebuild()
+        rollups.rebuild()
+        ledger.open_balances()
+
+
+def load_app(database_url):
+    """Create the Flask app bound to ``database_url``."""
+    from app import create_app
+    return create_app({'SQLALCHEMY_DATABASE_URI': database_url}, migrations=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', required=True, help='empty SQLite or PostgreSQL database')
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    counts = generate(engine, args.users, seed=args.seed)
+    engine.dispose()
+    rebuild_materialized(load_app(args.database_url))
+    print(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
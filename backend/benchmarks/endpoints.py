@@ -0,0 +1,111 @@
+"""Per-endpoint microbenchmarks through the Flask test client.
+
+Each read endpoint the React pages call is requested for a sample of
+seeded users, in process, so the numbers are route + ORM + serialization
+cost without network or server overhead. The response cache is off unless
+``--with-cache`` is given.
+
+    cd backend
+    python -m benchmarks.endpoints --users 5000 --iterations 300 --output endpoints.json
+    python -m benchmarks.endpoints --database-url sqlite:////tmp/bench.db
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from benchmarks import datagen
+from benchmarks.stats import summarize
+
+ENDPOINTS = (
+    ('tasks', '/api/tasks'),
+    ('tasks_open', '/api/tasks?completed=false&limit=50'),
+    ('habits', '/api/habits'),
+    ('pomodoro', '/api/pomodoro'),
+    ('rewards', '/api/rewards'),
+    ('profile', '/api/user/profile'),
+    ('progress_weekly', '/api/progress?timeframe=weekly'),
+    ('progress_all_time', '/api/progress?timeframe=all-time'),
+    ('leaderboard_weekly', '/api/leaderboard?timeframe=weekly'),
+    ('leaderboard_all_time', '/api/leaderboard?timeframe=all-time'),
+)
+
+
+def auth_headers(app, user_ids):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        return {user_id: {'Authorization': 'Bearer ' + create_access_token(identity=user_id)}
+                for user_id in user_ids}
+
+
+def run(app, users, iterations, warmup=10, seed=7):
+    rng = random.Random(seed)
+    sample = [rng.randint(1, users) for _ in range(iterations)]
+    headers = auth_headers(app, set(sample))
+    client = app.test_client()
+
+    results = {}
+    for name, path in ENDPOINTS:
+        for user_id in sample[:warmup]:
+            client.get(path, headers=headers[user_id])
+
+        timings, errors, payload_bytes = [], 0, 0
+        for user_id in sample:
+            start = time.perf_counter()
+            response = client.get(path, headers=headers[user_id])
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+            payload_bytes += len(response.data)
+
+        results[name] = dict(summarize(timings), errors=errors,
+                             avg_bytes=payload_bytes // len(sample),
+                             requests_per_sec=round(len(timings) / (sum(timings) / 1000), 1))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='already seeded database (default: seed a temporary SQLite file)')
+    parser.add_argument('--users', type=int, default=5000, help='users to seed, or the seeded user count')
+    parser.add_argument('--iterations', type=int, default=300, help='requests per endpoint')
+    parser.add_argument('--with-cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url
+        if url is None:
+            url = 'sqlite:///' + os.path.join(tmp, 'endpoints.db')
+            engine = create_engine(url)
+            datagen.generate(engine, args.users)
+            engine.dispose()
+            app = datagen.load_app(url)
+            datagen.rebuild_materialized(app)
+        else:
+            app = datagen.load_app(url)
+
+        if not args.with_cache:
+            from cache import response_cache
+            response_cache.backend = None
+
+        results = run(app, args.users, args.iterations)
+
+    report = {'users': args.users, 'iterations': args.iterations, 'cache': args.with_cache, 'endpoints': results}
+    print(f"{'endpoint':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'bytes':>10}")
+    for name, result in results.items():
+        print(f"{name:<22}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+              f"{result['requests_per_sec']:>10}{result['avg_bytes']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
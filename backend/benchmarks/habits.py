@@ -0,0 +1,119 @@
+"""Habit analytics time for one user's check-in history.
+
+Builds synthetic ``HabitCheckin`` rows (one bitmap per habit and month) and
+times what ``analytics.habit_stats`` does after its query: unpacking the
+bitmaps, current and longest streaks, 7 and 30 day completion rates, the
+rolling rate and a yearly heatmap. The same numbers computed with a Python
+loop over habits and days are timed for comparison.
+
+    cd backend
+    python -m benchmarks.habits --habits 50 --years 1 --output habits.json
+"""
+import argparse
+import calendar
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+import analytics
+
+
+def checkin_rows(habits, days, today, density, seed=11):
+    rng = random.Random(seed)
+    start = today - timedelta(days=days - 1)
+    bitmaps = {}
+    for habit_id in range(1, habits + 1):
+        day = start
+        while day <= today:
+            if rng.random() < density:
+                key = (habit_id, day.replace(day=1))
+                bitmaps[key] = bitmaps.get(key, 0) | 1 << (day.day - 1)
+            day += timedelta(days=1)
+    return [(habit_id, month, bits) for (habit_id, month), bits in bitmaps.items()], start
+
+
+def vectorized(habit_ids, rows, start, today):
+    matrix = analytics.unpack(habit_ids, rows, start, today)
+    first_day = np.zeros(len(habit_ids), dtype=np.int64)
+    return (analytics.current_streaks(matrix), analytics.longest_streaks(matrix),
+            analytics.completion_rates(matrix, first_day, 7), analytics.completion_rates(matrix, first_day, 30),
+            analytics.rolling_rates(matrix, first_day), matrix[:, -365:].sum(axis=0))
+
+
+def python_loops(habit_ids, rows, start, today):
+    done = set()
+    for habit_id, month, bits in rows:
+        for day in range(calendar.monthrange(month.year, month.month)[1]):
+            if bits >> day & 1:
+                done.add((habit_id, month + timedelta(days=day)))
+    n_days = (today - start).days + 1
+    days = [start + timedelta(days=i) for i in range(n_days)]
+
+    current, longest, weekly, monthly = [], [], [], []
+    for habit_id in habit_ids:
+        run = best = 0
+        for day in days:
+            run = run + 1 if (habit_id, day) in done else 0
+            best = max(best, run)
+        streak = 0
+        day = today if (habit_id, today) in done else today - timedelta(days=1)
+        while (habit_id, day) in done:
+            streak += 1
+            day -= timedelta(days=1)
+        current.append(streak)
+        longest.append(best)
+        weekly.append(sum((habit_id, d) in done for d in days[-7:]) / 7)
+        monthly.append(sum((habit_id, d) in done for d in days[-30:]) / 30)
+    counts = [sum((habit_id, day) in done for habit_id in habit_ids) for day in days]
+    rolling = [sum(counts[max(0, i - 6):i + 1]) / (len(habit_ids) * min(7, i + 1)) for i in range(n_days)]
+    return current, longest, weekly, monthly, rolling, counts[-365:]
+
+
+def run(habits, years, density, repeat):
+    today = date(2024, 6, 30)
+    rows, start = checkin_rows(habits, int(years * 365), today, density)
+    habit_ids = np.arange(1, habits + 1, dtype=np.int64)
+
+    check = vectorized(habit_ids, rows, start, today), python_loops(list(habit_ids), rows, start, today)
+    for fast, slow in zip(*check):
+        assert np.allclose(fast, slow), 'vectorized and loop results differ'
+
+    results = {}
+    for name, path in (('vectorized', vectorized), ('python_loops', python_loops)):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            path(habit_ids, rows, start, today)
+            timings.append(time.perf_counter() - started)
+        results[name] = {
+            'median_ms': round(statistics.median(timings) * 1000, 3),
+            'best_ms': round(min(timings) * 1000, 3),
+        }
+    return {'habits': habits, 'years': years, 'checkin_rows': len(rows), 'paths': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--habits', type=int, default=50)
+    parser.add_argument('--years', type=float, default=1)
+    parser.add_argument('--density', type=float, default=0.6, help='share of days each habit is done')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = run(args.habits, args.years, args.density, args.repeat)
+    print(f"{report['habits']} habits, {report['years']} years, {report['checkin_rows']} check-in rows")
+    for name, result in report['paths'].items():
+        print(f"  {name:<14} median {result['median_ms']:>9} ms  best {result['best_ms']:>9} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
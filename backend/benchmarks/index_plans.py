@@ -0,0 +1,141 @@
+"""Query plans and timings for the hot route queries, with and without indexes.
+
+Seeds a database with synthetic users (see datagen.py), then runs every
+hot query shape twice: once with only primary keys and unique constraints,
+once with the indexes declared on the models (migration 0003). For each query it prints
+the plan and the median/p95 latency over a sample of users, and writes
+the whole run as JSON for comparison.
+
+    cd backend
+    python -m benchmarks.index_plans --users 100000 --output index_plans.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select, text
+
+from benchmarks import datagen
+from models import Task, Habit, Reward, PomodoroSession
+
+HOT_TABLES = (Task.__table__, Habit.__table__, Reward.__table__, PomodoroSession.__table__)
+
+
+def hot_queries(user_id):
+    """One statement per hot route, in the shape the route issues it."""
+    return {
+        'tasks_page': select(Task.id, Task.title, Task.created_at)
+            .where(Task.user_id == user_id)
+            .order_by(Task.created_at, Task.id).limit(101),
+        'tasks_open_page': select(Task.id, Task.title, Task.created_at)
+            .where(Task.user_id == user_id, Task.completed == False)
+            .order_by(Task.created_at, Task.id).limit(101),
+        'habits_list': select(Habit.id, Habit.name, Habit.streak)
+            .where(Habit.user_id == user_id),
+        'pomodoro_history': select(PomodoroSession.id, PomodoroSession.start_time)
+            .where(PomodoroSession.user_id == user_id)
+            .order_by(PomodoroSession.start_time.desc()).limit(10),
+        'rewards_custom': select(Reward.id, Reward.name)
+            .where(Reward.user_id == user_id),
+        # Loaded once per catalog version, see catalog.py
+        'rewards_system': select(Reward.id, Reward.name)
+            .where(Reward.user_id == None).order_by(Reward.id),
+    }
+
+
+def explain(conn, stmt):
+    sql = str(stmt.compile(conn.engine, compile_kwargs={'literal_binds': True}))
+    if conn.engine.dialect.name == 'sqlite':
+        return [row[-1] for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+    return [row[0] for row in conn.execute(text('EXPLAIN ' + sql))]
+
+
+def measure(engine, sample_ids, repeat=1):
+    results = {}
+    with engine.connect() as conn:
+        for name in hot_queries(0):
+            timings = []
+            for user_id in sample_ids:
+                stmt = hot_queries(user_id)[name]
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    conn.execute(stmt).all()
+                    timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                'plan': explain(conn, hot_queries(sample_ids[0])[name]),
+                'median_ms': round(statistics.median(timings), 4),
+                'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 4),
+            }
+    return results
+
+
+def secondary_indexes():
+    return [index for table in HOT_TABLES for index in table.indexes]
+
+
+def analyze(engine):
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+
+
+def run(database_url, users, samples):
+    engine = create_engine(database_url)
+    started = time.perf_counter()
+    datagen.generate(engine, users)
+    seed_seconds = time.perf_counter() - started
+
+    rng = random.Random(7)
+    sample_ids = [rng.randint(1, users) for _ in range(samples)]
+
+    for index in secondary_indexes():
+        index.drop(engine, checkfirst=True)
+    analyze(engine)
+    before = measure(engine, sample_ids)
+
+    for index in secondary_indexes():
+        index.create(engine, checkfirst=True)
+    analyze(engine)
+    after = measure(engine, sample_ids)
+
+    engine.dispose()
+    return {
+        'database': engine.dialect.name,
+        'users': users,
+        'samples': samples,
+        'seed_seconds': round(seed_seconds, 2),
+        'queries': {name: {'before': before[name], 'after': after[name]} for name in before},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--samples', type=int, default=200, help='users sampled per query')
+    parser.add_argument('--database-url', help='empty database to seed (default: a temporary SQLite file)')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or 'sqlite:///' + os.path.join(tmp, 'index_plans.db')
+        report = run(url, args.users, args.samples)
+
+    print(f"{report['users']} users seeded in {report['seed_seconds']}s ({report['database']})")
+    for name, result in report['queries'].items():
+        before, after = result['before'], result['after']
+        print(f'\n{name}: median {before["median_ms"]} -> {after["median_ms"]} ms, '
+              f'p95 {before["p95_ms"]} -> {after["p95_ms"]} ms')
+        print('  before: ' + ' | '.join(before['plan']))
+        print('  after:  ' + ' | '.join(after['plan']))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""Concurrent load driver that replays the React pages' call patterns.
+
+Each virtual user is a thread with its own keep-alive connection that
+repeatedly picks a page (weighted by how often it is opened) and issues
+the same requests the page does: the initial fetch, the occasional
+mutation and the refetch after it. Tokens are minted locally with the
+app's JWT secret, so the server under test must share JWT_SECRET_KEY.
+
+    cd backend
+    python -m benchmarks.datagen --users 10000 --database-url sqlite:////tmp/bench.db
+    DATABASE_URL=sqlite:////tmp/bench.db SERVER_MODE=sync python serve.py &
+    python -m benchmarks.load --base-url http://localhost:5000 --users 10000 \\
+        --concurrency 50 --duration 60 --output load.json
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks.endpoints import auth_headers
+from benchmarks.stats import summarize
+
+
+class Client:
+    def __init__(self, base_url, headers, recorder):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.headers = dict(headers, **{'Content-Type': 'application/json'})
+        self.recorder = recorder
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def call(self, method, path, name=None, body=None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=payload, headers=self.headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            data, status = b'', 'error'
+        self.recorder.record(f'{method} {name or path}', (time.perf_counter() - start) * 1000, status)
+        if status == 200 or status == 201:
+            return json.loads(data) if data else {}
+        return None
+
+
+# Page scenarios, mirroring the calls in frontend/src/pages
+def todo_list(client, rng):
+    tasks = (client.call('GET', '/api/tasks') or {}).get('tasks', [])
+    if rng.random() < 0.3:
+        created = client.call('POST', '/api/tasks', body={'title': 'Load test task', 'priority': 'medium'})
+        if created:
+            client.call('POST', f"/api/tasks/{created['id']}/complete", name='/api/tasks/<id>/complete')
+        client.call('GET', '/api/tasks')
+    elif tasks and rng.random() < 0.2:
+        task = rng.choice(tasks)
+        client.call('PUT', f"/api/tasks/{task['id']}", name='/api/tasks/<id>', body={'title': task['title']})
+        client.call('GET', '/api/tasks')
+
+
+def habit_tracker(client, rng):
+    habits = (client.call('GET', '/api/habits') or {}).get('habits', [])
+    if habits and rng.random() < 0.3:
+        habit = rng.choice(habits)
+        client.call('POST', f"/api/habits/{habit['id']}/complete", name='/api/habits/<id>/complete')
+        client.call('GET', '/api/habits')
+
+
+def pomodoro_timer(client, rng):
+    client.call('GET', '/api/pomodoro')
+    session = client.call('POST', '/api/pomodoro', body={'duration': 25})
+    if session and rng.random() < 0.8:
+        client.call('POST', f"/api/pomodoro/{session['id']}/complete", name='/api/pomodoro/<id>/complete')
+    client.call('GET', '/api/pomodoro')
+
+
+def leaderboard(client, rng):
+    client.call('GET', '/api/leaderboard?timeframe=weekly', name='/api/leaderboard')
+    if rng.random() < 0.3:
+        timeframe = rng.choice(('monthly', 'all-time'))
+        client.call('GET', f'/api/leaderboard?timeframe={timeframe}', name='/api/leaderboard')
+
+
+def progress(client, rng):
+    timeframe = rng.choice(('weekly', 'weekly', 'monthly', 'all-time'))
+    client.call('GET', f'/api/progress?timeframe={timeframe}', name='/api/progress')
+
+
+PAGES = (
+    ('Leaderboard', leaderboard, 30),
+    ('TodoList', todo_list, 25),
+    ('PomodoroTimer', pomodoro_timer, 20),
+    ('HabitTracker', habit_tracker, 15),
+    ('Progress', progress, 10),
+)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, name, elapsed_ms, status):
+        with self.lock:
+            self.timings[name].append(elapsed_ms)
+            self.statuses[name][str(status)] += 1
+
+
+def virtual_user(base_url, headers, recorder, deadline, seed, think_time):
+    rng = random.Random(seed)
+    client = Client(base_url, headers, recorder)
+    scenarios = [scenario for _, scenario, _ in PAGES]
+    weights = [weight for _, _, weight in PAGES]
+    while time.monotonic() < deadline:
+        rng.choices(scenarios, weights)[0](client, rng)
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+
+
+def run(base_url, users, concurrency, duration, think_time=0.0, seed=11):
+    from app import create_app
+
+    app = create_app(blueprints=(), migrations=False)
+
+    rng = random.Random(seed)
+    user_ids = [rng.randint(1, users) for _ in range(concurrency)]
+    headers = auth_headers(app, set(user_ids))
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+
+    threads = [threading.Thread(target=virtual_user,
+                                args=(base_url, headers[user_id], recorder, deadline, seed + i, think_time),
+                                daemon=True)
+               for i, user_id in enumerate(user_ids)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_timings = [t for timings in recorder.timings.values() for t in timings]
+    # 4xx are expected outcomes (e.g. habit already completed today)
+    status_totals = sum(recorder.statuses.values(), Counter())
+    errors = sum(count for status, count in status_totals.items() if status == 'error' or status.startswith('5'))
+    return {
+        'base_url': base_url,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests': len(all_timings),
+        'errors': errors,
+        'statuses': dict(status_totals),
+        'throughput_rps': round(len(all_timings) / elapsed, 1),
+        'latency': summarize(all_timings),
+        'endpoints': {name: dict(summarize(timings), statuses=dict(recorder.statuses[name]))
+                      for name, timings in sorted(recorder.timings.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--users', type=int, default=10000, help='number of seeded users to draw from')
+    parser.add_argument('--concurrency', type=int, default=50, help='virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='seconds')
+    parser.add_argument('--think-time', type=float, default=0.0, help='max seconds between page visits')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    report = run(args.base_url, args.users, args.concurrency, args.duration, args.think_time)
+    latency = report['latency']
+    print(f"{report['requests']} requests in {report['duration_s']}s: {report['throughput_rps']} req/s, "
+          f"{report['errors']} errors, p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms, "
+          f"p99 {latency['p99_ms']} ms")
+    for name, result in report['endpoints'].items():
+        print(f"  {name:<40} n={result['count']:<7} p50 {result['p50_ms']:>9} ms  p99 {result['p99_ms']:>9} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Reminder dispatch lateness for a simulated day of a million habits.
+
+Fills a ``ReminderScheduler`` with synthetic habits (reminder times clustered
+on the quarter hour between 05:00 and 22:45, like the seeded data), then
+replays one day minute by minute. The scheduler's clock is the simulated
+minute plus the real time spent since that minute's tick started, so the
+reported lateness is exactly the scheduler's and the sink's own delay. Every
+minute a slice of habits is edited or completed through ``apply`` to include
+the cost of incremental updates.
+
+    cd backend
+    python -m benchmarks.reminders --habits 1000000 --output reminders.json
+    python -m benchmarks.reminders --habits 200000 --sink webhook
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from reminders import ReminderScheduler, WebhookSink
+
+NAMES = ('Read', 'Exercise', 'Meditate', 'Journal', 'Walk')
+
+
+class NullSink:
+    def __init__(self):
+        self.batches = 0
+
+    def send(self, reminders):
+        self.batches += 1
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def local_webhook():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _WebhookHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/reminders'
+
+
+def habit_row(rng, habit_id, day, completed_share):
+    last_completed = None
+    if rng.random() < completed_share:
+        last_completed = datetime.combine(day, dt_time(rng.randint(0, 4)))
+    reminder = dt_time(rng.randint(5, 22), rng.choice((0, 15, 30, 45)))
+    return (habit_id, habit_id // 3 + 1, rng.choice(NAMES), reminder, last_completed, None)
+
+
+def run(habits, batch_size, changes_per_minute, completed_share, sink, seed=5):
+    rng = random.Random(seed)
+    day = datetime(2024, 1, 1)
+    sim = {'minute': day, 'wall': time.perf_counter()}
+
+    def clock():
+        return sim['minute'] + timedelta(seconds=time.perf_counter() - sim['wall'])
+
+    scheduler = ReminderScheduler(sink, batch_size=batch_size, clock=clock)
+    started = time.perf_counter()
+    scheduler.apply(habit_row(rng, habit_id, day.date(), completed_share) for habit_id in range(1, habits + 1))
+    load_seconds = time.perf_counter() - started
+    peak_slot = max(len(slot) for slot in scheduler.wheel)
+
+    dispatched = 0
+    tick_seconds = []
+    apply_seconds = 0.0
+    scheduler.last_minute = day - timedelta(minutes=1)
+    for minute in range(24 * 60):
+        now = day + timedelta(minutes=minute)
+        changes = [habit_row(rng, rng.randint(1, habits), day.date(), 0.5) for _ in range(changes_per_minute)]
+        started = time.perf_counter()
+        scheduler.apply(changes)
+        apply_seconds += time.perf_counter() - started
+
+        sim['minute'], sim['wall'] = now, time.perf_counter()
+        dispatched += scheduler.tick(now)
+        tick_seconds.append(time.perf_counter() - sim['wall'])
+
+    return {
+        'habits': habits,
+        'batch_size': batch_size,
+        'load_seconds': round(load_seconds, 2),
+        'peak_slot_size': peak_slot,
+        'dispatched': dispatched,
+        'changes_applied': changes_per_minute * 24 * 60,
+        'apply_ms_per_change': round(apply_seconds * 1000 / max(1, changes_per_minute * 24 * 60), 4),
+        'max_tick_ms': round(max(tick_seconds) * 1000, 2),
+        'lateness': scheduler.lateness.summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--habits', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--changes-per-minute', type=int, default=200)
+    parser.add_argument('--completed-share', type=float, default=0.3, help='habits already done before their reminder')
+    parser.add_argument('--sink', choices=('null', 'webhook'), default='null')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    server = None
+    if args.sink == 'webhook':
+        server, url = local_webhook()
+        sink = WebhookSink(url)
+    else:
+        sink = NullSink()
+
+    report = run(args.habits, args.batch_size, args.changes_per_minute, args.completed_share, sink)
+    report['sink'] = args.sink
+    if server:
+        server.shutdown()
+
+    lateness = report['lateness']
+    print(f"{report['habits']} habits loaded in {report['load_seconds']}s, peak minute {report['peak_slot_size']} reminders")
+    print(f"{report['dispatched']} dispatched, lateness p50 {lateness.get('p50_s')}s p99 {lateness.get('p99_s')}s "
+          f"max {lateness.get('max_s')}s, slowest tick {report['max_tick_ms']} ms")
+    print(f"{report['changes_applied']} incremental changes at {report['apply_ms_per_change']} ms each")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Task search latency for a user with tens of thousands of tasks.
+
+Seeds a SQLite database (schema from the models, so the FTS5 index and its
+triggers come from ``search``) with one heavy user and background users.
+Task text is drawn from a few thousand made-up words with a Zipf
+distribution, like real task lists where a few words are everywhere. Then
+``/api/tasks/search`` queries (prefixes of common and rare words, one or
+two words, with and without filters, first and later pages) are timed
+through ``search.select_matches`` against the same queries as
+``LIKE '%word%'`` scans of the user's tasks.
+
+    cd backend
+    python -m benchmarks.search --tasks 50000 --output search.json
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, create_engine, or_, select
+from sqlalchemy.orm import Session
+
+import search
+import serializers
+from benchmarks.stats import summarize
+from models import db, User, Task
+
+SYLLABLES = ('ba', 'ke', 'li', 'mo', 'nu', 'ra', 'se', 'ti', 'vo', 'za', 'pre', 'gro', 'ste', 'dan', 'mar', 'rek')
+CATEGORIES = ('work', 'home', 'study', 'health', None)
+PRIORITIES = ('low', 'medium', 'high')
+FIELDS = serializers.TASK.fields[:-1]
+
+
+def vocabulary(rng, size):
+    """Made-up words, most frequent first."""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def queries(rng, words, count):
+    """Prefixes of words across the frequency range, some with a second word."""
+    result = []
+    for _ in range(count):
+        # Uniform over the log of the frequency rank
+        first = words[int(len(words) ** rng.random()) - 1]
+        query = first[:rng.randint(3, len(first))]
+        if rng.random() < 0.3:
+            query += ' ' + rng.choice(words[:200])[:3]
+        result.append(query)
+    return result
+
+
+def seed(engine, tasks, other_users, tasks_per_user, vocabulary_size, seed=17):
+    rng = random.Random(seed)
+    words = vocabulary(rng, vocabulary_size)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+
+    def sentence(length):
+        return ' '.join(rng.choices(words, cum_weights=cum_weights, k=length))
+
+    now = datetime.utcnow()
+    db.metadata.create_all(engine)
+    users = [{'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+              'password': b'x', 'coins': 0, 'is_premium': False, 'created_at': now}
+             for user_id in range(1, other_users + 2)]
+    rows = [(1, i) for i in range(tasks)] + [(user_id, i) for user_id in range(2, other_users + 2)
+                                             for i in range(tasks_per_user)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), users)
+        for start in range(0, len(rows), 20000):
+            conn.execute(Task.__table__.insert(), [{
+                'user_id': user_id, 'title': sentence(rng.randint(2, 5)),
+                'description': sentence(rng.randint(0, 12)) or None,
+                'completed': rng.random() < 0.6, 'coins_reward': 10, 'due_date': None,
+                'priority': rng.choice(PRIORITIES), 'category': rng.choice(CATEGORIES),
+                'created_at': now - timedelta(minutes=i)} for user_id, i in rows[start:start + 20000]])
+    return words
+
+
+def fts(session, words, filters, limit, page):
+    query = search.select_matches('sqlite', 1, words, serializers.TASK.columns(FIELDS), filters)
+    return session.execute(query.limit(limit + 1).offset((page - 1) * limit)).all()
+
+
+def like_scan(session, words, filters, limit, page):
+    matches = [or_(Task.title.ilike(f'%{w}%'), Task.description.ilike(f'%{w}%'), Task.category.ilike(f'%{w}%'))
+               for w in words]
+    query = select(*serializers.TASK.columns(FIELDS)).where(Task.user_id == 1, and_(*matches), *filters)\
+        .order_by(Task.id)
+    return session.execute(query.limit(limit + 1).offset((page - 1) * limit)).all()
+
+
+CASES = (
+    ('page_1', [], 1),
+    ('page_5', [], 5),
+    ('open_high_priority', [Task.completed == False, Task.priority == 'high'], 1),
+)
+
+
+def run(engine, words, iterations, limit):
+    sample = queries(random.Random(5), words, iterations)
+    results = {}
+    with Session(engine) as session:
+        matches = sorted(len(session.execute(search.select_matches('sqlite', 1, search.terms(q), [Task.id])).all())
+                         for q in sample)
+    results['matches_per_query'] = {'p50': matches[len(matches) // 2], 'p95': matches[int(len(matches) * 0.95)],
+                                    'max': matches[-1]}
+    for path_name, path in (('fts', fts), ('like_scan', like_scan)):
+        for case, filters, page in CASES:
+            timings = []
+            with Session(engine) as session:
+                for query in sample:
+                    words = search.terms(query)
+                    start = time.perf_counter()
+                    path(session, words, filters, limit, page)
+                    timings.append((time.perf_counter() - start) * 1000)
+            results[f'{path_name}:{case}'] = summarize(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=50000, help='tasks of the searching user')
+    parser.add_argument('--other-users', type=int, default=500)
+    parser.add_argument('--tasks-per-user', type=int, default=200)
+    parser.add_argument('--vocabulary', type=int, default=5000, help='distinct words in task text')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        started = time.perf_counter()
+        words = seed(engine, args.tasks, args.other_users, args.tasks_per_user, args.vocabulary)
+        print(f'Seeded {args.tasks} + {args.other_users * args.tasks_per_user} tasks '
+              f'in {time.perf_counter() - started:.1f}s')
+        results = run(engine, words, args.iterations, args.limit)
+        engine.dispose()
+
+    matches = results.pop('matches_per_query')
+    print(f"Matches per query: p50 {matches['p50']}, p95 {matches['p95']}, max {matches['max']}")
+    for name, summary in results.items():
+        print(f"  {name:<30} p50 {summary['p50_ms']:>9} ms  p95 {summary['p95_ms']:>9} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'tasks': args.tasks, 'limit': args.limit, 'matches_per_query': matches,
+                       'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Rows/sec of the task list serialization paths.
+
+Seeds one user with many tasks and serializes them the way ``GET /api/tasks``
+used to (ORM instances, a hand-built dict per row, stdlib json) and the way
+it does now (column tuples, the precompiled ``serializers.TASK`` mapping,
+orjson when installed), plus the mixed steps in between.
+
+    cd backend
+    python -m benchmarks.serialization --rows 20000 --output serialization.json
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import serializers
+from models import db, User, Task
+
+
+def seed(engine, rows, seed=3):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{'id': 1, 'username': 'bench', 'email': 'bench@example.com',
+                                                'password': b'x', 'coins': 0, 'is_premium': False,
+                                                'created_at': now}])
+        conn.execute(Task.__table__.insert(), [{
+            'user_id': 1, 'title': f'Task {i}', 'description': 'Lorem ipsum dolor sit amet ' * rng.randint(0, 6) or None,
+            'completed': rng.random() < 0.6, 'coins_reward': 10,
+            'due_date': now + timedelta(days=rng.randint(0, 90)) if rng.random() < 0.5 else None,
+            'priority': rng.choice(('low', 'medium', 'high')), 'category': rng.choice(('work', 'home', None)),
+            'created_at': now - timedelta(minutes=i)} for i in range(rows)])
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj).encode('utf-8')
+
+
+def orm_hand_built(session):
+    tasks = session.query(Task).filter_by(user_id=1).all()
+    return stdlib_dumps({'tasks': [{
+        'id': t.id,
+        'title': t.title,
+        'description': t.description,
+        'completed': t.completed,
+        'coins_reward': t.coins_reward,
+        'due_date': t.due_date.isoformat() if t.due_date else None,
+        'priority': t.priority,
+        'category': t.category
+    } for t in tasks]})
+
+
+# The task schema with ISO conversion forced on, as the stdlib encoder needs
+STDLIB_TASK = serializers.Schema(Task, serializers.TASK.fields[:-1], {'due_date': serializers.iso})
+
+
+def tuples_stdlib(session):
+    rows = session.execute(select(*STDLIB_TASK.columns()).where(Task.user_id == 1)).all()
+    return stdlib_dumps({'tasks': STDLIB_TASK.rows(rows)})
+
+
+def tuples_fast(session):
+    fields = serializers.TASK.fields[:-1]
+    rows = session.execute(select(*serializers.TASK.columns(fields)).where(Task.user_id == 1)).all()
+    return serializers.dumps({'tasks': serializers.TASK.rows(rows, fields)})
+
+
+PATHS = (
+    ('orm_hand_built_stdlib', orm_hand_built),
+    ('tuples_schema_stdlib', tuples_stdlib),
+    ('tuples_schema_fast', tuples_fast),
+)
+
+
+def run(rows, repeat):
+    engine = create_engine('sqlite://')
+    seed(engine, rows)
+    results = {}
+    for name, path in PATHS:
+        timings = []
+        for _ in range(repeat):
+            with Session(engine) as session:
+                start = time.perf_counter()
+                body = path(session)
+                timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results[name] = {
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'best_ms': round(best * 1000, 2),
+            'rows_per_sec': round(rows / best),
+            'bytes': len(body),
+        }
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    print(f"{args.rows} rows, encoder: {'orjson' if serializers.orjson else 'stdlib json'}")
+    for name, result in results.items():
+        print(f"  {name:<24} median {result['median_ms']:>9} ms  {result['rows_per_sec']:>9} rows/s  "
+              f"{result['bytes']} bytes")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'encoder': 'orjson' if serializers.orjson else 'json',
+                       'paths': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Cold-start time of a fresh process: import, app creation, first request.
+
+Every sample is a new interpreter (as a prefork worker or a test process
+would be) that imports ``app``, calls ``create_app`` and serves
+``GET /api/tasks`` twice through the test client against a small SQLite
+database. Scenarios:
+
+* ``eager``      - everything loaded up front (Flask-Migrate, numpy, bcrypt),
+                   as when app.py built the whole app at import time;
+* ``cli``        - ``create_app()``, what ``flask --app app`` runs;
+* ``server``     - ``create_app(migrations=False)``, the gunicorn/uvicorn app;
+* ``tasks_only`` - ``create_app(blueprints=('tasks',), migrations=False)``.
+
+    cd backend
+    python -m benchmarks.startup --samples 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from benchmarks.stats import summarize
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'eager': {'preload': ('flask_migrate', 'analytics', 'bcrypt'), 'kwargs': {}},
+    'cli': {'preload': (), 'kwargs': {}},
+    'server': {'preload': (), 'kwargs': {'migrations': False}},
+    'tasks_only': {'preload': (), 'kwargs': {'blueprints': ('tasks',), 'migrations': False}},
+}
+
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+for name in {preload!r}:
+    __import__(name)
+import app as module
+imported = time.perf_counter()
+flask_app = module.create_app(**{kwargs!r})
+created = time.perf_counter()
+
+from flask_jwt_extended import create_access_token
+with flask_app.app_context():
+    token = create_access_token(identity=1, additional_claims={{'premium': False}})
+client = flask_app.test_client()
+headers = {{'Authorization': 'Bearer ' + token}}
+timings = []
+for _ in range(2):
+    request_started = time.perf_counter()
+    assert client.get('/api/tasks', headers=headers).status_code == 200
+    timings.append(time.perf_counter() - request_started)
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': timings[0] * 1000,
+    'second_request_ms': timings[1] * 1000,
+    'modules': len(sys.modules),
+}}))
+'''
+
+
+def sample(scenario, env):
+    code = CHILD.format(**SCENARIOS[scenario])
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], cwd=BACKEND, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    result = json.loads(out.splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def run(samples, scenarios):
+    from models import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        engine = create_engine(url)
+        db.metadata.create_all(engine)
+        engine.dispose()
+        env = dict(os.environ, DATABASE_URL=url, RESPONSE_CACHE_BACKEND='none')
+
+        results = {}
+        for scenario in scenarios:
+            runs = [sample(scenario, env) for _ in range(samples)]
+            results[scenario] = {name: summarize([r[name] for r in runs])
+                                 for name in ('import_ms', 'create_app_ms', 'first_request_ms',
+                                              'second_request_ms', 'process_ms')}
+            results[scenario]['modules'] = runs[-1]['modules']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=10, help='fresh processes per scenario')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(',') if s]
+    results = run(args.samples, scenarios)
+    print(f"{'scenario':<12}{'import':>10}{'create':>10}{'1st req':>10}{'2nd req':>10}{'process':>10}{'modules':>9}"
+          f"   (p50 ms)")
+    for scenario, result in results.items():
+        print(f"{scenario:<12}" + ''.join(f"{result[name]['p50_ms']:>10.1f}" for name in (
+            'import_ms', 'create_app_ms', 'first_request_ms', 'second_request_ms', 'process_ms'))
+            + f"{result['modules']:>9}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'samples': args.samples, 'scenarios': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""Latency summaries shared by the benchmark scripts."""
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(timings_ms):
+    """count/mean/p50/p90/p95/p99/max of a list of millisecond timings."""
+    values = sorted(timings_ms)
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values), 4) if values else 0.0,
+        'p50_ms': round(percentile(values, 50), 4),
+        'p90_ms': round(percentile(values, 90), 4),
+        'p95_ms': round(percentile(values, 95), 4),
+        'p99_ms': round(percentile(values, 99), 4),
+        'max_ms': round(values[-1], 4) if values else 0.0,
+    }
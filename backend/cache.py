@@ -0,0 +1,185 @@
+"""Per-user response cache for the read endpoints.
+
+Cached GET responses are keyed by (user_id, endpoint, query args). Instead
+of expiring entries on a timer, every (user_id, endpoint) pair has a
+generation number that is part of the key; the write routes bump it after
+they commit, so the next read misses and stale bodies are never served.
+
+Backends:
+
+* ``lru``   - in-process LRU, the default with a single server process.
+              Other processes never see its invalidations, so it is
+              refused when ``WEB_CONCURRENCY`` is above 1 (and the
+              default there is ``none``).
+* ``redis`` - shared across processes. Needs the ``redis`` package and
+              ``RESPONSE_CACHE_URL``.
+* ``none``  - disables caching.
+
+Cached and fresh responses carry an ETag, so clients sending
+If-None-Match get a 304 with no body when nothing changed.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+
+class LRUBackend:
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, scope):
+        with self._lock:
+            return self._generations.get(scope, 0)
+
+    def bump(self, scope):
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisBackend:
+    def __init__(self, url, ttl=3600, prefix='rc:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def generation(self, scope):
+        key = self.prefix + 'gen:' + scope
+        generation = self.client.get(key)
+        if generation is None:
+            # Seed from the clock so a generation key lost to eviction can
+            # never come back with a number an old entry was stored under
+            self.client.set(key, time.time_ns(), nx=True)
+            generation = self.client.get(key)
+        return int(generation)
+
+    def bump(self, scope):
+        key = self.prefix + 'gen:' + scope
+        if not self.client.exists(key):
+            self.client.set(key, time.time_ns(), nx=True)
+        self.client.incr(key)
+
+    def get(self, key):
+        raw = self.client.hgetall(self.prefix + key)
+        if not raw:
+            return None
+        return raw[b'body'], raw[b'etag'].decode('ascii'), raw[b'mimetype'].decode('ascii')
+
+    def set(self, key, entry):
+        body, etag, mimetype = entry
+        pipe = self.client.pipeline()
+        pipe.hset(self.prefix + key, mapping={'body': body, 'etag': etag, 'mimetype': mimetype})
+        pipe.expire(self.prefix + key, self.ttl)
+        pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_BACKEND', 'lru')
+        app.config.setdefault('RESPONSE_CACHE_SIZE', 10000)
+        app.config.setdefault('RESPONSE_CACHE_URL', None)
+        app.config.setdefault('RESPONSE_CACHE_TTL', 3600)
+        app.config.setdefault('WEB_CONCURRENCY', 1)
+
+        kind = app.config['RESPONSE_CACHE_BACKEND']
+        if kind == 'lru' and app.config['WEB_CONCURRENCY'] > 1:
+            raise ValueError('RESPONSE_CACHE_BACKEND=lru needs a single server process; '
+                             'use redis (or none) with WEB_CONCURRENCY above 1')
+        if kind == 'lru':
+            self.backend = LRUBackend(app.config['RESPONSE_CACHE_SIZE'])
+        elif kind == 'redis':
+            self.backend = RedisBackend(app.config['RESPONSE_CACHE_URL'], ttl=app.config['RESPONSE_CACHE_TTL'])
+        elif kind == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f'Unknown RESPONSE_CACHE_BACKEND: {kind}')
+
+    @staticmethod
+    def _scope(user_id, endpoint):
+        return f'{user_id}:{endpoint}'
+
+    def cached(self, endpoint, version=None):
+        """Cache GET responses of a ``jwt_required`` view under ``endpoint``.
+
+        ``version`` is an optional callable for views that also depend on
+        shared data; its value is part of the key.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET' or self.backend is None:
+                    return view(*args, **kwargs)
+
+                # The generation is read before the view runs, so a write that
+                # lands meanwhile leaves this entry under an already-dead key
+                scope = self._scope(get_jwt_identity(), endpoint)
+                query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+                key = f'{scope}:{self.backend.generation(scope)}:{query}'
+                if version is not None:
+                    key = f'{key}:v{version()}'
+
+                entry = self.backend.get(key)
+                if entry is None:
+                    response = view(*args, **kwargs)
+                    # Views return either a response or (response, status)
+                    if isinstance(response, tuple) or response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    entry = (body, hashlib.blake2b(body, digest_size=16).hexdigest(), response.mimetype)
+                    self.backend.set(key, entry)
+                else:
+                    response = None
+
+                body, etag, mimetype = entry
+                if response is None:
+                    response = current_app.response_class(body, mimetype=mimetype)
+                response.set_etag(etag)
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    def invalidate(self, user_id, *endpoints):
+        if self.backend is None:
+            return
+        for endpoint in endpoints:
+            self.backend.bump(self._scope(user_id, endpoint))
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,130 @@
+"""In-process snapshot of the system rewards catalog.
+
+System rewards (``Reward.user_id IS NULL``) are the same for every user and
+rarely change, so each process keeps them as one immutable snapshot instead
+of querying them on every Store page load and redemption. The snapshot is
+tied to the ``rewards`` row of ``catalog_version``: any ORM flush that
+touches a system reward bumps it in the same transaction, and a process
+re-reads the version at most every ``CATALOG_CHECK_SECONDS`` and reloads
+the rewards only when it moved. Bump it by hand with ``flask --app app
+bump-catalog`` after editing rewards with raw SQL.
+
+Each request works against one snapshot (kept on ``g``), so the cache key,
+the response body and the ``X-Catalog-Version`` header always agree.
+"""
+import threading
+import time
+from collections import namedtuple
+from itertools import chain
+
+from flask import g
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import serializers
+from models import db, CatalogVersion, Reward
+
+CatalogSnapshot = namedtuple('CatalogSnapshot', 'version rewards by_id')
+
+
+def bump(session, name='rewards'):
+    """Increment the ``name`` catalog version and return it.
+
+    The row is created (at 1) when missing, as in databases built with
+    ``create_all`` rather than the migrations.
+    """
+    table = CatalogVersion.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = (sqlite if dialect == 'sqlite' else postgresql).insert
+        return session.execute(
+            insert(table).values(name=name, version=1)
+            .on_conflict_do_update(index_elements=['name'], set_={'version': table.c.version + 1})
+            .returning(table.c.version)
+        ).scalar()
+
+    updated = session.execute(
+        update(table).where(table.c.name == name).values(version=table.c.version + 1)
+    ).rowcount
+    if not updated:
+        session.execute(table.insert().values(name=name, version=1))
+    return session.execute(select(table.c.version).where(table.c.name == name)).scalar()
+
+
+class RewardCatalog:
+    def __init__(self, app=None):
+        self.check_seconds = 5.0
+        self._snapshot = None
+        self._check_at = 0.0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CATALOG_CHECK_SECONDS', 5.0)
+        self.check_seconds = app.config['CATALOG_CHECK_SECONDS']
+        app.after_request(self._add_header)
+
+    def current(self):
+        """The snapshot for this request."""
+        snapshot = g.get('reward_catalog')
+        if snapshot is None:
+            snapshot = g.reward_catalog = self._fresh()
+        return snapshot
+
+    def version(self):
+        return self.current().version
+
+    def expire(self):
+        self._check_at = 0.0
+
+    def _fresh(self):
+        if time.monotonic() < self._check_at:
+            return self._snapshot
+        with self._lock:
+            if time.monotonic() >= self._check_at:
+                version = db.session.execute(
+                    select(CatalogVersion.version).where(CatalogVersion.name == 'rewards')
+                ).scalar() or 0
+                if self._snapshot is None or self._snapshot.version != version:
+                    self._snapshot = self._load(version)
+                self._check_at = time.monotonic() + self.check_seconds
+            return self._snapshot
+
+    @staticmethod
+    def _load(version):
+        rewards = serializers.REWARD.rows(db.session.execute(
+            select(*serializers.REWARD.columns()).where(Reward.user_id.is_(None)).order_by(Reward.id)
+        ).all())
+        return CatalogSnapshot(version, tuple(rewards), {reward['id']: reward for reward in rewards})
+
+    @staticmethod
+    def _add_header(response):
+        snapshot = g.get('reward_catalog')
+        if snapshot is not None:
+            response.headers['X-Catalog-Version'] = str(snapshot.version)
+        return response
+
+
+reward_catalog = RewardCatalog()
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_on_change(session, flush_context):
+    # Still the pre-flush lists at this point
+    if any(isinstance(obj, Reward) and obj.user_id is None
+           for obj in chain(session.new, session.dirty, session.deleted)):
+        bump(session)
+        session.info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _expire_on_commit(session):
+    if session.info.pop('catalog_changed', False):
+        reward_catalog.expire()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop('catalog_changed', None)
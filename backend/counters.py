@@ -0,0 +1,81 @@
+"""Atomic counter upserts for the materialized tables.
+
+Incrementing with ``INSERT ... ON CONFLICT DO UPDATE SET n = n + :delta``
+keeps the read-modify-write inside the database, so concurrent requests
+never overwrite each other's counts.
+"""
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db
+
+
+def increment(model, keys, **deltas):
+    """Add ``deltas`` to the row of ``model`` identified by ``keys``.
+
+    The row is created when missing. ``keys`` must match a unique
+    constraint on the table.
+    """
+    table = model.__table__
+    _upsert(table, keys, deltas, {name: table.c[name] + delta for name, delta in deltas.items()})
+
+
+def increment_many(model, key_names, rows):
+    """``increment`` for many rows at once, one executemany where supported.
+
+    Every row is a dict of the ``key_names`` columns and the deltas; all rows
+    must carry the same columns.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        for row in rows:
+            increment(model, {name: row[name] for name in key_names},
+                      **{name: value for name, value in row.items() if name not in key_names})
+        return
+
+    now = datetime.utcnow()
+    if 'updated_at' in table.c:
+        rows = [dict(row, updated_at=now) for row in rows]
+    stmt = (sqlite if dialect == 'sqlite' else postgresql).insert(table)
+    changes = {name: table.c[name] + stmt.excluded[name] for name in rows[0] if name not in key_names}
+    if 'updated_at' in table.c:
+        changes['updated_at'] = stmt.excluded.updated_at
+    db.session.execute(stmt.on_conflict_do_update(index_elements=list(key_names), set_=changes), rows)
+
+
+def set_bits(model, keys, **masks):
+    """OR ``masks`` into integer bitmap columns, like ``increment``."""
+    table = model.__table__
+    _upsert(table, keys, masks, {name: table.c[name].op('|')(mask) for name, mask in masks.items()})
+
+
+def _upsert(table, keys, initial, changes):
+    now = datetime.utcnow()
+    values = dict(keys, **initial)
+    if 'updated_at' in table.c:
+        values['updated_at'] = now
+        changes['updated_at'] = now
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        insert = (sqlite if dialect == 'sqlite' else postgresql).insert
+        stmt = insert(table).values(**values).on_conflict_do_update(
+            index_elements=list(keys),
+            set_=changes,
+        )
+        db.session.execute(stmt)
+        return
+
+    # Generic fallback: update in place, insert if the row is missing
+    result = db.session.execute(
+        update(table)
+        .where(*[table.c[name] == value for name, value in keys.items()])
+        .values(**changes)
+    )
+    if result.rowcount == 0:
+        db.session.execute(table.insert().values(**values))
@@ -0,0 +1,53 @@
+"""Concurrent section loading for /api/dashboard.
+
+The dashboard bundles what the app's first screens otherwise fetch with
+separate requests. Its sections don't depend on each other, so ``run``
+hands all but one to a small dedicated pool and computes the last on the
+request thread. Each pool thread works in an app context of its own, which
+gives it its own session and so its own pooled connection; the response
+takes about as long as the slowest section rather than the sum of them.
+
+``DASHBOARD_WORKERS`` caps the pool threads, and with them how many extra
+connections dashboards hold at once; keep it well under the engine's pool
+size plus overflow. ``0`` computes every section on the request thread,
+one after another.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+
+class SectionLoader:
+    def __init__(self, app=None):
+        self.timeout = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('DASHBOARD_WORKERS', 8)
+        app.config.setdefault('DASHBOARD_TIMEOUT', 10)
+
+        self.timeout = app.config['DASHBOARD_TIMEOUT']
+        workers = app.config['DASHBOARD_WORKERS']
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard') if workers else None
+
+    def _in_context(self, app, fn):
+        with app.app_context():
+            return fn()
+
+    def run(self, sections):
+        """Call each of ``{name: fn}`` and return ``{name: result}``."""
+        names = list(sections)
+        if self._executor is None or len(names) < 2:
+            return {name: sections[name]() for name in names}
+
+        app = current_app._get_current_object()
+        futures = {name: self._executor.submit(self._in_context, app, sections[name]) for name in names[:-1]}
+        results = {names[-1]: sections[names[-1]]()}
+        for name, future in futures.items():
+            results[name] = future.result(timeout=self.timeout)
+        return results
+
+
+loader = SectionLoader()
@@ -0,0 +1,150 @@
+"""Engine and connection pool configuration.
+
+``engine_options()`` builds SQLALCHEMY_ENGINE_OPTIONS from environment
+variables on top of per-dialect defaults:
+
+PostgreSQL (and other server databases)
+    DB_POOL_SIZE (10), DB_MAX_OVERFLOW (20), DB_POOL_TIMEOUT (30 s),
+    DB_POOL_RECYCLE (1800 s), DB_POOL_PRE_PING (true)
+
+SQLite
+    SQLITE_JOURNAL_MODE (WAL), SQLITE_SYNCHRONOUS (NORMAL),
+    SQLITE_BUSY_TIMEOUT_MS (5000), SQLITE_MMAP_SIZE (256 MiB),
+    applied as PRAGMAs on every new connection. WAL lets readers run
+    alongside the single writer and the busy timeout makes concurrent
+    writers wait instead of failing with "database is locked".
+    SQLITE_FOREIGN_KEYS (OFF) is SQLite's own default; turning it on makes
+    deletes that leave child rows behind fail, which changes what existing
+    deployments accept.
+
+Pools built here time how long each checkout waits; ``pool_stats()``
+reports that together with the pool's own counters.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'SQLITE_JOURNAL_MODE', 'WAL'),
+    ('synchronous', 'SQLITE_SYNCHRONOUS', 'NORMAL'),
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS', '5000'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+    ('foreign_keys', 'SQLITE_FOREIGN_KEYS', 'OFF'),
+)
+
+
+def _env_int(env, name, default):
+    return int(env.get(name, default))
+
+
+def _env_bool(env, name, default):
+    return str(env.get(name, default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # Keep the subclass when the engine disposes and rebuilds its pool
+        new = super().recreate()
+        new.checkouts, new.timeouts = self.checkouts, self.timeouts
+        new.wait_total, new.wait_max = self.wait_total, self.wait_max
+        return new
+
+
+def is_memory_sqlite(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(url, env=None, async_engine=False):
+    """SQLAlchemy engine keyword arguments for ``url``."""
+    env = os.environ if env is None else env
+    url = make_url(url)
+
+    if url.get_backend_name() == 'sqlite':
+        # In-memory databases keep SQLAlchemy's single-connection pool
+        if is_memory_sqlite(url):
+            return {}
+        options = {
+            'pool_size': _env_int(env, 'DB_POOL_SIZE', 5),
+            'max_overflow': _env_int(env, 'DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _env_int(env, 'DB_POOL_TIMEOUT', 30),
+        }
+    else:
+        options = {
+            'pool_size': _env_int(env, 'DB_POOL_SIZE', 10),
+            'max_overflow': _env_int(env, 'DB_MAX_OVERFLOW', 20),
+            'pool_timeout': _env_int(env, 'DB_POOL_TIMEOUT', 30),
+            'pool_recycle': _env_int(env, 'DB_POOL_RECYCLE', 1800),
+            'pool_pre_ping': _env_bool(env, 'DB_POOL_PRE_PING', True),
+        }
+
+    # Async engines need the asyncio-adapted pool; aiosqlite would otherwise
+    # default to NullPool, which takes no sizing arguments
+    options['poolclass'] = AsyncAdaptedQueuePool if async_engine else TimedQueuePool
+    return options
+
+
+@event.listens_for(Engine, 'connect')
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    # Registered on the Engine class, so it also covers the async engine
+    module = type(dbapi_connection).__module__
+    if 'sqlite' not in module:
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma, env_name, default in SQLITE_PRAGMAS:
+        cursor.execute(f'PRAGMA {pragma} = {os.environ.get(env_name, default)}')
+    cursor.close()
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {
+        'pool_class': type(pool).__name__,
+        'status': pool.status(),
+    }
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        with pool._stats_lock:
+            stats.update({
+                'checkouts': pool.checkouts,
+                'timeouts': pool.timeouts,
+                'wait_seconds_total': round(pool.wait_total, 6),
+                'wait_seconds_max': round(pool.wait_max, 6),
+                'wait_seconds_avg': round(pool.wait_total / pool.checkouts, 6) if pool.checkouts else 0,
+            })
+    return stats
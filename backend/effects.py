@@ -0,0 +1,83 @@
+"""Side effects of the write routes, run as background jobs.
+
+A route changes its own row (the task, habit or session) and enqueues one
+event; the coin credit and the leaderboard and rollup counters that follow
+from it are applied by ``apply_events``, which aggregates a whole batch so
+each user's balance and counters are updated once per batch. Events carry
+the time they happened, so counters land in that day's buckets however late
+the worker runs. Once the batch commits, each credited user gets their new
+balance as a ``coins`` event and the leaderboard watcher is told whose
+scores moved.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time
+
+import leaderboard
+import ledger
+from events import publish_after_commit
+import rollups
+from jobs import queue
+
+
+@queue.handler('task_created', 'task_completed', 'task_batch',
+               'pomodoro_started', 'pomodoro_completed', 'habit_completed')
+def apply_events(events):
+    credits = []
+    boards = defaultdict(Counter)
+    days = defaultdict(Counter)
+
+    for event in events:
+        user_id = event['user_id']
+        day = datetime.fromisoformat(event['at']).date()
+        if event.get('coins'):
+            credits.append((user_id, event['coins'], event['reason'], event.get('ref_id')))
+        if event.get('tasks') or event.get('streak'):
+            boards[user_id, day].update(tasks=event.get('tasks', 0), streak=event.get('streak', 0))
+        if event.get('rollups'):
+            days[user_id, day].update(event['rollups'])
+
+    balances = ledger.credit_batch(credits)
+    for (user_id, day), totals in boards.items():
+        leaderboard.record(user_id, tasks=totals['tasks'], streak=totals['streak'],
+                           now=datetime.combine(day, time()))
+    for (user_id, day), totals in days.items():
+        rollups.record(user_id, now=datetime.combine(day, time()), **totals)
+
+    for user_id, coins in balances.items():
+        publish_after_commit(f'user:{user_id}', {'type': 'coins', 'coins': coins})
+    if boards:
+        publish_after_commit('scores', {'user_ids': sorted({user_id for user_id, _ in boards})})
+
+    return {(user_id, 'profile') for user_id, *_ in credits}
+
+
+def _emit(kind, user_id, at=None, **event):
+    queue.enqueue(kind, user_id=user_id, at=(at or datetime.utcnow()).isoformat(), **event)
+
+
+def task_created(user_id):
+    _emit('task_created', user_id, rollups={'tasks_created': 1})
+
+
+def task_completed(user_id, task_id, coins, at=None):
+    _emit('task_completed', user_id, at, coins=coins, reason='task', ref_id=task_id,
+          tasks=1, rollups={'tasks_completed': 1})
+
+
+def task_batch(user_id, created, completed, coins, at=None):
+    _emit('task_batch', user_id, at, coins=coins, reason='task', tasks=completed,
+          rollups={'tasks_created': created, 'tasks_completed': completed})
+
+
+def pomodoro_started(user_id):
+    _emit('pomodoro_started', user_id, rollups={'pomodoro_sessions': 1})
+
+
+def pomodoro_completed(user_id, session_id, minutes, coins):
+    _emit('pomodoro_completed', user_id, coins=coins, reason='pomodoro', ref_id=session_id,
+          rollups={'pomodoro_completed': 1, 'pomodoro_minutes': minutes})
+
+
+def habit_completed(user_id, habit_id, coins):
+    _emit('habit_completed', user_id, coins=coins, reason='habit', ref_id=habit_id,
+          streak=1, rollups={'habit_checkins': 1})
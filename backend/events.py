@@ -0,0 +1,189 @@
+"""Event fan-out for the server-sent events stream.
+
+Write paths publish small events to channels: ``user:<id>`` for one user's
+pomodoro sessions and coin balance, and ``scores`` when leaderboard
+counters change. ``publish_after_commit`` holds an event on the current
+session until it commits, so nobody is told about state that was rolled
+back.
+
+Subscribers are the SSE connections of the ASGI app (see sse.py). Each one
+is an asyncio queue on the server's event loop; publishing from a request
+thread or a job hands the event over with ``call_soon_threadsafe``.
+Queues are bounded: when a client reads too slowly the oldest events are
+dropped, and past ``EVENTS_MAX_DROPPED`` the subscription is marked
+overflowed so the stream tells the client to resync and closes.
+
+Backends (``EVENTS_BACKEND``):
+
+* ``local`` - delivered within this process only. The default; enough
+              for a single server process with ``JOBS_MODE=local``.
+* ``redis`` - published through Redis pub/sub and delivered by every
+              process that has subscribers. Needed with several server
+              processes or a separate job worker. Uses ``EVENTS_URL``.
+* ``none``  - publishing is a no-op.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import serializers
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('local', 'redis', 'none')
+
+
+class Subscription:
+    def __init__(self, loop, channels, maxsize, max_dropped):
+        self.loop = loop
+        self.channels = tuple(channels)
+        self.queue = asyncio.Queue(maxsize)
+        self.max_dropped = max_dropped
+        self.dropped = 0
+        self.overflowed = False
+
+    def deliver(self, channel, payload):
+        """Runs on the subscriber's loop."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped > self.max_dropped:
+                self.overflowed = True
+        self.queue.put_nowait((channel, payload))
+
+
+class RedisFanout:
+    def __init__(self, broker, url, prefix='events:'):
+        import redis
+
+        self.broker = broker
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, channel, payload):
+        self.client.publish(self.prefix + channel, serializers.dumps(payload))
+
+    def ensure_listening(self):
+        # Only processes with subscribers (the SSE server) need the listener
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='events-redis', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + '*')
+        for message in pubsub.listen():
+            channel = message['channel'].decode('utf-8')[len(self.prefix):]
+            self.broker.deliver(channel, json.loads(message['data']))
+
+
+class Broker:
+    def __init__(self, app=None):
+        self.backend = 'local'
+        self.fanout = None
+        self.queue_size = 100
+        self.max_dropped = 50
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EVENTS_BACKEND', 'local')
+        app.config.setdefault('EVENTS_URL', None)
+        app.config.setdefault('EVENTS_QUEUE_SIZE', 100)
+        app.config.setdefault('EVENTS_MAX_DROPPED', 50)
+        app.config.setdefault('EVENTS_HEARTBEAT', 15)
+
+        self.backend = app.config['EVENTS_BACKEND']
+        if self.backend not in BACKENDS:
+            raise ValueError(f"EVENTS_BACKEND must be one of: {', '.join(BACKENDS)}")
+        if self.backend == 'redis':
+            self.fanout = RedisFanout(self, app.config['EVENTS_URL'])
+        self.queue_size = app.config['EVENTS_QUEUE_SIZE']
+        self.max_dropped = app.config['EVENTS_MAX_DROPPED']
+        self.heartbeat = app.config['EVENTS_HEARTBEAT']
+
+    # Subscribing (event loop side)
+    def subscribe(self, channels, loop=None):
+        sub = Subscription(loop or asyncio.get_running_loop(), channels, self.queue_size, self.max_dropped)
+        with self._lock:
+            for channel in sub.channels:
+                self._subscribers[channel].add(sub)
+        if self.fanout:
+            self.fanout.ensure_listening()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for channel in sub.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(sub)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def has_subscribers(self, channel):
+        return channel in self._subscribers
+
+    # Publishing (any thread)
+    def deliver(self, channel, payload):
+        """Hand ``payload`` to this process's subscribers of ``channel``."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, channel, payload)
+            except RuntimeError:
+                # The subscriber's loop is closed; it is unsubscribing
+                pass
+
+    def publish(self, channel, payload):
+        if self.backend == 'none':
+            return
+        if self.fanout:
+            try:
+                self.fanout.publish(channel, payload)
+            except Exception:
+                logger.exception('Event fan-out failed for %s', channel)
+        else:
+            self.deliver(channel, payload)
+
+    def publish_after_commit(self, session, channel, payload):
+        if self.backend != 'none':
+            if not session.in_transaction():
+                # Tie the event to a transaction, so a rollback() before the
+                # first statement discards it instead of a later commit sending it
+                session.begin()
+            session.info.setdefault('pending_events', []).append((channel, payload))
+
+
+broker = Broker()
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_pending(session):
+    for channel, payload in session.info.pop('pending_events', ()):
+        broker.publish(channel, payload)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending(session, previous_transaction):
+    # after_rollback only fires when a connection was in use. A savepoint
+    # rolling back leaves the outer transaction's events alone.
+    if previous_transaction.parent is None:
+        session.info.pop('pending_events', None)
+
+
+def publish_after_commit(channel, payload):
+    from models import db
+
+    broker.publish_after_commit(db.session(), channel, payload)
@@ -0,0 +1,164 @@
+"""Streaming export of task, habit and pomodoro history.
+
+Rows are read with ``yield_per`` (a server-side cursor on PostgreSQL) in
+index order and encoded as they arrive, so memory stays flat however long
+a user's history is. Output is NDJSON, one object per line tagged with its
+``type``, or CSV for a single entity, optionally gzipped on the fly.
+
+``export_all`` is the bulk variant behind ``flask export-all``: it splits
+the user id space into chunks and writes one gzipped file per entity and
+chunk from a pool of worker threads, each on its own connection.
+
+Rows moved to the archive (see archive.py) are read back and merged into
+the live rows in the same order, so an export always has the full history.
+"""
+import csv
+import gzip
+import heapq
+import io
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+import archive
+import serializers
+from models import User, Task, Habit, PomodoroSession
+
+# entity -> (schema, owner column, order columns matching the user index)
+ENTITIES = {
+    'tasks': (serializers.TASK, Task.user_id, (Task.created_at, Task.id)),
+    'habits': (serializers.HABIT, Habit.user_id, (Habit.id,)),
+    'pomodoro': (serializers.POMODORO, PomodoroSession.user_id, (PomodoroSession.start_time, PomodoroSession.id)),
+}
+FORMATS = ('ndjson', 'csv')
+MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+YIELD_PER = 1000
+# Encoded output is handed to the server in pieces of about this size
+CHUNK_BYTES = 64 * 1024
+
+
+def parse_entities(entities):
+    names = tuple(e for e in (entities or ','.join(ENTITIES)).split(',') if e)
+    unknown = set(names) - set(ENTITIES)
+    if unknown:
+        raise ValueError(f"Unknown entities: {', '.join(sorted(unknown))}")
+    return names
+
+
+def parse(entities, fmt):
+    """Validate the ``entities`` and ``format`` arguments; raises ValueError."""
+    names = parse_entities(entities)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    if fmt == 'csv' and len(names) != 1:
+        raise ValueError('CSV export takes exactly one entity')
+    return names, fmt
+
+
+def select_rows(entity, user_id=None, user_range=None):
+    schema, owner, order = ENTITIES[entity]
+    stmt = select(*schema.columns(), owner)
+    if user_id is not None:
+        stmt = stmt.where(owner == user_id).order_by(*order)
+    else:
+        stmt = stmt.where(owner.between(*user_range)).order_by(owner, *order)
+    return stmt.execution_options(yield_per=YIELD_PER)
+
+
+def read_rows(conn, entity, user_id=None, user_range=None):
+    """Live and archived rows of ``entity``, ordered like ``select_rows``."""
+    schema, owner, order = ENTITIES[entity]
+    live = conn.execute(select_rows(entity, user_id, user_range))
+    if entity not in archive.ENTITIES:
+        return live
+
+    names = schema.fields + ('user_id',)
+    positions = [names.index(column.key) for column in order]
+
+    def key(row):
+        return (row[-1], *[row[i] for i in positions])
+
+    return heapq.merge(archive.rows(conn, entity, names, key, user_id, user_range), live, key=key)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _buffered(pieces):
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_BYTES:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _encode(conn, entity, fmt, user_id, user_range):
+    schema = ENTITIES[entity][0]
+    to_dict = schema.compile()
+    rows = read_rows(conn, entity, user_id, user_range)
+
+    if fmt == 'csv':
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(('user_id',) + schema.fields)
+        for row in rows:
+            writer.writerow([row[-1]] + [_csv_value(v) for v in row[:-1]])
+            if out.tell() >= CHUNK_BYTES:
+                yield out.getvalue().encode('utf-8')
+                out.seek(0)
+                out.truncate()
+        yield out.getvalue().encode('utf-8')
+        return
+
+    for row in rows:
+        item = to_dict(row)
+        item['type'] = entity
+        item['user_id'] = row[-1]
+        yield serializers.dumps(item) + b'\n'
+
+
+def stream(conn, entities, fmt, user_id=None, user_range=None):
+    """Yield the encoded export of ``entities`` for one user or an id range.
+
+    ``conn`` is a Session or Connection and must stay open while iterating.
+    """
+    for entity in entities:
+        yield from _buffered(_encode(conn, entity, fmt, user_id, user_range))
+
+
+def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_all(engine, out_dir, entities, fmt, chunk_size=1000, workers=4):
+    """Write every user's history under ``out_dir``; returns the file paths."""
+    with engine.connect() as conn:
+        max_id = conn.execute(select(func.max(User.id))).scalar() or 0
+    os.makedirs(out_dir, exist_ok=True)
+
+    def work(job):
+        entity, lo, hi = job
+        path = os.path.join(out_dir, f'{entity}-{lo:09d}-{hi:09d}.{fmt}.gz')
+        with engine.connect() as conn, gzip.open(path, 'wb') as f:
+            for chunk in stream(conn, (entity,), fmt, user_range=(lo, hi)):
+                f.write(chunk)
+        return path
+
+    jobs = [(entity, lo, lo + chunk_size - 1)
+            for lo in range(1, max_id + 1, chunk_size) for entity in entities]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(work, jobs))
@@ -0,0 +1,95 @@
+"""The caller of the current request.
+
+Access tokens carry the user's entitlements as claims (``premium``), so
+most routes answer "who is this and what may they do" from the token
+alone. The JWT ``user_lookup_loader`` returns an ``Identity`` built from
+those claims, available as ``flask_jwt_extended.current_user`` for the
+rest of the request; the ``User`` row is only fetched, once, when a route
+reads ``current_user.user``.
+
+A token outlives changes to the claims it was issued with, so the routes
+that change them (premium upgrade, profile edits) call ``refresh`` after
+committing. It stores the new values in a process-wide LRU that takes
+precedence over the token's claims until a fresh token is used. Premium
+only ever goes up, so an entry lost to eviction or held by another process
+at worst denies a premium feature until the client picks up the new token
+returned by the upgrade route.
+"""
+import threading
+from collections import OrderedDict
+
+from models import db, User
+
+
+def claims_for(user):
+    """Extra claims for ``create_access_token(additional_claims=...)``."""
+    return {'premium': bool(user.is_premium)}
+
+
+class EntitlementCache:
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+            return entry
+
+    def set(self, user_id, claims):
+        with self._lock:
+            self._entries[user_id] = claims
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+entitlements = EntitlementCache()
+
+
+def refresh(user_id, claims):
+    """Record a user's current claims after they changed."""
+    entitlements.set(user_id, claims)
+
+
+class Identity:
+    """What ``current_user`` resolves to on a JWT-protected route."""
+
+    def __init__(self, user_id, claims):
+        self.id = user_id
+        self._claims = claims
+        self._user = None
+
+    @property
+    def claims(self):
+        entry = entitlements.get(self.id)
+        if entry is not None:
+            return entry
+        if 'premium' not in self._claims:
+            # Issued before entitlement claims existed
+            self._claims = claims_for(self.user)
+        return self._claims
+
+    @property
+    def is_premium(self):
+        return self.claims['premium']
+
+    @property
+    def user(self):
+        """The ``User`` row, loaded on first access."""
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+
+def init_app(jwt):
+    @jwt.user_lookup_loader
+    def load_identity(_jwt_header, jwt_data):
+        return Identity(jwt_data['sub'], jwt_data)
@@ -0,0 +1,214 @@
+"""Background jobs.
+
+Work that the response doesn't depend on is enqueued as a row in the ``job``
+table inside the request's own transaction, so a job exists exactly when
+the change that caused it commits. ``python worker.py`` claims jobs in
+batches of one kind, runs the kind's handler once per batch and deletes the
+batch in the handler's transaction. A failing batch is retried job by job;
+a failing job is rescheduled with exponential backoff and marked ``failed``
+after ``JOBS_MAX_ATTEMPTS``.
+
+Modes (``JOBS_MODE``):
+
+* ``local`` - handlers run inline at enqueue time, inside the caller's
+              transaction. The default, for development and tests.
+* ``queue`` - jobs are stored and run by the worker. Side effects become
+              visible once the worker has run them; with more than one
+              process the response cache needs the ``redis`` backend so the
+              worker's invalidations reach the web processes.
+
+Handlers take a list of payloads and may return ``(user_id, endpoint)``
+pairs whose cached responses the worker invalidates after committing.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+
+from models import db, Job
+
+logger = logging.getLogger(__name__)
+
+MODES = ('local', 'queue')
+
+
+def backoff(attempts, base=2.0, cap=3600.0):
+    """Seconds to wait before retry number ``attempts``, with jitter."""
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+class JobQueue:
+    def __init__(self, app=None):
+        self.handlers = {}
+        self.mode = 'local'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('JOBS_MODE', 'local')
+        app.config.setdefault('JOBS_MAX_ATTEMPTS', 5)
+        app.config.setdefault('JOBS_BATCH_SIZE', 100)
+        app.config.setdefault('JOBS_LEASE_SECONDS', 300)
+        app.config.setdefault('JOBS_POLL_INTERVAL', 1.0)
+
+        if app.config['JOBS_MODE'] not in MODES:
+            raise ValueError(f"JOBS_MODE must be one of: {', '.join(MODES)}")
+        self.mode = app.config['JOBS_MODE']
+
+    def handler(self, *kinds):
+        def decorator(f):
+            for kind in kinds:
+                self.handlers[kind] = f
+            return f
+        return decorator
+
+    def enqueue(self, kind, **payload):
+        if kind not in self.handlers:
+            raise KeyError(f'No handler for job kind {kind!r}')
+        if self.mode == 'local':
+            # The caller commits and invalidates its own cached responses
+            self.handlers[kind]([payload])
+        else:
+            db.session.add(Job(kind=kind, payload=payload))
+
+
+class Worker:
+    """Runs queued jobs on ``threads`` threads, each with its own session."""
+
+    def __init__(self, app, queue, threads=4, name=None):
+        self.app = app
+        self.queue = queue
+        self.threads = threads
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self._recovered_at = 0.0
+        self._recover_lock = threading.Lock()
+
+        config = app.config
+        self.batch_size = config['JOBS_BATCH_SIZE']
+        self.max_attempts = config['JOBS_MAX_ATTEMPTS']
+        self.lease = timedelta(seconds=config['JOBS_LEASE_SECONDS'])
+        self.poll_interval = config['JOBS_POLL_INTERVAL']
+
+    def recover(self, now):
+        """Requeue jobs whose worker died holding them, at most every quarter lease."""
+        with self._recover_lock:
+            if time.monotonic() - self._recovered_at < self.lease.total_seconds() / 4:
+                return
+            self._recovered_at = time.monotonic()
+        db.session.execute(
+            update(Job)
+            .where(Job.status == 'running', Job.locked_at < now - self.lease)
+            .values(status='queued', locked_by=None, locked_at=None)
+        )
+        db.session.commit()
+
+    def claim(self, worker_id):
+        """Lock up to ``batch_size`` due jobs of the oldest due kind.
+
+        The claim is a single UPDATE, so no read transaction is held while
+        waiting for the write lock (SQLite) and concurrent workers skip each
+        other's rows (SKIP LOCKED on PostgreSQL). Returns plain rows.
+        """
+        now = datetime.utcnow()
+        self.recover(now)
+
+        due = (Job.status == 'queued', Job.run_at <= now)
+        oldest_kind = select(Job.kind).where(*due).order_by(Job.id).limit(1).scalar_subquery()
+        ids = select(Job.id).where(*due, Job.kind == oldest_kind).order_by(Job.id)\
+            .limit(self.batch_size).with_for_update(skip_locked=True)
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id.in_(ids), Job.status == 'queued')
+            .values(status='running', locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return []
+
+        jobs = db.session.execute(
+            select(Job.id, Job.kind, Job.payload, Job.attempts)
+            .where(Job.status == 'running', Job.locked_by == worker_id, Job.locked_at == now)
+            .order_by(Job.id)
+        ).all()
+        db.session.rollback()
+        return jobs
+
+    def run_batch(self, jobs):
+        from cache import response_cache
+
+        ids = [job.id for job in jobs]
+        try:
+            invalidations = self.queue.handlers[jobs[0].kind]([job.payload for job in jobs])
+            db.session.execute(delete(Job).where(Job.id.in_(ids)), execution_options={'synchronize_session': False})
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(jobs) > 1:
+                # Isolate the job that fails instead of retrying the whole batch
+                for job in jobs:
+                    self.run_batch([job])
+                return
+            self.fail(jobs[0], e)
+            return
+
+        for user_id, endpoint in set(invalidations or ()):
+            response_cache.invalidate(user_id, endpoint)
+
+    def fail(self, job, error):
+        logger.warning('Job %s (%s) failed on attempt %d: %r', job.id, job.kind, job.attempts, error)
+        values = {'locked_by': None, 'locked_at': None, 'last_error': repr(error)[:1000]}
+        if job.attempts >= self.max_attempts:
+            values['status'] = 'failed'
+        else:
+            values.update(status='queued', run_at=datetime.utcnow() + timedelta(seconds=backoff(job.attempts)))
+        db.session.execute(update(Job).where(Job.id == job.id).values(**values))
+        db.session.commit()
+
+    def run_pending(self, worker_id=None):
+        """Run due jobs until none are left; returns how many were claimed."""
+        worker_id = worker_id or self.name
+        claimed = 0
+        while not self.stopping.is_set():
+            jobs = self.claim(worker_id)
+            if not jobs:
+                break
+            claimed += len(jobs)
+            self.run_batch(jobs)
+        return claimed
+
+    def _thread_main(self, index):
+        worker_id = f'{self.name}:{index}'
+        with self.app.app_context():
+            while not self.stopping.is_set():
+                try:
+                    if not self.run_pending(worker_id):
+                        self.stopping.wait(self.poll_interval)
+                except Exception:
+                    logger.exception('Worker thread %s crashed, restarting loop', worker_id)
+                    db.session.rollback()
+                    self.stopping.wait(self.poll_interval)
+            db.session.remove()
+
+    def run(self):
+        threads = [threading.Thread(target=self._thread_main, args=(i,), name=f'job-worker-{i}')
+                   for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1.0)
+        except KeyboardInterrupt:
+            self.stopping.set()
+            for thread in threads:
+                thread.join()
+
+
+queue = JobQueue()
@@ -0,0 +1,196 @@
+"""Materialized leaderboard.
+
+Instead of joining User, Task and Habit on every request, each user keeps a
+row of counters per leaderboard period (current week, current month and
+all-time). The completion routes bump those counters as they happen and the
+read path is an index scan on (period, bucket, tasks_completed, total_streak).
+
+Weekly and monthly boards are calendar buckets: the week starts on Monday and
+the month on its first day (UTC).
+
+The two counters are defined the same way for the live updates and for
+``rebuild``:
+
+* ``tasks_completed`` - tasks completed in the bucket, dated by their
+  ``completed_at`` (a task created last month and completed today counts
+  this week);
+* ``total_streak``    - habit check-ins made in the bucket, one per habit and
+  day, as logged in ``habit_checkin``. Each check-in adds one, so all-time
+  is every check-in the user has made, not the sum of their current streaks.
+
+A user's rank is one plus the number of entries ahead of them in the bucket.
+That is a count over the (period, bucket, tasks_completed, total_streak)
+index, which never touches the table but still reads one index entry per
+user ranked higher: O(rank), cheap near the top and bounded by the bucket's
+size at the bottom.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, desc, func, or_, select
+
+import counters
+from models import db, User, Task, HabitCheckin, LeaderboardEntry, ArchiveRollup
+
+PERIODS = ('weekly', 'monthly', 'all-time')
+ALL_TIME_BUCKET = date(1970, 1, 1)
+MAX_LIMIT = 100
+
+
+def bucket_for(period, now=None):
+    today = (now or datetime.utcnow()).date()
+    if period == 'weekly':
+        return today - timedelta(days=today.weekday())
+    if period == 'monthly':
+        return today.replace(day=1)
+    return ALL_TIME_BUCKET
+
+
+def record(user_id, tasks=0, streak=0, now=None):
+    """Add to the user's counters in every current period bucket.
+
+    Runs inside the caller's transaction, so the counters commit together
+    with the task or habit change that produced them.
+    """
+    for period in PERIODS:
+        counters.increment(
+            LeaderboardEntry,
+            {'period': period, 'bucket': bucket_for(period, now), 'user_id': user_id},
+            tasks_completed=tasks,
+            total_streak=streak,
+        )
+
+
+def record_task_completed(user_id, now=None):
+    record(user_id, tasks=1, now=now)
+
+
+def record_habit_completed(user_id, now=None):
+    record(user_id, streak=1, now=now)
+
+
+def entry_dict(user_id, username, is_premium, tasks_completed, total_streak, rank=None):
+    entry = {
+        'user_id': user_id,
+        'username': username,
+        'tasks_completed': tasks_completed,
+        'total_streak': total_streak,
+        'is_premium': is_premium,
+    }
+    if rank is not None:
+        entry['rank'] = rank
+    return entry
+
+
+# Statement builders shared by the sync routes and the async read path
+def select_top(period, bucket, limit):
+    return select(User.id, User.username, User.is_premium,
+                  LeaderboardEntry.tasks_completed, LeaderboardEntry.total_streak)\
+        .join(LeaderboardEntry, LeaderboardEntry.user_id == User.id)\
+        .where(LeaderboardEntry.period == period, LeaderboardEntry.bucket == bucket)\
+        .order_by(desc(LeaderboardEntry.tasks_completed), desc(LeaderboardEntry.total_streak), LeaderboardEntry.user_id)\
+        .limit(limit)
+
+
+def select_user_entry(user_id, period, bucket):
+    return select(User.id, User.username, User.is_premium,
+                  func.coalesce(LeaderboardEntry.tasks_completed, 0),
+                  func.coalesce(LeaderboardEntry.total_streak, 0))\
+        .outerjoin(LeaderboardEntry, and_(
+            LeaderboardEntry.user_id == User.id,
+            LeaderboardEntry.period == period,
+            LeaderboardEntry.bucket == bucket))\
+        .where(User.id == user_id)
+
+
+def select_ahead(period, bucket, tasks, streak):
+    # Index-only count of the entries strictly ahead, O(rank), see the module docstring
+    return select(func.count(LeaderboardEntry.id)).where(
+        LeaderboardEntry.period == period,
+        LeaderboardEntry.bucket == bucket,
+        or_(
+            LeaderboardEntry.tasks_completed > tasks,
+            and_(LeaderboardEntry.tasks_completed == tasks, LeaderboardEntry.total_streak > streak),
+        ),
+    )
+
+
+def normalize(period, limit):
+    if period not in PERIODS:
+        period = 'weekly'
+    return period, max(1, min(limit, MAX_LIMIT))
+
+
+def get_leaderboard(period, user_id=None, limit=10, now=None):
+    period, limit = normalize(period, limit)
+    bucket = bucket_for(period, now)
+
+    top = db.session.execute(select_top(period, bucket, limit)).all()
+    result = {
+        'timeframe': period,
+        'leaderboard': [entry_dict(*row) for row in top],
+    }
+
+    if user_id is not None:
+        me = db.session.execute(select_user_entry(user_id, period, bucket)).first()
+        if me is not None:
+            ahead = db.session.execute(select_ahead(period, bucket, me[3], me[4])).scalar()
+            result['me'] = entry_dict(*me, rank=ahead + 1)
+
+    return result
+
+
+def checkins_since(start):
+    """``{user_id: habit check-ins logged on or after the date start}``."""
+    totals = {}
+    rows = db.session.execute(
+        select(HabitCheckin.user_id, HabitCheckin.month, HabitCheckin.days)
+        .where(HabitCheckin.month >= start.replace(day=1))
+    )
+    for user_id, month, days in rows:
+        if month < start:
+            # Drop the bits of the days before start in its month
+            days &= ~((1 << (start.day - 1)) - 1)
+        if days:
+            totals[user_id] = totals.get(user_id, 0) + bin(days).count('1')
+    return totals
+
+
+def rebuild(now=None):
+    """Recompute every current bucket from the Task and check-in tables.
+
+    Counts as defined in the module docstring. Archived tasks count through
+    their archive_rollup rows; check-ins made before the check-in log
+    existed (migration 0006) are not counted.
+    """
+    now = now or datetime.utcnow()
+    LeaderboardEntry.query.delete()
+
+    for period in PERIODS:
+        bucket = bucket_for(period, now)
+        start = datetime.combine(bucket, datetime.min.time())
+
+        tasks = dict(db.session.query(Task.user_id, func.count(Task.id)).filter(
+            Task.completed == True,
+            Task.completed_at >= start
+        ).group_by(Task.user_id).all())
+        archived = db.session.query(ArchiveRollup.user_id, func.sum(ArchiveRollup.tasks_completed)).filter(
+            ArchiveRollup.day >= bucket
+        ).group_by(ArchiveRollup.user_id).all()
+        for user_id, count in archived:
+            if count:
+                tasks[user_id] = tasks.get(user_id, 0) + count
+
+        streaks = checkins_since(bucket)
+
+        rows = [{
+            'user_id': user_id,
+            'period': period,
+            'bucket': bucket,
+            'tasks_completed': tasks.get(user_id, 0),
+            'total_streak': streaks.get(user_id, 0),
+            'updated_at': now,
+        } for user_id in set(tasks) | set(streaks)]
+        if rows:
+            db.session.execute(LeaderboardEntry.__table__.insert(), rows)
+
+    db.session.commit()
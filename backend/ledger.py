@@ -0,0 +1,151 @@
+"""Coin ledger.
+
+Every coin movement is appended to ``coin_transaction`` and applied to
+``User.coins`` with a single SQL-side update, so concurrent requests from
+the same user never lose an update and no row lock is held across the
+request. Spending uses a guarded update that only matches while the
+balance covers the cost.
+
+``User.coins`` stays the O(1) balance read by the API. ``compact()`` folds
+old ledger rows into a per-user ``coin_snapshot`` so the ledger stays small
+while ``reconcile()`` can still prove the balance: snapshot + newer rows.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, update
+
+from models import db, User, CoinTransaction, CoinSnapshot
+
+COMPACT_CHUNK_SIZE = 1000
+
+
+def _append(user_id, amount, reason, ref_id):
+    db.session.add(CoinTransaction(user_id=user_id, amount=amount, reason=reason, ref_id=ref_id))
+
+
+def credit_batch(credits):
+    """Apply many ``(user_id, amount, reason, ref_id)`` credits.
+
+    Every credit keeps its own ledger row, but each user's balance is
+    updated once with the sum. Returns ``{user_id: new balance}``.
+    """
+    totals = {}
+    for user_id, amount, reason, ref_id in credits:
+        _append(user_id, amount, reason, ref_id)
+        totals[user_id] = totals.get(user_id, 0) + amount
+    return {
+        user_id: db.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(coins=User.coins + amount)
+            .returning(User.coins),
+            execution_options={'synchronize_session': False}
+        ).scalar()
+        for user_id, amount in totals.items()
+    }
+
+
+def debit(user_id, amount, reason, ref_id=None):
+    """Spend ``amount`` coins if the balance allows it.
+
+    Returns the new balance, or None when the balance is too low. The check
+    and the decrement are one statement, so two concurrent redemptions can
+    never both spend the same coins.
+    """
+    balance = db.session.execute(
+        update(User)
+        .where(User.id == user_id, User.coins >= amount)
+        .values(coins=User.coins - amount)
+        .returning(User.coins),
+        execution_options={'synchronize_session': False}
+    ).scalar()
+    if balance is not None:
+        _append(user_id, -amount, reason, ref_id)
+    return balance
+
+
+def balance(user_id):
+    return db.session.query(User.coins).filter(User.id == user_id).scalar()
+
+
+def reconcile(user_id):
+    """Balance implied by the snapshot plus the ledger rows after it."""
+    snapshot = db.session.get(CoinSnapshot, user_id)
+    through_id = snapshot.through_id if snapshot else 0
+    tail = db.session.query(func.coalesce(func.sum(CoinTransaction.amount), 0)).filter(
+        CoinTransaction.user_id == user_id,
+        CoinTransaction.id > through_id
+    ).scalar()
+    return (snapshot.balance if snapshot else 0) + tail
+
+
+def open_balances():
+    """Give users without a snapshot an opening balance.
+
+    Coins earned before the ledger existed have no transactions; the opening
+    snapshot holds the difference so that reconcile() matches User.coins.
+    Run it once while writes are quiet.
+    """
+    ledger_sums = db.session.query(
+        CoinTransaction.user_id,
+        func.sum(CoinTransaction.amount).label('total')
+    ).group_by(CoinTransaction.user_id).subquery()
+
+    rows = db.session.query(User.id, User.coins, ledger_sums.c.total)\
+        .outerjoin(ledger_sums, ledger_sums.c.user_id == User.id)\
+        .outerjoin(CoinSnapshot, CoinSnapshot.user_id == User.id)\
+        .filter(CoinSnapshot.user_id == None)\
+        .all()
+
+    now = datetime.utcnow()
+    snapshots = [{
+        'user_id': user_id,
+        'balance': (coins or 0) - (total or 0),
+        'through_id': 0,
+        'updated_at': now,
+    } for user_id, coins, total in rows]
+    if snapshots:
+        db.session.execute(CoinSnapshot.__table__.insert(), snapshots)
+    db.session.commit()
+    return len(snapshots)
+
+
+def compact(older_than=timedelta(days=90)):
+    """Fold ledger rows older than ``older_than`` into the snapshots.
+
+    Users without a snapshot get their opening balance first (see
+    open_balances), otherwise the zero-balance snapshot made for them here
+    would hide the coins they had before the ledger. Returns
+    ``(balances opened, rows compacted)``.
+    """
+    opened = open_balances()
+    cutoff = datetime.utcnow() - older_than
+    max_id = db.session.query(func.max(CoinTransaction.id))\
+        .filter(CoinTransaction.created_at < cutoff).scalar()
+    if max_id is None:
+        return opened, 0
+
+    # Compact by id so every row at or below through_id is in the snapshot
+    window = (CoinTransaction.id <= max_id,)
+    totals = db.session.query(
+        CoinTransaction.user_id,
+        func.sum(CoinTransaction.amount),
+        func.max(CoinTransaction.id)
+    ).filter(*window).group_by(CoinTransaction.user_id).all()
+
+    for start in range(0, len(totals), COMPACT_CHUNK_SIZE):
+        chunk = totals[start:start + COMPACT_CHUNK_SIZE]
+        snapshots = {s.user_id: s for s in CoinSnapshot.query.filter(
+            CoinSnapshot.user_id.in_([user_id for user_id, _, _ in chunk]))}
+        for user_id, amount, last_id in chunk:
+            snapshot = snapshots.get(user_id)
+            if snapshot is None:
+                # A user who appeared after open_balances() ran, with only ledger coins
+                snapshot = CoinSnapshot(user_id=user_id, balance=0, through_id=0)
+                db.session.add(snapshot)
+            snapshot.balance += amount
+            snapshot.through_id = max(snapshot.through_id, last_id)
+
+    removed = CoinTransaction.query.filter(*window).delete(synchronize_session=False)
+    db.session.commit()
+    return opened, removed
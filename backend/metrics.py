@@ -0,0 +1,222 @@
+"""Request and database instrumentation.
+
+Per request it records the route latency, how many SQL statements ran and
+how long they took. Any identical statement repeated at least
+``METRICS_N_PLUS_ONE_THRESHOLD`` times in one request is logged and counted
+as a likely N+1. Everything is exported from ``/metrics`` in the Prometheus
+text format, and each response gets a ``Server-Timing`` header so the
+browser's network panel shows the app/db split.
+
+Setting ``METRICS_PROFILE_SLOW_MS`` starts a sampling profiler: while a
+request runs its thread's stack is sampled every
+``METRICS_PROFILE_INTERVAL_MS``, and requests slower than the threshold log
+their most frequent stacks.
+"""
+import logging
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _labels(labels):
+    return ','.join(f'{k}="{v}"' for k, v in labels)
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads currently serving a request."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='metrics-profiler', daemon=True)
+        self._thread.start()
+
+    def start(self):
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+
+    def stop(self):
+        with self._lock:
+            return self._active.pop(threading.get_ident(), Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, samples in self._active.items():
+                    frame = frames.get(ident)
+                    stack = []
+                    while frame is not None:
+                        stack.append(f'{frame.f_code.co_name} ({frame.f_code.co_filename.rsplit("/", 1)[-1]}:{frame.f_lineno})')
+                        frame = frame.f_back
+                    if stack:
+                        samples[';'.join(reversed(stack))] += 1
+
+
+class Metrics:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.query_counts = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.db_seconds = defaultdict(float)
+        self.n_plus_one = defaultdict(int)
+        self.slow_requests = defaultdict(int)
+        self.profiler = None
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_N_PLUS_ONE_THRESHOLD', 5)
+        app.config.setdefault('METRICS_PROFILE_SLOW_MS', None)
+        app.config.setdefault('METRICS_PROFILE_INTERVAL_MS', 5)
+
+        self.n_plus_one_threshold = app.config['METRICS_N_PLUS_ONE_THRESHOLD']
+        self.slow_ms = app.config['METRICS_PROFILE_SLOW_MS']
+        if self.slow_ms:
+            self.profiler = SamplingProfiler(app.config['METRICS_PROFILE_INTERVAL_MS'] / 1000)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+
+        # Class-level listeners: once per process, however many apps are built
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+
+    # Request hooks
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_seconds = 0.0
+        g.metrics_statements = Counter()
+        if self.profiler:
+            self.profiler.start()
+
+    def _after_request(self, response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        queries = g.metrics_queries
+        db_seconds = g.metrics_db_seconds
+        repeated = [(sql, n) for sql, n in g.metrics_statements.items() if n >= self.n_plus_one_threshold]
+
+        with self._lock:
+            self.latency[(route, request.method, response.status_code)].observe(elapsed)
+            self.query_counts[route].observe(queries)
+            self.db_seconds[route] += db_seconds
+            if repeated:
+                self.n_plus_one[route] += 1
+
+        for sql, n in repeated:
+            logger.warning('Possible N+1 on %s %s: statement ran %d times: %s', request.method, route, n, sql[:200])
+
+        if self.profiler:
+            samples = self.profiler.stop()
+            if elapsed * 1000 >= self.slow_ms:
+                with self._lock:
+                    self.slow_requests[route] += 1
+                top = '\n'.join(f'  {count:>5} {stack}' for stack, count in samples.most_common(5))
+                logger.warning('Slow request %s %s took %.1f ms, top stacks:\n%s',
+                               request.method, route, elapsed * 1000, top)
+
+        response.headers.add('Server-Timing', f'app;dur={elapsed * 1000:.2f}')
+        response.headers.add('Server-Timing', f'db;dur={db_seconds * 1000:.2f};desc="{queries} queries"')
+        return response
+
+    def _teardown_request(self, exc):
+        g.pop('metrics_statements', None)
+        if self.profiler:
+            self.profiler.stop()
+
+    # SQLAlchemy hooks
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            context._metrics_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context() or 'metrics_statements' not in g:
+            return
+        start = getattr(context, '_metrics_start', None)
+        if start is None:
+            return
+        g.metrics_db_seconds += time.perf_counter() - start
+        g.metrics_queries += 1
+        g.metrics_statements[statement] += 1
+
+    # Export
+    def export(self):
+        lines = []
+        with self._lock:
+            lines += ['# HELP http_request_duration_seconds Request latency by route.',
+                      '# TYPE http_request_duration_seconds histogram']
+            for (route, method, status), hist in sorted(self.latency.items()):
+                lines += self._histogram('http_request_duration_seconds', hist,
+                                         (('route', route), ('method', method), ('status', status)))
+
+            lines += ['# HELP db_queries_per_request SQL statements executed per request.',
+                      '# TYPE db_queries_per_request histogram']
+            for route, hist in sorted(self.query_counts.items()):
+                lines += self._histogram('db_queries_per_request', hist, (('route', route),))
+
+            lines += ['# HELP db_query_seconds_total Time spent in SQL statements.',
+                      '# TYPE db_query_seconds_total counter']
+            lines += [f'db_query_seconds_total{{{_labels((("route", r),))}}} {v:.6f}'
+                      for r, v in sorted(self.db_seconds.items())]
+
+            lines += ['# HELP db_n_plus_one_requests_total Requests that repeated one statement past the threshold.',
+                      '# TYPE db_n_plus_one_requests_total counter']
+            lines += [f'db_n_plus_one_requests_total{{{_labels((("route", r),))}}} {v}'
+                      for r, v in sorted(self.n_plus_one.items())]
+
+            lines += ['# HELP http_slow_requests_total Requests over the profiling threshold.',
+                      '# TYPE http_slow_requests_total counter']
+            lines += [f'http_slow_requests_total{{{_labels((("route", r),))}}} {v}'
+                      for r, v in sorted(self.slow_requests.items())]
+
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+    @staticmethod
+    def _histogram(name, hist, labels):
+        base = _labels(labels)
+        lines = [f'{name}_bucket{{{base},le="{bound}"}} {count}'
+                 for bound, count in zip(hist.buckets, hist.counts)]
+        lines.append(f'{name}_bucket{{{base},le="+Inf"}} {hist.count}')
+        lines.append(f'{name}_sum{{{base}}} {hist.sum:.6f}')
+        lines.append(f'{name}_count{{{base}}} {hist.count}')
+        return lines
+
+
+metrics = Metrics()
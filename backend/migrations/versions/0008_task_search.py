@@ -0,0 +1,75 @@
+"""Task full-text search index
+
+Revision ID: 0008_task_search
+Revises: 0007_catalog_version
+Create Date: 2026-10-18 02:52:41.108213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_task_search'
+down_revision = '0007_catalog_version'
+branch_labels = None
+depends_on = None
+
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE task_fts USING fts5("
+    "owner, title, description, category, "
+    "content='', prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+
+    "CREATE TRIGGER task_fts_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, owner, title, description, category) "
+    "VALUES (new.id, 'u' || new.user_id, new.title, coalesce(new.description, ''), coalesce(new.category, '')); "
+    "END",
+
+    "CREATE TRIGGER task_fts_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, owner, title, description, category) "
+    "VALUES ('delete', old.id, 'u' || old.user_id, old.title, coalesce(old.description, ''), coalesce(old.category, '')); "
+    "END",
+
+    "CREATE TRIGGER task_fts_update AFTER UPDATE OF user_id, title, description, category ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, owner, title, description, category) "
+    "VALUES ('delete', old.id, 'u' || old.user_id, old.title, coalesce(old.description, ''), coalesce(old.category, '')); "
+    "INSERT INTO task_fts(rowid, owner, title, description, category) "
+    "VALUES (new.id, 'u' || new.user_id, new.title, coalesce(new.description, ''), coalesce(new.category, '')); "
+    "END",
+
+    "INSERT INTO task_fts(rowid, owner, title, description, category) "
+    "SELECT id, 'u' || user_id, title, coalesce(description, ''), coalesce(category, '') FROM task",
+)
+
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER task_fts_update",
+    "DROP TRIGGER task_fts_delete",
+    "DROP TRIGGER task_fts_insert",
+    "DROP TABLE task_fts",
+)
+
+POSTGRESQL_UPGRADE = (
+    "ALTER TABLE task ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')) STORED",
+
+    "CREATE INDEX ix_task_search ON task USING gin (search_vector)",
+)
+
+POSTGRESQL_DOWNGRADE = (
+    "DROP INDEX ix_task_search",
+    "ALTER TABLE task DROP COLUMN search_vector",
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in {'sqlite': SQLITE_UPGRADE, 'postgresql': POSTGRESQL_UPGRADE}.get(dialect, ()):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in {'sqlite': SQLITE_DOWNGRADE, 'postgresql': POSTGRESQL_DOWNGRADE}.get(dialect, ()):
+        op.execute(statement)
@@ -0,0 +1,33 @@
+"""Never reuse coin transaction ids on SQLite
+
+Revision ID: 0010_coin_transaction_autoincrement
+Revises: 0009_archive
+Create Date: 2026-10-18 09:12:40.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_coin_transaction_autoincrement'
+down_revision = '0009_archive'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Without AUTOINCREMENT SQLite hands out max(id) + 1, so once compact()
+    # empties the table new rows would fall under a snapshot's through_id.
+    # Other databases use sequences and need nothing.
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('coin_transaction', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+            pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('coin_transaction', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+            pass
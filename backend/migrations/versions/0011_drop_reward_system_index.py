@@ -0,0 +1,27 @@
+"""Drop the unused partial index on system rewards
+
+Revision ID: 0011_drop_reward_system_index
+Revises: 0010_coin_transaction_autoincrement
+Create Date: 2026-10-18 09:40:02.531877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_drop_reward_system_index'
+down_revision = '0010_coin_transaction_autoincrement'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ix_reward_user already serves user_id IS NULL; the planner never picked this one
+    with op.batch_alter_table('reward', schema=None) as batch_op:
+        batch_op.drop_index('ix_reward_system', sqlite_where=sa.text('user_id IS NULL'), postgresql_where=sa.text('user_id IS NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('reward', schema=None) as batch_op:
+        batch_op.create_index('ix_reward_system', ['id'], unique=False, sqlite_where=sa.text('user_id IS NULL'), postgresql_where=sa.text('user_id IS NULL'))
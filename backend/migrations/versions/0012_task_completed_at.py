@@ -0,0 +1,29 @@
+"""Task completion timestamp
+
+Revision ID: 0012_task_completed_at
+Revises: 0011_drop_reward_system_index
+Create Date: 2026-10-18 11:02:47.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012_task_completed_at'
+down_revision = '0011_drop_reward_system_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain ALTER TABLE rather than a batch copy, which would drop the
+    # task_fts triggers along with the old table
+    op.add_column('task', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    # The completion time of older tasks is unknown; created_at is what the
+    # rebuilds used for them until now
+    op.execute("UPDATE task SET completed_at = created_at WHERE completed = true")
+
+
+def downgrade():
+    op.drop_column('task', 'completed_at')
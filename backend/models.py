@@ -0,0 +1,228 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+
+db = SQLAlchemy()
+
+# Models
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password = db.Column(db.String(120), nullable=False)
+    coins = db.Column(db.Integer, default=0)
+    is_premium = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    tasks = db.relationship('Task', backref='user', lazy=True)
+    habits = db.relationship('Habit', backref='user', lazy=True)
+    rewards = db.relationship('Reward', backref='user', lazy=True)
+    pomodoro_sessions = db.relationship('PomodoroSession', backref='user', lazy=True)
+
+class Task(db.Model):
+    # Each /api/tasks filter is a prefix of one of these, followed by the
+    # (created_at, id) pagination key
+    __table_args__ = (
+        db.Index('ix_task_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_task_user_completed_created', 'user_id', 'completed', 'created_at', 'id'),
+        db.Index('ix_task_user_category_created', 'user_id', 'category', 'created_at', 'id'),
+        db.Index('ix_task_user_priority_created', 'user_id', 'priority', 'created_at', 'id'),
+        db.Index('ix_task_user_due', 'user_id', 'due_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    completed = db.Column(db.Boolean, default=False)
+    coins_reward = db.Column(db.Integer, default=10)
+    due_date = db.Column(db.DateTime)
+    priority = db.Column(db.String(20), default='medium')
+    category = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Set when the task is completed; the counters date completions by it
+    completed_at = db.Column(db.DateTime)
+
+class Habit(db.Model):
+    __table_args__ = (
+        db.Index('ix_habit_user', 'user_id'),
+        # The reminder scheduler polls for rows changed since its last sync
+        db.Index('ix_habit_updated', 'updated_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    streak = db.Column(db.Integer, default=0)
+    target_days = db.Column(db.Integer, default=1)
+    reminder_time = db.Column(db.Time)
+    last_completed = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Reward(db.Model):
+    __table_args__ = (
+        # Serves both a user's own rewards and the system catalog (user_id IS NULL)
+        db.Index('ix_reward_user', 'user_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    name = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    coins_cost = db.Column(db.Integer, nullable=False)
+    is_premium = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class PomodoroSession(db.Model):
+    __table_args__ = (
+        db.Index('ix_pomodoro_session_user_start', 'user_id', 'start_time'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime)
+    duration = db.Column(db.Integer, nullable=False)  # in minutes
+    completed = db.Column(db.Boolean, default=False)
+
+class LeaderboardEntry(db.Model):
+    # Materialized per-user counters for one leaderboard period bucket
+    # (e.g. the week starting on a given Monday). Maintained incrementally
+    # by the completion routes, see leaderboard.py.
+    __tablename__ = 'leaderboard_entry'
+    __table_args__ = (
+        db.UniqueConstraint('period', 'bucket', 'user_id', name='uq_leaderboard_entry_user'),
+        db.Index('ix_leaderboard_entry_rank', 'period', 'bucket', 'tasks_completed', 'total_streak'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    period = db.Column(db.String(20), nullable=False)  # weekly, monthly, all-time
+    bucket = db.Column(db.Date, nullable=False)  # start of the period
+    tasks_completed = db.Column(db.Integer, nullable=False, default=0)
+    total_streak = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CatalogVersion(db.Model):
+    # Bumped in the same transaction as any change to a shared catalog, so
+    # every process can tell its in-memory copy is stale, see catalog.py
+    __tablename__ = 'catalog_version'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class HabitCheckin(db.Model):
+    # Check-in log, one row per habit and month: bit d-1 of ``days`` is set
+    # when the habit was done on day d. Read in bulk by analytics.py; the
+    # unique key leads with user_id so it also serves those reads.
+    __tablename__ = 'habit_checkin'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'habit_id', 'month', name='uq_habit_checkin_user_habit_month'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    habit_id = db.Column(db.Integer, db.ForeignKey('habit.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    month = db.Column(db.Date, nullable=False)  # first day of the month
+    days = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyStat(db.Model):
+    # Per-user, per-day activity rollup read by /api/progress. Maintained
+    # incrementally by the write routes, see rollups.py.
+    __tablename__ = 'daily_stat'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uq_daily_stat_user_day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    tasks_created = db.Column(db.Integer, nullable=False, default=0)
+    tasks_completed = db.Column(db.Integer, nullable=False, default=0)
+    pomodoro_sessions = db.Column(db.Integer, nullable=False, default=0)
+    pomodoro_completed = db.Column(db.Integer, nullable=False, default=0)
+    pomodoro_minutes = db.Column(db.Integer, nullable=False, default=0)
+    habit_checkins = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CoinTransaction(db.Model):
+    # Append-only coin ledger; User.coins is the running balance. Old rows
+    # are folded into CoinSnapshot by ledger.compact(). Ids must never be
+    # reused once compacted away (snapshots cover ``id <= through_id``),
+    # which SQLite only guarantees with AUTOINCREMENT.
+    __tablename__ = 'coin_transaction'
+    __table_args__ = (
+        db.Index('ix_coin_transaction_user', 'user_id', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    amount = db.Column(db.Integer, nullable=False)  # positive earns, negative spends
+    reason = db.Column(db.String(20), nullable=False)  # task, pomodoro, habit, redeem
+    ref_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class CoinSnapshot(db.Model):
+    # Balance of all ledger rows up to and including through_id
+    __tablename__ = 'coin_snapshot'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    balance = db.Column(db.Integer, nullable=False, default=0)
+    through_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Job(db.Model):
+    # Durable background job queue, see jobs.py. Rows are deleted once
+    # their handler commits; failed rows stay for inspection.
+    __tablename__ = 'job'
+    __table_args__ = (
+        db.Index('ix_job_claim', 'status', 'run_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class ArchiveSegment(db.Model):
+    # Pomodoro sessions and completed tasks moved out of the hot tables, one
+    # row per entity, user and month of an archive run, see archive.py.
+    # ``data`` holds the rows column by column as zlib-compressed JSON.
+    __tablename__ = 'archive_segment'
+    __table_args__ = (
+        db.Index('ix_archive_segment_user', 'entity', 'user_id', 'month', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # tasks, pomodoro
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    month = db.Column(db.Date, nullable=False)  # first day of the month
+    row_count = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class ArchiveRollup(db.Model):
+    # What archived rows contributed to the daily rollups, per user and day.
+    # The rebuilds only see the hot tables and add these back.
+    __tablename__ = 'archive_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uq_archive_rollup_user_day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    tasks_created = db.Column(db.Integer, nullable=False, default=0)
+    tasks_completed = db.Column(db.Integer, nullable=False, default=0)
+    pomodoro_sessions = db.Column(db.Integer, nullable=False, default=0)
+    pomodoro_completed = db.Column(db.Integer, nullable=False, default=0)
+    pomodoro_minutes = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,54 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row on the previous page, encoded as
+URL-safe base64 JSON. The next page is then a range scan starting right
+after that key instead of an OFFSET that re-reads every skipped row.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id):
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor(cursor)
+
+
+def after(created_col, id_col, cursor):
+    """Filter for rows sorting after the cursor on (created_at, id)."""
+    created_at, row_id = decode_cursor(cursor)
+    return or_(created_col > created_at, and_(created_col == created_at, id_col > row_id))
+
+
+def parse_limit(value, default, maximum):
+    try:
+        limit = int(value) if value is not None else default
+    except ValueError:
+        return default
+    return max(1, min(limit, maximum))
+
+
+def parse_bool(value):
+    if value is None:
+        return None
+    value = value.lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    raise ValueError(value)
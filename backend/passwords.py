@@ -0,0 +1,79 @@
+"""bcrypt hashing on a bounded, dedicated executor.
+
+bcrypt releases the GIL while it works, so running it on a small pool of
+its own caps how many cores password checks can take at once; the request
+threads waiting on it leave the rest of the CPU to regular API traffic.
+When the pool and its queue are full, new work is refused with
+``HasherBusy`` instead of piling up behind a login storm.
+
+``BCRYPT_ROUNDS`` sets the work factor. Hashes made with a different cost
+are upgraded transparently on the next successful login. bcrypt itself is
+imported by the first hash or check, so processes that never see a login
+don't load it.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class HasherBusy(RuntimeError):
+    pass
+
+
+def _as_bytes(value):
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def hash_cost(hashed):
+    # $2b$<cost>$<salt+hash>
+    try:
+        return int(_as_bytes(hashed).split(b'$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.timeout = None
+        self._executor = None
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('BCRYPT_ROUNDS', 12)
+        app.config.setdefault('BCRYPT_WORKERS', max(1, (os.cpu_count() or 2) // 2))
+        app.config.setdefault('BCRYPT_QUEUE_SIZE', 32)
+        app.config.setdefault('BCRYPT_TIMEOUT', 10)
+
+        self.rounds = app.config['BCRYPT_ROUNDS']
+        self.timeout = app.config['BCRYPT_TIMEOUT']
+        workers = app.config['BCRYPT_WORKERS']
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + app.config['BCRYPT_QUEUE_SIZE'])
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy('Password hashing is saturated')
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout=self.timeout)
+
+    def hash(self, password):
+        import bcrypt
+        return self._run(lambda pw: bcrypt.hashpw(pw, bcrypt.gensalt(self.rounds)), _as_bytes(password))
+
+    def verify(self, password, hashed):
+        """Return ``(matches, needs_rehash)``."""
+        import bcrypt
+        hashed = _as_bytes(hashed)
+        matches = self._run(bcrypt.checkpw, _as_bytes(password), hashed)
+        return matches, matches and hash_cost(hashed) != self.rounds
+
+
+hasher = PasswordHasher()
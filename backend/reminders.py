@@ -0,0 +1,236 @@
+"""Habit reminder scheduler.
+
+Reminders are daily, so upcoming reminders live in a timing wheel of 1440
+one-minute slots keyed by ``Habit.reminder_time`` (UTC, like every other
+timestamp in the app). Each tick walks only the slots for the minutes that
+passed since the previous tick, skips habits already completed that day
+and hands the rest to a sink in batches.
+
+The wheel is filled once with a keyset-paginated scan of habits that have a
+reminder, then kept current by polling ``Habit.updated_at`` (indexed), so
+habit creates, edits and completions are applied without a full reload.
+
+    python reminders.py        # REMINDER_SINK=log|webhook, REMINDER_WEBHOOK_URL=...
+
+``benchmarks.reminders`` replays a simulated day for a million habits and
+reports dispatch lateness.
+"""
+import json
+import logging
+import os
+import time
+import urllib.request
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from models import db, Habit
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+LOAD_CHUNK = 10000
+# How far back a stopped scheduler catches up on missed minutes
+MAX_CATCH_UP = timedelta(hours=1)
+# Rows stamped just before the watermark can commit after it was read, so
+# every sync re-reads this window; applying a row twice is harmless
+SYNC_OVERLAP = timedelta(minutes=1)
+
+Reminder = namedtuple('Reminder', 'habit_id user_id name due_at')
+HABIT_COLUMNS = (Habit.id, Habit.user_id, Habit.name, Habit.reminder_time, Habit.last_completed, Habit.updated_at)
+
+
+def _slot(reminder_time):
+    return reminder_time.hour * 60 + reminder_time.minute
+
+
+class LogSink:
+    def send(self, reminders):
+        logger.info('Dispatching %d reminders, first: habit %s for user %s',
+                    len(reminders), reminders[0].habit_id, reminders[0].user_id)
+
+
+class WebhookSink:
+    """POSTs each batch as JSON to ``url``, a stand-in for a push provider."""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, reminders):
+        body = json.dumps({'reminders': [
+            {'habit_id': r.habit_id, 'user_id': r.user_id, 'name': r.name, 'due_at': r.due_at.isoformat()}
+            for r in reminders
+        ]}).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class Lateness:
+    """Dispatch delay after the due minute, as counts per millisecond."""
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+
+    def record(self, seconds, count):
+        bucket = max(0, int(seconds * 1000)) / 1000
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += count
+
+    def percentile(self, pct):
+        threshold = self.total * pct / 100
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return bucket
+        return 0.0
+
+    def summary(self):
+        if not self.total:
+            return {'count': 0}
+        return {'count': self.total, 'p50_s': self.percentile(50), 'p99_s': self.percentile(99),
+                'max_s': max(self.counts)}
+
+
+class ReminderScheduler:
+    def __init__(self, sink, batch_size=500, clock=datetime.utcnow):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.clock = clock
+        self.wheel = [{} for _ in range(MINUTES_PER_DAY)]  # slot -> {habit_id: (user_id, name)}
+        self.slots = {}  # habit_id -> slot
+        self.completed_on = {}  # habit_id -> date of its last completion
+        self.watermark = None
+        self.last_minute = None
+        self.lateness = Lateness()
+
+    def __len__(self):
+        return len(self.slots)
+
+    # Keeping the wheel current
+    def apply(self, rows):
+        """Add, move or drop habits from ``HABIT_COLUMNS`` rows."""
+        for habit_id, user_id, name, reminder_time, last_completed, _ in rows:
+            old = self.slots.pop(habit_id, None)
+            if old is not None:
+                del self.wheel[old][habit_id]
+            if reminder_time is None:
+                self.completed_on.pop(habit_id, None)
+                continue
+            slot = _slot(reminder_time)
+            self.wheel[slot][habit_id] = (user_id, name)
+            self.slots[habit_id] = slot
+            if last_completed is not None:
+                self.completed_on[habit_id] = last_completed.date()
+
+    def load(self, session):
+        """Fill the wheel from the database in keyset-paginated chunks."""
+        # Anything changed while loading is picked up by the first sync
+        self.watermark = datetime.utcnow()
+        last_id = 0
+        while True:
+            rows = session.execute(
+                select(*HABIT_COLUMNS)
+                .where(Habit.id > last_id, Habit.reminder_time.isnot(None))
+                .order_by(Habit.id)
+                .limit(LOAD_CHUNK)
+            ).all()
+            if not rows:
+                break
+            self.apply(rows)
+            last_id = rows[-1][0]
+            session.rollback()
+        return len(self)
+
+    def sync(self, session):
+        """Apply habits created or changed since the last load or sync."""
+        rows = session.execute(
+            select(*HABIT_COLUMNS)
+            .where(Habit.updated_at >= self.watermark - SYNC_OVERLAP)
+            .order_by(Habit.updated_at)
+        ).all()
+        session.rollback()
+        if rows:
+            self.apply(rows)
+            self.watermark = max(self.watermark, max(row[-1] for row in rows))
+        return len(rows)
+
+    # Dispatching
+    def tick(self, now=None):
+        """Dispatch every reminder due in the minutes up to ``now``."""
+        now = (now or self.clock()).replace(second=0, microsecond=0)
+        if self.last_minute is None:
+            self.last_minute = now - timedelta(minutes=1)
+        elif now - self.last_minute > MAX_CATCH_UP:
+            # Replay the most recent minutes only; older reminders are stale
+            self.last_minute = now - MAX_CATCH_UP
+
+        dispatched = 0
+        batch = []
+        minute = self.last_minute + timedelta(minutes=1)
+        while minute <= now:
+            today = minute.date()
+            for habit_id, (user_id, name) in self.wheel[minute.hour * 60 + minute.minute].items():
+                if self.completed_on.get(habit_id) == today:
+                    continue
+                batch.append(Reminder(habit_id, user_id, name, minute))
+                if len(batch) >= self.batch_size:
+                    dispatched += self._send(batch)
+                    batch = []
+            self.last_minute = minute
+            minute += timedelta(minutes=1)
+        if batch:
+            dispatched += self._send(batch)
+        return dispatched
+
+    def _send(self, batch):
+        try:
+            self.sink.send(batch)
+        except Exception:
+            logger.exception('Reminder sink failed, dropping %d reminders', len(batch))
+            return 0
+        sent_at = self.clock()
+        for due_at, count in Counter(r.due_at for r in batch).items():
+            self.lateness.record((sent_at - due_at).total_seconds(), count)
+        return len(batch)
+
+
+def make_sink():
+    kind = os.getenv('REMINDER_SINK', 'log')
+    if kind == 'log':
+        return LogSink()
+    if kind == 'webhook':
+        return WebhookSink(os.environ['REMINDER_WEBHOOK_URL'])
+    raise SystemExit('REMINDER_SINK must be one of: log, webhook')
+
+
+def run(app, scheduler, sync_seconds=5.0):
+    with app.app_context():
+        loaded = scheduler.load(db.session)
+        logger.info('Loaded %d habit reminders', loaded)
+        while True:
+            scheduler.sync(db.session)
+            scheduler.tick()
+            time.sleep(sync_seconds)
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    from app import create_app
+
+    app = create_app(blueprints=(), migrations=False)
+    scheduler = ReminderScheduler(make_sink(), batch_size=int(os.getenv('REMINDER_BATCH_SIZE', 500)))
+    try:
+        run(app, scheduler, float(os.getenv('REMINDER_SYNC_SECONDS', 5)))
+    except KeyboardInterrupt:
+        logger.info('Dispatch lateness: %s', scheduler.lateness.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Per-user daily activity rollups.
+
+Each write route adds its contribution to the user's DailyStat row for the
+current UTC day, so /api/progress sums at most one row per day in the
+requested timeframe instead of scanning tasks and pomodoro sessions.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+import archive
+import counters
+from models import db, Task, Habit, PomodoroSession, DailyStat, ArchiveRollup
+
+TIMEFRAME_DAYS = {'weekly': 7, 'monthly': 30}
+COUNTERS = ('tasks_created', 'tasks_completed', 'pomodoro_sessions',
+            'pomodoro_completed', 'pomodoro_minutes', 'habit_checkins')
+
+
+def record(user_id, now=None, **deltas):
+    """Add ``deltas`` to today's rollup row, inside the caller's transaction."""
+    day = (now or datetime.utcnow()).date()
+    counters.increment(DailyStat, {'user_id': user_id, 'day': day}, **deltas)
+
+
+def window_start(timeframe, today=None):
+    today = today or datetime.utcnow().date()
+    if timeframe in TIMEFRAME_DAYS:
+        return today - timedelta(days=TIMEFRAME_DAYS[timeframe] - 1)
+    return None
+
+
+def summarize(user_id, timeframe):
+    """Totals and the per-day series for a timeframe."""
+    start = window_start(timeframe)
+    filters = [DailyStat.user_id == user_id]
+    if start is not None:
+        filters.append(DailyStat.day >= start)
+
+    totals = db.session.query(*[func.coalesce(func.sum(getattr(DailyStat, name)), 0).label(name)
+                                for name in COUNTERS]).filter(*filters).one()
+    days = db.session.query(DailyStat.day, DailyStat.tasks_completed)\
+        .filter(*filters, DailyStat.tasks_completed > 0)\
+        .order_by(DailyStat.day)\
+        .all()
+
+    return totals._asdict(), days
+
+
+def _as_date(value):
+    # SQLite returns func.date() as a string
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def rebuild():
+    """Recompute every rollup row from the raw tables.
+
+    Tasks count as created on their created_at day and as completed on
+    their completed_at day, as the live updates do. Habits only keep their last check-in, so history
+    before it is not recoverable and each habit contributes one check-in.
+    Archived rows are added back from their archive_rollup counts.
+    """
+    totals = {}
+
+    def add(rows, column):
+        for user_id, day, value in rows:
+            key = (user_id, _as_date(day))
+            totals.setdefault(key, dict.fromkeys(COUNTERS, 0))[column] += value or 0
+
+    task_day = func.date(Task.created_at)
+    add(db.session.query(Task.user_id, task_day, func.count(Task.id))
+        .group_by(Task.user_id, task_day), 'tasks_created')
+    completion_day = func.date(Task.completed_at)
+    add(db.session.query(Task.user_id, completion_day, func.count(Task.id))
+        .filter(Task.completed == True)
+        .group_by(Task.user_id, completion_day), 'tasks_completed')
+
+    session_day = func.date(PomodoroSession.start_time)
+    add(db.session.query(PomodoroSession.user_id, session_day, func.count(PomodoroSession.id))
+        .group_by(PomodoroSession.user_id, session_day), 'pomodoro_sessions')
+    completed_day = func.date(func.coalesce(PomodoroSession.end_time, PomodoroSession.start_time))
+    completed = db.session.query(PomodoroSession.user_id, completed_day,
+                                 func.count(PomodoroSession.id), func.sum(PomodoroSession.duration))\
+        .filter(PomodoroSession.completed == True)\
+        .group_by(PomodoroSession.user_id, completed_day)\
+        .all()
+    add([(user_id, day, count) for user_id, day, count, _ in completed], 'pomodoro_completed')
+    add([(user_id, day, minutes) for user_id, day, _, minutes in completed], 'pomodoro_minutes')
+
+    habit_day = func.date(Habit.last_completed)
+    add(db.session.query(Habit.user_id, habit_day, func.count(Habit.id))
+        .filter(Habit.last_completed != None)
+        .group_by(Habit.user_id, habit_day), 'habit_checkins')
+
+    archived = db.session.query(ArchiveRollup.user_id, ArchiveRollup.day,
+                                *[getattr(ArchiveRollup, name) for name in archive.COUNTERS]).all()
+    for i, name in enumerate(archive.COUNTERS, 2):
+        add([(row[0], row[1], row[i]) for row in archived if row[i]], name)
+
+    DailyStat.query.delete()
+    now = datetime.utcnow()
+    rows = [dict(values, user_id=user_id, day=day, updated_at=now)
+            for (user_id, day), values in totals.items()]
+    if rows:
+        db.session.execute(DailyStat.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1 @@
+"""API blueprints, one per domain; ``app.BLUEPRINTS`` maps names to modules."""
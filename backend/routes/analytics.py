@@ -0,0 +1,129 @@
+"""Progress, leaderboard and export routes, and the history maintenance commands.
+
+Like the habit routes, ``progress_report`` imports ``analytics`` (numpy) on
+first use.
+"""
+from datetime import timedelta
+
+import click
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+import archive
+import export
+import leaderboard
+import rollups
+from cache import response_cache
+from models import db, User
+
+bp = Blueprint('analytics', __name__, url_prefix='/api', cli_group=None)
+
+def progress_report(user_id, timeframe, coins):
+    """The /api/progress body for ``timeframe`` (weekly, monthly, all-time)."""
+    import analytics
+    
+    # Task and pomodoro numbers come from the daily rollups
+    totals, daily_tasks = rollups.summarize(user_id, timeframe)
+    
+    # Streaks and completion rates from the check-in log
+    habits, habit_completion = analytics.progress(user_id, rollups.TIMEFRAME_DAYS.get(timeframe))
+    
+    # Completions are dated by completed_at, so older tasks finished in the
+    # window can outnumber the tasks created in it; the rate stays a ratio
+    created, completed = totals['tasks_created'], totals['tasks_completed']
+    
+    return {
+        'tasks': {
+            'total': created,
+            'completed': completed,
+            'completion_rate': min(completed / created, 1.0) if created else 0
+        },
+        'habits': habits,
+        'pomodoro': {
+            'total_sessions': totals['pomodoro_sessions'],
+            'completed_sessions': totals['pomodoro_completed'],
+            'total_minutes': totals['pomodoro_minutes'],
+            'average_session_length': totals['pomodoro_minutes'] / totals['pomodoro_completed'] if totals['pomodoro_completed'] else 0
+        },
+        'daily_tasks': [{
+            'date': str(day),
+            'count': count
+        } for day, count in daily_tasks],
+        'habit_completion': habit_completion,
+        'total_coins_earned': coins or 0
+    }
+
+# Progress and Analytics routes
+@bp.route('/progress', methods=['GET'])
+@jwt_required()
+def get_progress():
+    user_id = get_jwt_identity()
+    timeframe = request.args.get('timeframe', 'weekly')  # weekly, monthly, all-time
+    coins = db.session.query(User.coins).filter_by(id=user_id).scalar()
+    return jsonify(progress_report(user_id, timeframe, coins))
+
+@bp.cli.command('rebuild-rollups')
+def rebuild_rollups():
+    """Backfill the daily progress rollups from the raw activity tables."""
+    count = rollups.rebuild()
+    print(f'Rebuilt {count} daily rollup rows')
+
+# Export routes
+@bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_history():
+    user_id = get_jwt_identity()
+    try:
+        entities, fmt = export.parse(request.args.get('entities'), request.args.get('format', 'ndjson'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Rows are streamed from a server-side cursor; nothing is buffered per user
+    chunks = export.stream(db.session, entities, fmt, user_id=user_id)
+    headers = {'Content-Disposition': f'attachment; filename=export.{fmt}', 'Vary': 'Accept-Encoding'}
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        chunks = export.gzip_stream(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(stream_with_context(chunks), mimetype=export.MIMETYPES[fmt], headers=headers)
+
+@bp.cli.command('export-all')
+@click.option('--out', required=True, type=click.Path(file_okay=False), help='Directory for the export files.')
+@click.option('--entities', default=','.join(export.ENTITIES), show_default=True)
+@click.option('--format', 'fmt', default='ndjson', type=click.Choice(export.FORMATS), show_default=True)
+@click.option('--chunk-size', default=1000, show_default=True, help='Users per file.')
+@click.option('--workers', default=4, show_default=True, help='Parallel export threads.')
+def export_all(out, entities, fmt, chunk_size, workers):
+    """Export every user's history as gzipped files, chunked by user id."""
+    try:
+        entities = export.parse_entities(entities)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    paths = export.export_all(db.engine, out, entities, fmt, chunk_size, workers)
+    print(f'Wrote {len(paths)} files to {out}')
+
+# Leaderboard routes
+@bp.route('/leaderboard')
+@jwt_required()
+def get_leaderboard():
+    timeframe = request.args.get('timeframe', 'weekly')  # weekly, monthly, all-time
+    limit = request.args.get('limit', 10, type=int)
+    
+    return jsonify(leaderboard.get_leaderboard(timeframe, user_id=get_jwt_identity(), limit=limit))
+
+@bp.cli.command('archive')
+@click.option('--days', type=int, help='Archive rows older than this many days [default: ARCHIVE_AFTER_DAYS].')
+@click.option('--batch-size', default=archive.BATCH_SIZE, show_default=True, help='Rows moved per transaction.')
+def archive_history(days, batch_size):
+    """Move old pomodoro sessions and completed tasks to the archive."""
+    days = days or current_app.config['ARCHIVE_AFTER_DAYS']
+    moved, user_ids = archive.archive(timedelta(days=days), batch_size)
+    for user_id in user_ids:
+        response_cache.invalidate(user_id, 'tasks', 'pomodoro')
+    print(f"Archived {moved['tasks']} tasks and {moved['pomodoro']} pomodoro sessions older than {days} days")
+
+@bp.cli.command('rebuild-leaderboard')
+def rebuild_leaderboard():
+    """Backfill the materialized leaderboard from the task and habit tables."""
+    leaderboard.rebuild()
+    print('Leaderboard rebuilt')
@@ -0,0 +1,158 @@
+"""Account routes: registration, login, profile and the premium upgrade."""
+import os
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import create_access_token, current_user, get_jwt_identity, jwt_required
+from sqlalchemy import update
+
+import identity
+import serializers
+from cache import response_cache
+from models import db, User
+from passwords import hasher, HasherBusy
+from throttle import AttemptThrottle
+
+bp = Blueprint('auth', __name__, url_prefix='/api', cli_group=None)
+
+# Login throttles, checked before any bcrypt work. Only failed attempts
+# count, so many users behind one NAT don't lock each other out.
+login_ip_throttle = AttemptThrottle(limit=int(os.getenv('LOGIN_IP_LIMIT', 30)), window=60)
+login_account_throttle = AttemptThrottle(limit=int(os.getenv('LOGIN_ACCOUNT_LIMIT', 5)), window=300)
+
+@bp.errorhandler(HasherBusy)
+def handle_hasher_busy(e):
+    response = jsonify({'error': 'Server busy, please retry'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+# Authentication routes
+@bp.route('/register', methods=['POST'])
+def register():
+    data = request.get_json()
+    
+    if User.query.filter_by(email=data['email']).first():
+        return jsonify({'error': 'Email already registered'}), 400
+    
+    if User.query.filter_by(username=data['username']).first():
+        return jsonify({'error': 'Username already taken'}), 400
+    
+    # Hash password
+    hashed = hasher.hash(data['password'])
+    
+    new_user = User(
+        username=data['username'],
+        email=data['email'],
+        password=hashed
+    )
+    
+    db.session.add(new_user)
+    db.session.commit()
+    
+    access_token = create_access_token(identity=new_user.id, additional_claims=identity.claims_for(new_user))
+    return jsonify({
+        'token': access_token,
+        'user': {
+            'id': new_user.id,
+            'username': new_user.username,
+            'email': new_user.email,
+            'is_premium': new_user.is_premium
+        }
+    }), 201
+
+@bp.route('/login', methods=['POST'])
+def login():
+    data = request.get_json()
+    ip = request.remote_addr
+    # Case and surrounding spaces must not reset the account's attempts
+    account = data['email'].strip().lower()
+    
+    retry_after = max(login_ip_throttle.retry_after(ip), login_account_throttle.retry_after(account))
+    if retry_after:
+        response = jsonify({'error': 'Too many login attempts'})
+        response.headers['Retry-After'] = str(retry_after)
+        return response, 429
+    
+    user = User.query.filter_by(email=data['email']).first()
+    matches, needs_rehash = hasher.verify(data['password'], user.password) if user else (False, False)
+    
+    if matches:
+        login_account_throttle.reset(account)
+        if needs_rehash:
+            # Work factor changed since this hash was made
+            user.password = hasher.hash(data['password'])
+            db.session.commit()
+        
+        access_token = create_access_token(identity=user.id, additional_claims=identity.claims_for(user))
+        return jsonify({
+            'token': access_token,
+            'user': {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'is_premium': user.is_premium
+            }
+        }), 200
+    
+    login_ip_throttle.hit(ip)
+    login_account_throttle.hit(account)
+    return jsonify({'error': 'Invalid credentials'}), 401
+
+# Premium upgrade route (without payment integration)
+@bp.route('/premium/upgrade', methods=['POST'])
+@jwt_required()
+def upgrade_to_premium():
+    user_id = get_jwt_identity()
+    
+    # Flipped in one guarded update, so the user row is never loaded
+    upgraded = db.session.execute(
+        update(User)
+        .where(User.id == user_id, User.is_premium == False)
+        .values(is_premium=True),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    if not upgraded:
+        return jsonify({'error': 'User is already premium'}), 400
+    
+    db.session.commit()
+    response_cache.invalidate(user_id, 'profile')
+    claims = {'premium': True}
+    identity.refresh(user_id, claims)
+    
+    return jsonify({
+        'message': 'Successfully upgraded to premium',
+        'is_premium': True,
+        'token': create_access_token(identity=user_id, additional_claims=claims)
+    })
+
+# User profile routes
+@bp.route('/user/profile', methods=['GET', 'PUT'])
+@jwt_required()
+@response_cache.cached('profile')
+def handle_profile():
+    user_id = get_jwt_identity()
+    user = current_user.user
+    
+    if request.method == 'GET':
+        return jsonify(serializers.PROFILE.dump(user))
+    
+    data = request.get_json()
+    if 'username' in data and data['username'] != user.username:
+        if User.query.filter_by(username=data['username']).first():
+            return jsonify({'error': 'Username already taken'}), 400
+        user.username = data['username']
+    
+    if 'email' in data and data['email'] != user.email:
+        if User.query.filter_by(email=data['email']).first():
+            return jsonify({'error': 'Email already taken'}), 400
+        user.email = data['email']
+    
+    if 'current_password' in data and 'new_password' in data:
+        matches, _ = hasher.verify(data['current_password'], user.password)
+        if not matches:
+            return jsonify({'error': 'Current password is incorrect'}), 400
+        user.password = hasher.hash(data['new_password'])
+    
+    db.session.commit()
+    response_cache.invalidate(user_id, 'profile')
+    identity.refresh(user_id, identity.claims_for(user))
+    return jsonify({'message': 'Profile updated successfully'})
@@ -0,0 +1,78 @@
+"""Dashboard route: the app's first-screen data in one request.
+
+``GET /api/dashboard?sections=profile,tasks,progress`` returns one key per
+requested section (all of ``SECTIONS`` by default), each shaped like the
+response of the route it stands in for. The JWT is checked and the ``User``
+row loaded once; the other sections run concurrently through
+``dashboard.loader``. Lists are capped per section with ``<section>_limit``
+(see ``LIMITS``); ``tasks`` carries a ``next_cursor`` for /api/tasks and
+``habits`` a ``has_more`` flag. ``timeframe`` is passed on to ``progress``.
+"""
+from functools import partial
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import current_user, get_jwt_identity, jwt_required
+from sqlalchemy import select
+
+import pagination
+import serializers
+from dashboard import loader
+from models import db, Habit, PomodoroSession
+from routes.analytics import progress_report
+from routes.tasks import DEFAULT_TASK_FIELDS, task_page
+
+bp = Blueprint('dashboard', __name__, url_prefix='/api', cli_group=None)
+
+SECTIONS = ('profile', 'tasks', 'habits', 'pomodoro', 'progress')
+# section -> (default, maximum) number of items
+LIMITS = {
+    'tasks': (20, 100),
+    'habits': (50, 200),
+    'pomodoro': (10, 50),
+}
+
+def habits_section(user_id, limit):
+    rows = db.session.execute(
+        select(*serializers.HABIT.columns()).where(Habit.user_id == user_id)
+        .order_by(Habit.id).limit(limit + 1)
+    ).all()
+    return {'habits': serializers.HABIT.rows(rows[:limit]), 'has_more': len(rows) > limit}
+
+def pomodoro_section(user_id, limit):
+    rows = db.session.execute(
+        select(*serializers.POMODORO.columns())
+        .where(PomodoroSession.user_id == user_id)
+        .order_by(PomodoroSession.start_time.desc())
+        .limit(limit)
+    ).all()
+    return {'sessions': serializers.POMODORO.rows(rows)}
+
+@bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    user_id = get_jwt_identity()
+    args = request.args
+    
+    sections = tuple(s for s in args['sections'].split(',') if s) if args.get('sections') else SECTIONS
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        return jsonify({'error': f"Unknown sections: {', '.join(sorted(unknown))}"}), 400
+    limits = {name: pagination.parse_limit(args.get(f'{name}_limit'), *bounds) for name, bounds in LIMITS.items()}
+    
+    # The one User load, shared by the profile and progress sections
+    user = current_user.user
+    if user is None:
+        return jsonify({'error': 'User not found'}), 404
+    
+    # Everything below only needs the user id (and coins), so the sections run concurrently
+    queries = {
+        'tasks': partial(task_page, user_id, DEFAULT_TASK_FIELDS, [], limit=limits['tasks']),
+        'habits': partial(habits_section, user_id, limits['habits']),
+        'pomodoro': partial(pomodoro_section, user_id, limits['pomodoro']),
+        'progress': partial(progress_report, user_id, args.get('timeframe', 'weekly'), user.coins),
+    }
+    results = loader.run({name: queries[name] for name in sections if name in queries})
+    if 'profile' in sections:
+        results['profile'] = serializers.PROFILE.dump(user)
+    
+    return jsonify({name: results[name] for name in sections})
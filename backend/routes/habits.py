@@ -0,0 +1,86 @@
+"""Habit routes.
+
+``analytics`` pulls in numpy, so it is imported by the first request that
+needs it rather than with the blueprint.
+"""
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import select
+
+import effects
+import serializers
+from cache import response_cache
+from models import db, Habit
+
+bp = Blueprint('habits', __name__, url_prefix='/api', cli_group=None)
+
+def utc_today():
+    # Part of the stats cache key: current streaks, the heatmap window and
+    # the rolling rates move at midnight even when no habit was written
+    return datetime.utcnow().date().isoformat()
+
+# Habit routes
+@bp.route('/habits', methods=['GET', 'POST'])
+@jwt_required()
+@response_cache.cached('habits')
+def handle_habits():
+    user_id = get_jwt_identity()
+    
+    if request.method == 'POST':
+        data = request.get_json()
+        habit = Habit(
+            user_id=user_id,
+            name=data['name'],
+            description=data.get('description'),
+            target_days=data.get('target_days', 1),
+            reminder_time=datetime.strptime(data['reminder_time'], '%H:%M').time() if 'reminder_time' in data else None
+        )
+        db.session.add(habit)
+        db.session.commit()
+        response_cache.invalidate(user_id, 'habits')
+        return jsonify(serializers.HABIT.dump(habit, ('id', 'name', 'streak'))), 201
+    
+    habits = db.session.execute(
+        select(*serializers.HABIT.columns()).where(Habit.user_id == user_id)
+    ).all()
+    return jsonify({'habits': serializers.HABIT.rows(habits)})
+
+@bp.route('/habits/<int:habit_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_habit(habit_id):
+    import analytics
+    
+    user_id = get_jwt_identity()
+    habit = Habit.query.filter_by(id=habit_id, user_id=user_id).first_or_404()
+    
+    now = datetime.utcnow()
+    today = now.date()
+    last_day = habit.last_completed.date() if habit.last_completed else None
+    if last_day != today:
+        # A missed day breaks the streak
+        habit.streak = habit.streak + 1 if last_day == today - timedelta(days=1) else 1
+        habit.last_completed = now
+        analytics.record_checkin(user_id, habit.id, today)
+        
+        # Award coins for maintaining streak
+        coins_earned = min(habit.streak * 5, 50)  # Max 50 coins per habit completion
+        effects.habit_completed(user_id, habit.id, coins_earned)
+        
+        db.session.commit()
+        response_cache.invalidate(user_id, 'habits', 'profile')
+        return jsonify({'message': 'Habit completed', 'streak': habit.streak, 'coins_earned': coins_earned})
+    
+    return jsonify({'error': 'Habit already completed today'}), 400
+
+@bp.route('/habits/stats', methods=['GET'])
+@jwt_required()
+@response_cache.cached('habits', version=utc_today)
+def habit_stats():
+    import analytics
+    
+    user_id = get_jwt_identity()
+    days = min(max(request.args.get('days', 365, type=int), 1), 366)
+    per_habit = request.args.get('per_habit', 'false').lower() == 'true'
+    return jsonify(analytics.habit_stats(user_id, days=days, per_habit=per_habit))
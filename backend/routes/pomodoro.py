@@ -0,0 +1,63 @@
+"""Pomodoro session routes."""
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import select
+
+import effects
+import serializers
+from cache import response_cache
+from events import broker
+from models import db, PomodoroSession
+
+bp = Blueprint('pomodoro', __name__, url_prefix='/api', cli_group=None)
+
+# Pomodoro routes
+@bp.route('/pomodoro', methods=['POST', 'GET'])
+@jwt_required()
+@response_cache.cached('pomodoro')
+def handle_pomodoro():
+    user_id = get_jwt_identity()
+    
+    if request.method == 'POST':
+        data = request.get_json()
+        session = PomodoroSession(
+            user_id=user_id,
+            start_time=datetime.utcnow(),
+            duration=data.get('duration', 25),  # default 25 minutes
+        )
+        db.session.add(session)
+        effects.pomodoro_started(user_id)
+        db.session.commit()
+        response_cache.invalidate(user_id, 'pomodoro')
+        body = serializers.POMODORO.dump(session, ('id', 'start_time', 'duration'))
+        broker.publish(f'user:{user_id}', {'type': 'pomodoro', 'action': 'started', 'session': body})
+        return jsonify(body), 201
+    
+    # Get user's pomodoro history
+    sessions = db.session.execute(
+        select(*serializers.POMODORO.columns())
+        .where(PomodoroSession.user_id == user_id)
+        .order_by(PomodoroSession.start_time.desc())
+        .limit(10)
+    ).all()
+    return jsonify({'sessions': serializers.POMODORO.rows(sessions)})
+
+@bp.route('/pomodoro/<int:session_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_pomodoro(session_id):
+    user_id = get_jwt_identity()
+    session = PomodoroSession.query.filter_by(id=session_id, user_id=user_id).first_or_404()
+    
+    session.end_time = datetime.utcnow()
+    session.completed = True
+    
+    # Award coins for completed session
+    effects.pomodoro_completed(user_id, session.id, session.duration, 20)  # Award 20 coins for completed pomodoro
+    
+    db.session.commit()
+    response_cache.invalidate(user_id, 'pomodoro', 'profile')
+    broker.publish(f'user:{user_id}', {'type': 'pomodoro', 'action': 'completed',
+                                       'session': serializers.POMODORO.dump(session)})
+    return jsonify({'message': 'Session completed', 'coins_earned': 20})
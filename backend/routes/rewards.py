@@ -0,0 +1,86 @@
+"""Reward store routes and the coin/catalog maintenance commands."""
+from datetime import timedelta
+
+import click
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import current_user, get_jwt_identity, jwt_required
+from sqlalchemy import select
+
+import catalog
+import ledger
+import serializers
+from cache import response_cache
+from catalog import reward_catalog
+from events import broker
+from models import db, Reward
+
+bp = Blueprint('rewards', __name__, url_prefix='/api', cli_group=None)
+
+# Reward Store routes
+@bp.route('/rewards', methods=['GET', 'POST'])
+@jwt_required()
+@response_cache.cached('rewards', version=reward_catalog.version)
+def handle_rewards():
+    user_id = get_jwt_identity()
+    
+    if request.method == 'POST':
+        if not current_user.is_premium:
+            return jsonify({'error': 'Premium subscription required to create custom rewards'}), 403
+        
+        data = request.get_json()
+        reward = Reward(
+            user_id=user_id,
+            name=data['name'],
+            description=data.get('description'),
+            coins_cost=data['coins_cost'],
+            is_premium=data.get('is_premium', False)
+        )
+        db.session.add(reward)
+        db.session.commit()
+        response_cache.invalidate(user_id, 'rewards')
+        return jsonify(serializers.REWARD.dump(reward, ('id', 'name', 'coins_cost'))), 201
+    
+    # System rewards come from the shared snapshot, only custom ones are queried
+    custom = db.session.execute(select(*serializers.REWARD.columns()).where(Reward.user_id == user_id)).all()
+    
+    return jsonify({'rewards': [*reward_catalog.current().rewards, *serializers.REWARD.rows(custom)]})
+
+@bp.route('/rewards/<int:reward_id>/redeem', methods=['POST'])
+@jwt_required()
+def redeem_reward(reward_id):
+    user_id = get_jwt_identity()
+    reward = reward_catalog.current().by_id.get(reward_id)
+    if reward is None:
+        # Custom rewards can only be redeemed by their owner
+        reward = serializers.REWARD.dump(Reward.query.filter_by(id=reward_id, user_id=user_id).first_or_404())
+    
+    if reward['is_premium'] and not current_user.is_premium:
+        return jsonify({'error': 'Premium subscription required for this reward'}), 403
+    
+    # Checked and spent in one guarded update, no lock on the user row
+    remaining = ledger.debit(user_id, reward['coins_cost'], 'redeem', reward_id)
+    if remaining is None:
+        return jsonify({'error': 'Insufficient coins'}), 400
+    
+    db.session.commit()
+    response_cache.invalidate(user_id, 'profile')
+    broker.publish(f'user:{user_id}', {'type': 'coins', 'coins': remaining})
+    
+    return jsonify({
+        'message': 'Reward redeemed successfully',
+        'remaining_coins': remaining
+    })
+
+@bp.cli.command('compact-ledger')
+@click.option('--days', default=90, show_default=True, help='Keep ledger rows newer than this many days.')
+def compact_ledger(days):
+    """Fold old coin transactions into per-user balance snapshots."""
+    opened, removed = ledger.compact(timedelta(days=days))
+    print(f'Opened {opened} balances, compacted {removed} transactions')
+
+@bp.cli.command('bump-catalog')
+def bump_catalog():
+    """Make every process reload the system rewards catalog."""
+    version = catalog.bump(db.session)
+    db.session.commit()
+    print(f'Rewards catalog is now version {version}')
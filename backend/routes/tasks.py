@@ -0,0 +1,221 @@
+"""Task routes: listing, search, CRUD, completion and batches."""
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import select
+
+import batch
+import effects
+import pagination
+import search
+import serializers
+from cache import response_cache
+from models import db, Task
+
+bp = Blueprint('tasks', __name__, url_prefix='/api', cli_group=None)
+
+# Task routes
+TASK_FIELDS = serializers.TASK.fields
+DEFAULT_TASK_FIELDS = TASK_FIELDS[:-1]
+DEFAULT_TASK_PAGE_SIZE = 100
+MAX_TASK_PAGE_SIZE = 500
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+
+def task_fields(args):
+    """Fields requested with ``fields=``; raises ValueError for unknown ones."""
+    if not args.get('fields'):
+        return DEFAULT_TASK_FIELDS
+    fields = tuple(f for f in args['fields'].split(',') if f)
+    unknown = set(fields) - set(TASK_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+def task_filters(args):
+    """Filter clauses shared by the task list and search; raises ValueError."""
+    try:
+        completed = pagination.parse_bool(args.get('completed'))
+        due_after = datetime.fromisoformat(args['due_after']) if 'due_after' in args else None
+        due_before = datetime.fromisoformat(args['due_before']) if 'due_before' in args else None
+    except ValueError:
+        raise ValueError('Invalid filter value')
+    
+    filters = []
+    if completed is not None:
+        filters.append(Task.completed == completed)
+    if 'category' in args:
+        filters.append(Task.category == args['category'])
+    if 'priority' in args:
+        filters.append(Task.priority == args['priority'])
+    if due_after:
+        filters.append(Task.due_date >= due_after)
+    if due_before:
+        filters.append(Task.due_date < due_before)
+    return filters
+
+def task_page(user_id, fields, filters, cursor=None, limit=DEFAULT_TASK_PAGE_SIZE):
+    """One page of the user's tasks, oldest first, as ``{'tasks', 'next_cursor'}``.
+
+    Raises ``pagination.InvalidCursor`` for a malformed ``cursor``.
+    """
+    # Only the requested columns are loaded, plus the pagination key
+    query = select(*serializers.TASK.columns(fields), Task.created_at, Task.id)\
+        .filter(Task.user_id == user_id, *filters)
+    if cursor:
+        query = query.filter(pagination.after(Task.created_at, Task.id, cursor))
+    
+    # Fetch one extra row to know whether another page exists
+    rows = db.session.execute(query.order_by(Task.created_at, Task.id).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return {
+        'tasks': serializers.TASK.rows(rows, fields),
+        'next_cursor': pagination.encode_cursor(rows[-1][-2], rows[-1][-1]) if has_more else None
+    }
+
+def list_tasks(user_id):
+    args = request.args
+    
+    try:
+        fields = task_fields(args)
+        filters = task_filters(args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    limit = pagination.parse_limit(args.get('limit'), DEFAULT_TASK_PAGE_SIZE, MAX_TASK_PAGE_SIZE)
+    try:
+        return jsonify(task_page(user_id, fields, filters, args.get('cursor'), limit))
+    except pagination.InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+@bp.route('/tasks', methods=['GET', 'POST'])
+@jwt_required()
+@response_cache.cached('tasks')
+def handle_tasks():
+    user_id = get_jwt_identity()
+    
+    if request.method == 'GET':
+        return list_tasks(user_id)
+    
+    data = request.get_json()
+    new_task = Task(
+        user_id=user_id,
+        title=data['title'],
+        description=data.get('description'),
+        coins_reward=data.get('coins_reward', 10),
+        due_date=datetime.fromisoformat(data['due_date']) if 'due_date' in data else None,
+        priority=data.get('priority', 'medium'),
+        category=data.get('category')
+    )
+    
+    db.session.add(new_task)
+    effects.task_created(user_id)
+    db.session.commit()
+    response_cache.invalidate(user_id, 'tasks')
+    
+    return jsonify(serializers.TASK.dump(new_task, DEFAULT_TASK_FIELDS)), 201
+
+@bp.route('/tasks/search', methods=['GET'])
+@jwt_required()
+@response_cache.cached('tasks')
+def search_tasks():
+    user_id = get_jwt_identity()
+    args = request.args
+    
+    words = search.terms(args.get('q'))
+    if not words:
+        return jsonify({'error': 'Search query is required'}), 400
+    try:
+        fields = task_fields(args)
+        filters = task_filters(args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    limit = pagination.parse_limit(args.get('limit'), DEFAULT_SEARCH_PAGE_SIZE, MAX_SEARCH_PAGE_SIZE)
+    page = max(args.get('page', 1, type=int), 1)
+    query = search.select_matches(db.session.get_bind().dialect.name, user_id, words,
+                                  serializers.TASK.columns(fields), filters)
+    # Ranked results can't use a keyset cursor, pages are offsets
+    rows = db.session.execute(query.limit(limit + 1).offset((page - 1) * limit)).all()
+    
+    return jsonify({
+        'tasks': serializers.TASK.rows(rows[:limit], fields),
+        'page': page,
+        'next_page': page + 1 if len(rows) > limit else None
+    })
+
+@bp.route('/tasks/<int:task_id>', methods=['PUT', 'DELETE'])
+@jwt_required()
+def handle_task(task_id):
+    user_id = get_jwt_identity()
+    task = Task.query.filter_by(id=task_id, user_id=user_id).first_or_404()
+    
+    if request.method == 'DELETE':
+        db.session.delete(task)
+        db.session.commit()
+        response_cache.invalidate(user_id, 'tasks')
+        return jsonify({'message': 'Task deleted successfully'})
+    
+    data = request.get_json()
+    task.title = data.get('title', task.title)
+    task.description = data.get('description', task.description)
+    task.coins_reward = data.get('coins_reward', task.coins_reward)
+    task.due_date = datetime.fromisoformat(data['due_date']) if 'due_date' in data else task.due_date
+    task.priority = data.get('priority', task.priority)
+    task.category = data.get('category', task.category)
+    
+    db.session.commit()
+    response_cache.invalidate(user_id, 'tasks')
+    return jsonify(serializers.TASK.dump(task, DEFAULT_TASK_FIELDS))
+
+@bp.route('/tasks/<int:task_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_task(task_id):
+    user_id = get_jwt_identity()
+    task = Task.query.filter_by(id=task_id, user_id=user_id).first_or_404()
+    
+    if task.completed:
+        return jsonify({'error': 'Task already completed'}), 400
+    
+    task.completed = True
+    task.completed_at = datetime.utcnow()
+    effects.task_completed(user_id, task.id, task.coins_reward, at=task.completed_at)
+    
+    db.session.commit()
+    response_cache.invalidate(user_id, 'tasks', 'profile')
+    return jsonify({
+        'message': 'Task completed successfully',
+        'coins_earned': task.coins_reward
+    })
+
+@bp.route('/tasks/batch', methods=['POST'])
+@jwt_required()
+def batch_tasks():
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    
+    try:
+        results, coins_earned, applied = batch.apply(user_id, data.get('operations'), data.get('mode', 'atomic'))
+    except batch.BatchError as e:
+        return jsonify({'error': str(e)}), e.status
+    
+    if not applied:
+        return jsonify({'results': results, 'applied': 0, 'coins_earned': 0}), 400
+    
+    db.session.commit()
+    response_cache.invalidate(user_id, 'tasks', 'profile')
+    return jsonify({
+        'results': results,
+        'applied': applied,
+        'coins_earned': coins_earned
+    })
+
+@bp.cli.command('rebuild-search')
+def rebuild_search():
+    """Create the task search index if missing and refill it from the task table."""
+    with db.engine.begin() as connection:
+        search.install(connection)
+    print('Task search index rebuilt')
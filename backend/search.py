@@ -0,0 +1,122 @@
+"""Full-text search over a user's tasks.
+
+The index lives in the database and is maintained there, so every write
+path (the task routes, /api/tasks/batch, bulk loads) keeps it in sync
+without application code:
+
+* SQLite - a contentless FTS5 table ``task_fts`` filled by triggers on
+           ``task``. Rows carry an ``owner`` token (``u<user_id>``) so a
+           query only walks the caller's entries, and prefix indexes make
+           the ``word*`` queries cheap.
+* PostgreSQL - a generated ``task.search_vector`` tsvector column (title
+           weighted over category over description) with a GIN index.
+
+Every word of the query is matched as a prefix, all words must match, and
+results are ordered by relevance (bm25 / ts_rank), then id. A short prefix
+can match most of a user's tasks, so only the newest ``MAX_RANKED`` matches
+are ranked; that keeps a query's cost flat however broad it is.
+
+The migration creates the same objects; ``install`` does it for databases
+made with ``create_all`` (benchmarks, datagen) and runs automatically after
+the ``task`` table is created.
+"""
+import re
+
+from sqlalchemy import DDL, column, event, func, literal_column, select, table
+
+from models import Task
+
+MAX_TERMS = 8
+MAX_RANKED = 2000
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "owner, title, description, category, "
+    "content='', prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+
+    "CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, owner, title, description, category) "
+    "VALUES (new.id, 'u' || new.user_id, new.title, coalesce(new.description, ''), coalesce(new.category, '')); "
+    "END",
+
+    # A contentless table forgets rows only when told their indexed values
+    "CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, owner, title, description, category) "
+    "VALUES ('delete', old.id, 'u' || old.user_id, old.title, coalesce(old.description, ''), coalesce(old.category, '')); "
+    "END",
+
+    "CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF user_id, title, description, category ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, owner, title, description, category) "
+    "VALUES ('delete', old.id, 'u' || old.user_id, old.title, coalesce(old.description, ''), coalesce(old.category, '')); "
+    "INSERT INTO task_fts(rowid, owner, title, description, category) "
+    "VALUES (new.id, 'u' || new.user_id, new.title, coalesce(new.description, ''), coalesce(new.category, '')); "
+    "END",
+)
+
+POSTGRESQL_DDL = (
+    "ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')) STORED",
+
+    "CREATE INDEX IF NOT EXISTS ix_task_search ON task USING gin (search_vector)",
+)
+
+SQLITE_BACKFILL = (
+    "INSERT INTO task_fts(task_fts) VALUES ('delete-all')",
+    "INSERT INTO task_fts(rowid, owner, title, description, category) "
+    "SELECT id, 'u' || user_id, title, coalesce(description, ''), coalesce(category, '') FROM task",
+)
+
+for _statement in SQLITE_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRESQL_DDL:
+    event.listen(Task.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+task_fts = table('task_fts', column('rowid'))
+
+
+def install(connection):
+    """Create the index objects if missing and (re)fill the SQLite index."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DDL + SQLITE_BACKFILL:
+            connection.exec_driver_sql(statement)
+    elif dialect == 'postgresql':
+        # The generated column fills itself
+        for statement in POSTGRESQL_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def terms(text):
+    """The words of a search box query, lowercased."""
+    return re.findall(r'[^\W_]+', (text or '').lower())[:MAX_TERMS]
+
+
+def select_matches(dialect, user_id, words, columns, filters=()):
+    """``columns`` of ``user_id``'s tasks matching every word as a prefix, best first.
+
+    ``filters`` are extra clauses on ``Task``, applied before ranking.
+    """
+    if dialect == 'sqlite':
+        # terms() only yields letters and digits, so the words need no escaping
+        phrases = ' AND '.join(f'"{word}"*' for word in words)
+        match = f'owner : "u{int(user_id)}" AND {{title description category}} : ({phrases})'
+        # FTS5 yields matches in rowid order and bm25 only runs for the rows kept
+        candidates = select(task_fts.c.rowid.label('id'),
+                            (-func.bm25(literal_column('task_fts'), 0.0, 10.0, 2.0, 4.0)).label('score'))\
+            .join_from(task_fts, Task, Task.id == task_fts.c.rowid)\
+            .where(literal_column('task_fts').op('MATCH')(match), *filters)\
+            .order_by(task_fts.c.rowid.desc())
+    elif dialect == 'postgresql':
+        vector = literal_column('task.search_vector')
+        tsquery = func.to_tsquery('simple', ' & '.join(f'{w}:*' for w in words))
+        candidates = select(Task.id.label('id'), func.ts_rank(vector, tsquery).label('score'))\
+            .where(Task.user_id == user_id, vector.op('@@')(tsquery), *filters)\
+            .order_by(Task.id.desc())
+    else:
+        raise NotImplementedError(f'Task search is not available on {dialect}')
+
+    candidates = candidates.limit(MAX_RANKED).subquery()
+    return select(*columns).join_from(Task, candidates, candidates.c.id == Task.id)\
+        .order_by(candidates.c.score.desc(), Task.id)
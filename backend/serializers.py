@@ -0,0 +1,110 @@
+"""Response serialization shared by the routes.
+
+Every model a route returns has a ``Schema``: the fields it exposes and a
+converter for the few values that are not JSON-native. Lists are serialized
+from plain column tuples (``select(*schema.columns(fields))``) rather than
+ORM instances, and the row-to-dict function for a given field set is built
+once and reused.
+
+JSON is encoded with orjson when it is installed, both for ``jsonify``
+(through ``JSONProvider``) and for the ASGI routes (``dumps``). orjson
+encodes datetimes as ISO 8601 itself, so the datetime converters only run
+on the stdlib fallback.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+from models import User, Task, Habit, Reward, PomodoroSession
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def hhmm(value):
+    return value.strftime('%H:%M') if value is not None else None
+
+
+# Only needed when the encoder can't write datetimes in ISO format itself
+datetime_iso = None if orjson else iso
+
+
+class Schema:
+    def __init__(self, model, fields, converters=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.converters = {name: conv for name, conv in (converters or {}).items() if conv is not None}
+        self._columns = {name: getattr(model, name) for name in self.fields}
+        self._compiled = {}
+
+    def columns(self, fields=None):
+        return [self._columns[name] for name in fields or self.fields]
+
+    def compile(self, fields=None):
+        """Return a function turning a row whose first values are ``fields`` into a dict."""
+        fields = tuple(fields or self.fields)
+        to_dict = self._compiled.get(fields)
+        if to_dict is not None:
+            return to_dict
+
+        converted = [(i, name, self.converters[name]) for i, name in enumerate(fields) if name in self.converters]
+        if converted:
+            def to_dict(row):
+                item = dict(zip(fields, row))
+                for i, name, conv in converted:
+                    item[name] = conv(row[i])
+                return item
+        else:
+            def to_dict(row):
+                return dict(zip(fields, row))
+
+        self._compiled[fields] = to_dict
+        return to_dict
+
+    def rows(self, rows, fields=None):
+        to_dict = self.compile(fields)
+        return [to_dict(row) for row in rows]
+
+    def dump(self, obj, fields=None):
+        fields = tuple(fields or self.fields)
+        return self.compile(fields)(tuple(getattr(obj, name) for name in fields))
+
+
+TASK = Schema(Task, ('id', 'title', 'description', 'completed', 'coins_reward', 'due_date',
+                     'priority', 'category', 'created_at'),
+              {'due_date': datetime_iso, 'created_at': datetime_iso})
+HABIT = Schema(Habit, ('id', 'name', 'description', 'streak', 'target_days', 'reminder_time', 'last_completed'),
+               {'reminder_time': hhmm, 'last_completed': datetime_iso})
+POMODORO = Schema(PomodoroSession, ('id', 'start_time', 'end_time', 'duration', 'completed'),
+                  {'start_time': datetime_iso, 'end_time': datetime_iso})
+REWARD = Schema(Reward, ('id', 'name', 'description', 'coins_cost', 'is_premium'))
+PROFILE = Schema(User, ('id', 'username', 'email', 'coins', 'is_premium', 'created_at'),
+                 {'created_at': datetime_iso})
+
+
+if orjson:
+    def dumps(obj):
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(obj):
+        return json.dumps(obj, default=DefaultJSONProvider.default, separators=(',', ':')).encode('utf-8')
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when available."""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(dumps(self._prepare_response_obj(args, kwargs)), mimetype=self.mimetype)
@@ -0,0 +1,68 @@
+"""Production entry point.
+
+SERVER_MODE picks how the API is served:
+
+* ``sync``  - the Flask WSGI app under gunicorn with threaded workers.
+* ``async`` - asgi.application under uvicorn; polling endpoints run on the
+              async engine, the rest through the WSGI adapter.
+
+WEB_CONCURRENCY sets the worker processes (default: one per CPU). With
+more than one, the response cache defaults to ``none``, as the in-process
+``lru`` backend can't be shared; set ``RESPONSE_CACHE_BACKEND=redis`` to
+keep caching. Server-sent events only reach clients of the process that
+published them, so async mode runs one worker, and refuses more, unless
+``EVENTS_BACKEND=redis``.
+
+``python app.py`` remains the development server.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SERVER_MODES = ('sync', 'async')
+
+
+def worker_count(mode):
+    """WEB_CONCURRENCY or the default for ``mode``, as a string."""
+    if mode == 'async' and os.getenv('EVENTS_BACKEND', 'local') != 'redis':
+        # SSE clients only hear events published in their own process
+        workers = os.getenv('WEB_CONCURRENCY', '1')
+        if int(workers) > 1:
+            raise SystemExit('SERVER_MODE=async with more than one worker needs EVENTS_BACKEND=redis')
+        return workers
+    return os.getenv('WEB_CONCURRENCY', str(os.cpu_count() or 1))
+
+
+def main():
+    mode = os.getenv('SERVER_MODE', 'sync')
+    if mode not in SERVER_MODES:
+        raise SystemExit(f"SERVER_MODE must be one of: {', '.join(SERVER_MODES)}")
+    host = os.getenv('HOST', '0.0.0.0')
+    port = os.getenv('PORT', '5000')
+    workers = worker_count(mode)
+    # create_app reads it to pick a response cache every process can share
+    os.environ['WEB_CONCURRENCY'] = workers
+
+    if mode == 'sync':
+        threads = os.getenv('WEB_THREADS', '8')
+        os.execvp('gunicorn', [
+            'gunicorn', 'app:create_app(migrations=False)',
+            '--bind', f'{host}:{port}',
+            '--workers', workers,
+            '--threads', threads,
+            '--worker-class', 'gthread',
+        ])
+    else:
+        os.execvp('uvicorn', [
+            'uvicorn', 'asgi:application',
+            '--host', host,
+            '--port', port,
+            '--workers', workers,
+            '--lifespan', 'on',
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Server-sent events stream for the async serving mode.
+
+``GET /api/events`` stays open and streams the caller's ``user:<id>``
+events (pomodoro sessions, coin balance, rank) and the global
+``leaderboard`` deltas. Each connection is a coroutine waiting on its
+subscription queue, so idle connections cost no thread. A comment line
+is sent every ``EVENTS_HEARTBEAT`` seconds to keep proxies from closing
+the stream and to notice dead clients.
+
+Leaderboard deltas come from one ``LeaderboardWatcher`` per process: it
+listens for ``scores`` events, debounces them, re-reads each period's top
+entries once and sends only the entries that changed, plus fresh ranks for
+changed users connected to this process.
+"""
+import asyncio
+import logging
+
+import async_db
+import leaderboard
+import serializers
+from events import broker
+
+logger = logging.getLogger(__name__)
+
+RETRY_MS = 3000
+
+
+def format_event(payload):
+    return b'event: ' + payload['type'].encode('ascii') + b'\ndata: ' + serializers.dumps(payload) + b'\n\n'
+
+
+class LeaderboardWatcher:
+    def __init__(self, size=10, debounce=1.0):
+        self.size = size
+        self.debounce = debounce
+        self.top = {}  # period -> {user_id: entry}
+        self._task = None
+
+    def ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self):
+        sub = broker.subscribe(['scores'])
+        try:
+            await self.refresh(set())
+            while True:
+                _, payload = await sub.queue.get()
+                changed = set(payload['user_ids'])
+                await asyncio.sleep(self.debounce)
+                while not sub.queue.empty():
+                    changed.update(sub.queue.get_nowait()[1]['user_ids'])
+                try:
+                    await self.refresh(changed)
+                except Exception:
+                    logger.exception('Leaderboard refresh failed')
+        finally:
+            broker.unsubscribe(sub)
+
+    async def refresh(self, changed):
+        async with async_db.session() as session:
+            for period in leaderboard.PERIODS:
+                bucket = leaderboard.bucket_for(period)
+                rows = (await session.execute(leaderboard.select_top(period, bucket, self.size))).all()
+                entries = {row[0]: leaderboard.entry_dict(*row, rank=rank) for rank, row in enumerate(rows, 1)}
+
+                previous = self.top.get(period)
+                self.top[period] = entries
+                if previous is not None:
+                    changes = [entry for user_id, entry in entries.items() if previous.get(user_id) != entry]
+                    removed = [user_id for user_id in previous if user_id not in entries]
+                    if changes or removed:
+                        broker.deliver('leaderboard', {'type': 'leaderboard', 'period': period,
+                                                       'changes': changes, 'removed': removed})
+
+                for user_id in changed:
+                    if not broker.has_subscribers(f'user:{user_id}'):
+                        continue
+                    me = (await session.execute(leaderboard.select_user_entry(user_id, period, bucket))).first()
+                    if me is None:
+                        continue
+                    ahead = (await session.execute(leaderboard.select_ahead(period, bucket, me[3], me[4]))).scalar()
+                    broker.deliver(f'user:{user_id}', {'type': 'rank', 'period': period, 'rank': ahead + 1,
+                                                       'tasks_completed': me[3], 'total_streak': me[4]})
+
+
+watcher = LeaderboardWatcher()
+
+
+async def stream(receive, send, user_id):
+    watcher.ensure_started()
+    sub = broker.subscribe([f'user:{user_id}', 'leaderboard'])
+
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    disconnected = asyncio.ensure_future(wait_for_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+                (b'access-control-allow-origin', b'*'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b'retry: %d\n\n' % RETRY_MS, 'more_body': True})
+
+        while True:
+            get = asyncio.ensure_future(sub.queue.get())
+            done, _ = await asyncio.wait({get, disconnected}, timeout=broker.heartbeat,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                get.cancel()
+                return
+            if get not in done:
+                get.cancel()
+                body = b': heartbeat\n\n'
+            elif sub.overflowed:
+                # Too far behind to catch up event by event
+                body = format_event({'type': 'resync'})
+                await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+                return
+            else:
+                body = format_event(get.result()[1])
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        disconnected.cancel()
+        broker.unsubscribe(sub)
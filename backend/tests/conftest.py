@@ -0,0 +1,46 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+import identity
+from app import create_app
+from catalog import reward_catalog
+from models import db, User
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'RESPONSE_CACHE_BACKEND': 'lru',
+        'JOBS_MODE': 'local',
+        'EVENTS_BACKEND': 'local',
+        'BCRYPT_ROUNDS': 4,
+    }, migrations=False)
+    with app.app_context():
+        db.create_all()
+    identity.entitlements.clear()
+    # Snapshots of an earlier test's database may carry the same version
+    reward_catalog._snapshot = None
+    reward_catalog.expire()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user and return ``(user_id, auth headers)``."""
+    def make(username='alice', coins=0):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.com', password='x', coins=coins)
+            db.session.add(user)
+            db.session.commit()
+            token = create_access_token(identity=user.id, additional_claims=identity.claims_for(user))
+            return user.id, {'Authorization': 'Bearer ' + token}
+    return make
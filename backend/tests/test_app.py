@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import create_app
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_app(tmp_path, **kwargs):
+    return create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}"}, **kwargs)
+
+
+def test_only_the_chosen_blueprints_are_registered(tmp_path):
+    app = make_app(tmp_path, blueprints=('tasks', 'auth'), migrations=False)
+    assert set(app.blueprints) == {'tasks', 'auth'}
+    rules = {rule.rule for rule in app.url_map.iter_rules()}
+    assert '/api/tasks' in rules and '/api/health/db' in rules
+    assert '/api/habits' not in rules
+
+
+def test_app_blueprints_setting(tmp_path, monkeypatch):
+    monkeypatch.setenv('APP_BLUEPRINTS', 'pomodoro')
+    assert set(make_app(tmp_path, migrations=False).blueprints) == {'pomodoro'}
+
+
+def test_unknown_blueprint_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match='nope'):
+        make_app(tmp_path, blueprints=('tasks', 'nope'))
+
+
+def test_migrations_only_with_the_cli_app(tmp_path):
+    assert 'migrate' in make_app(tmp_path).extensions
+    assert 'migrate' not in make_app(tmp_path, migrations=False).extensions
+
+
+def test_heavy_modules_load_on_first_use():
+    # A fresh interpreter, as the modules may already be loaded in this one
+    code = ('import json, sys\n'
+            'import app\n'
+            "app.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'}, migrations=False)\n"
+            "print(json.dumps([m for m in ('numpy', 'bcrypt', 'flask_migrate', 'alembic') if m in sys.modules]))\n")
+    output = subprocess.run([sys.executable, '-c', code], cwd=BACKEND, capture_output=True, text=True, check=True)
+    assert json.loads(output.stdout.splitlines()[-1]) == []
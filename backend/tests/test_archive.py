@@ -0,0 +1,81 @@
+import json
+from datetime import datetime, timedelta
+
+import archive
+import leaderboard
+import rollups
+from models import db, ArchiveSegment, DailyStat, LeaderboardEntry, PomodoroSession, Task
+
+
+def seed(client, headers):
+    for i in range(4):
+        task_id = client.post('/api/tasks', json={'title': f'task {i}'}, headers=headers).get_json()['id']
+        if i % 2 == 0:
+            client.post(f'/api/tasks/{task_id}/complete', headers=headers)
+    for duration in (25, 50):
+        session_id = client.post('/api/pomodoro', json={'duration': duration}, headers=headers).get_json()['id']
+        client.post(f'/api/pomodoro/{session_id}/complete', headers=headers)
+    client.post('/api/pomodoro', json={'duration': 15}, headers=headers)
+
+
+def archive_everything(batch_size=archive.BATCH_SIZE):
+    # A cutoff in the future makes every eligible row old enough
+    return archive.archive(timedelta(0), batch_size, now=datetime.utcnow() + timedelta(days=1))
+
+
+def totals():
+    stats = {(s.user_id, s.day): tuple(getattr(s, name) for name in archive.COUNTERS)
+             for s in DailyStat.query.all()}
+    entries = {(e.user_id, e.period): e.tasks_completed for e in LeaderboardEntry.query.all()}
+    return stats, entries
+
+
+def export_lines(client, headers):
+    return [json.loads(line) for line in client.get('/api/export', headers=headers).get_data().splitlines()]
+
+
+def test_archive_moves_completed_tasks_and_sessions(app, client, make_user):
+    user_id, headers = make_user()
+    seed(client, headers)
+    with app.app_context():
+        moved, user_ids = archive_everything(batch_size=2)
+        assert moved == {'tasks': 2, 'pomodoro': 3}
+        assert user_ids == {user_id}
+        # Incomplete tasks stay in the hot table
+        assert [task.title for task in Task.query.all()] == ['task 1', 'task 3']
+        assert PomodoroSession.query.count() == 0
+        assert sum(segment.row_count for segment in ArchiveSegment.query.all()) == 5
+
+
+def test_export_includes_archived_rows(app, client, make_user):
+    _, headers = make_user()
+    seed(client, headers)
+    before = export_lines(client, headers)
+    with app.app_context():
+        archive_everything()
+    assert export_lines(client, headers) == before
+
+
+def test_rebuilds_keep_the_totals_of_archived_rows(app, client, make_user):
+    _, headers = make_user()
+    seed(client, headers)
+    with app.app_context():
+        rollups.rebuild()
+        leaderboard.rebuild()
+        before = totals()
+        archive_everything()
+        rollups.rebuild()
+        leaderboard.rebuild()
+        assert totals() == before
+
+
+def test_encode_decode_round_trip(app, client, make_user):
+    _, headers = make_user()
+    seed(client, headers)
+    table = PomodoroSession.__table__
+    with app.app_context():
+        rows = db.session.execute(table.select().order_by(table.c.id)).all()
+    columns = archive.decode(table, archive.encode(table, rows))
+    assert 'user_id' not in columns
+    for name, values in columns.items():
+        assert values == [getattr(row, name) for row in rows]
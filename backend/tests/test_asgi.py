@@ -0,0 +1,115 @@
+import asyncio
+import importlib
+import json
+import sys
+import time
+
+import pytest
+
+from models import db
+
+
+@pytest.fixture
+def asgi(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'asgi.db'}")
+    monkeypatch.setenv('BCRYPT_ROUNDS', '4')
+    sys.modules.pop('asgi', None)
+    module = importlib.import_module('asgi')
+    with module.flask_app.app_context():
+        db.create_all()
+    yield module
+    with module.flask_app.app_context():
+        db.engine.dispose()
+    sys.modules.pop('asgi', None)
+
+
+def call(module, path, token=None, query=b''):
+    """Run one GET through the ASGI app; returns (status, parsed body)."""
+    async def run():
+        url = module.flask_app.config['SQLALCHEMY_DATABASE_URI']
+        module.async_db.init_engine(url)
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        headers = [(b'authorization', f'Bearer {token}'.encode())] if token else []
+        scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query, 'headers': headers,
+                 'http_version': '1.1', 'scheme': 'http', 'server': ('test', 80), 'root_path': ''}
+        try:
+            await module.application(scope, receive, send)
+        finally:
+            await module.async_db.dispose()
+        body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+        return messages[0]['status'], json.loads(body)
+    return asyncio.run(run())
+
+
+def register(module, name):
+    client = module.flask_app.test_client()
+    token = client.post('/api/register', json={'username': name, 'email': f'{name}@x', 'password': 'pw'})\
+        .get_json()['token']
+    return client, token
+
+
+def test_async_routes_match_the_flask_routes(asgi):
+    client, token = register(asgi, 'alice')
+    headers = {'Authorization': 'Bearer ' + token}
+    task_id = client.post('/api/tasks', json={'title': 't'}, headers=headers).get_json()['id']
+    client.post(f'/api/tasks/{task_id}/complete', headers=headers)
+    client.post('/api/pomodoro', json={'duration': 25}, headers=headers)
+
+    status, board = call(asgi, '/api/leaderboard', token, b'timeframe=all-time')
+    assert status == 200
+    assert board == client.get('/api/leaderboard?timeframe=all-time', headers=headers).get_json()
+    assert board['me']['rank'] == 1
+
+    status, sessions = call(asgi, '/api/pomodoro', token)
+    assert status == 200 and len(sessions['sessions']) == 1
+
+
+def test_other_routes_fall_back_to_flask(asgi):
+    _, token = register(asgi, 'alice')
+    status, profile = call(asgi, '/api/user/profile', token)
+    assert status == 200 and profile['username'] == 'alice'
+
+
+def test_async_routes_require_a_token(asgi):
+    assert call(asgi, '/api/leaderboard')[0] == 401
+    assert call(asgi, '/api/pomodoro', 'garbage')[0] == 422
+
+
+def test_fallback_requests_run_concurrently(asgi):
+    def slow_app(environ, start_response):
+        time.sleep(0.3)
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'ok']
+
+    adapter = asgi.PooledWsgiToAsgi(slow_app, threads=4)
+
+    async def request():
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/', 'query_string': b'', 'headers': [],
+                 'http_version': '1.1'}
+        await adapter(scope, receive, send)
+        return messages[0]['status']
+
+    async def run():
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*[request() for _ in range(4)])
+        return statuses, time.perf_counter() - started
+
+    statuses, elapsed = asyncio.run(run())
+    assert statuses == [200] * 4
+    # One at a time would take 1.2 s
+    assert elapsed < 0.9
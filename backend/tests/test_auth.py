@@ -0,0 +1,45 @@
+import pytest
+
+from routes import auth
+
+
+@pytest.fixture(autouse=True)
+def fresh_throttles(monkeypatch):
+    monkeypatch.setattr(auth, 'login_ip_throttle', auth.AttemptThrottle(limit=3, window=60))
+    monkeypatch.setattr(auth, 'login_account_throttle', auth.AttemptThrottle(limit=2, window=300))
+
+
+def register(client, name):
+    return client.post('/api/register', json={'username': name, 'email': f'{name}@example.com', 'password': 'pw'})
+
+
+def login(client, email, password='pw'):
+    return client.post('/api/login', json={'email': email, 'password': password})
+
+
+def test_register_then_login(client):
+    token = register(client, 'alice').get_json()['token']
+    body = login(client, 'alice@example.com').get_json()
+    assert token and body['token'] and body['user']['username'] == 'alice'
+    assert client.get('/api/user/profile', headers={'Authorization': 'Bearer ' + body['token']}).status_code == 200
+
+
+def test_successful_logins_do_not_use_up_the_ip_limit(client):
+    for name in ('a', 'b', 'c', 'd', 'e'):
+        register(client, name)
+        assert login(client, f'{name}@example.com').status_code == 200
+
+
+def test_account_limit_ignores_case_and_spaces(client):
+    register(client, 'alice')
+    assert login(client, 'alice@example.com', 'wrong').status_code == 401
+    assert login(client, ' ALICE@example.com', 'wrong').status_code == 401
+    response = login(client, 'Alice@Example.com ', 'wrong')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+
+def test_failures_count_against_the_ip(client):
+    for name in ('a', 'b', 'c'):
+        assert login(client, f'{name}@example.com', 'wrong').status_code == 401
+    assert login(client, 'd@example.com').status_code == 429
@@ -0,0 +1,73 @@
+import pytest
+
+from models import db, Task, User
+
+
+def batch(client, headers, operations, mode='atomic'):
+    return client.post('/api/tasks/batch', json={'operations': operations, 'mode': mode}, headers=headers)
+
+
+def test_atomic_batch_applies_everything_once(app, client, make_user):
+    user_id, headers = make_user()
+    task_id = client.post('/api/tasks', json={'title': 'old', 'coins_reward': 7}, headers=headers).get_json()['id']
+    response = batch(client, headers, [
+        {'op': 'create', 'data': {'title': 'new', 'coins_reward': 3}},
+        {'op': 'update', 'id': task_id, 'data': {'priority': 'high', 'due_date': '2026-05-01T09:00:00'}},
+        {'op': 'complete', 'id': task_id},
+    ])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['applied'] == 3 and body['coins_earned'] == 7
+    with app.app_context():
+        assert Task.query.count() == 2
+        assert db.session.get(Task, task_id).priority == 'high'
+        assert db.session.get(User, user_id).coins == 7
+
+
+INVALID = [
+    {'op': 'update', 'id': 1, 'data': {'title': None}},
+    {'op': 'update', 'id': 1, 'data': {'title': '  '}},
+    {'op': 'update', 'id': 1, 'data': 'not an object'},
+    {'op': 'update', 'id': [1], 'data': {'title': 'x'}},
+    {'op': 'complete', 'id': '1'},
+    {'op': 'update', 'id': 1, 'data': {'coins_reward': 'lots'}},
+    {'op': 'update', 'id': 1, 'data': {'coins_reward': True}},
+    {'op': 'update', 'id': 1, 'data': {'priority': 3}},
+    {'op': 'update', 'id': 1, 'data': {'due_date': 'tomorrow'}},
+    {'op': 'create', 'data': {'title': 'x', 'coins_reward': 1.5}},
+    {'op': 'create', 'data': {}},
+    {'op': 'rename', 'id': 1},
+    'not an operation',
+]
+
+
+@pytest.mark.parametrize('bad', INVALID)
+def test_invalid_operation_rolls_back_atomic_batch(app, client, make_user, bad):
+    _, headers = make_user()
+    client.post('/api/tasks', json={'title': 'keep'}, headers=headers)
+    response = batch(client, headers, [{'op': 'create', 'data': {'title': 'new'}}, bad])
+    assert response.status_code == 400
+    results = response.get_json()['results']
+    assert results[0]['status'] == 424 and results[1]['status'] == 400
+    with app.app_context():
+        assert [t.title for t in Task.query.all()] == ['keep']
+
+
+@pytest.mark.parametrize('bad', INVALID)
+def test_best_effort_skips_invalid_operation(app, client, make_user, bad):
+    _, headers = make_user()
+    client.post('/api/tasks', json={'title': 'keep', 'coins_reward': 5}, headers=headers)
+    response = batch(client, headers, [bad, {'op': 'complete', 'id': 1}], mode='best_effort')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['applied'] == 1 and body['coins_earned'] == 5
+    assert 'error' in body['results'][0]
+    with app.app_context():
+        task = db.session.get(Task, 1)
+        assert task.title == 'keep' and task.completed
+
+
+def test_missing_task_is_404_item(client, make_user):
+    _, headers = make_user()
+    body = batch(client, headers, [{'op': 'delete', 'id': 99}], mode='best_effort').get_json()
+    assert body['results'][0]['status'] == 404
@@ -0,0 +1,64 @@
+import pytest
+
+from app import create_app
+from cache import LRUBackend, response_cache
+from models import db, Task
+
+
+def test_reads_are_cached_until_a_write_invalidates(app, client, make_user):
+    user_id, headers = make_user()
+    client.post('/api/tasks', json={'title': 'one'}, headers=headers)
+    assert len(client.get('/api/tasks', headers=headers).get_json()['tasks']) == 1
+
+    # A change that bypasses the routes is not seen: the body is cached
+    with app.app_context():
+        db.session.add(Task(user_id=user_id, title='behind the cache'))
+        db.session.commit()
+    assert len(client.get('/api/tasks', headers=headers).get_json()['tasks']) == 1
+
+    # A write through the API bumps the generation
+    client.post('/api/tasks', json={'title': 'two'}, headers=headers)
+    assert len(client.get('/api/tasks', headers=headers).get_json()['tasks']) == 3
+
+
+def test_query_args_and_users_have_separate_entries(client, make_user):
+    _, alice = make_user('alice')
+    _, bob = make_user('bob')
+    client.post('/api/tasks', json={'title': 'one', 'priority': 'high'}, headers=alice)
+    client.post('/api/tasks', json={'title': 'two'}, headers=alice)
+
+    assert len(client.get('/api/tasks', headers=alice).get_json()['tasks']) == 2
+    assert len(client.get('/api/tasks?priority=high', headers=alice).get_json()['tasks']) == 1
+    assert client.get('/api/tasks', headers=bob).get_json()['tasks'] == []
+
+
+def test_etag_gives_304(client, make_user):
+    _, headers = make_user()
+    first = client.get('/api/tasks', headers=headers)
+    assert first.headers['ETag']
+    again = client.get('/api/tasks', headers=dict(headers, **{'If-None-Match': first.headers['ETag']}))
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+def test_lru_evicts_least_recently_used():
+    backend = LRUBackend(maxsize=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    assert backend.get('a') == 1
+    backend.set('c', 3)
+    assert backend.get('b') is None
+    assert backend.get('a') == 1 and backend.get('c') == 3
+
+
+def test_lru_needs_a_single_server_process(tmp_path, monkeypatch):
+    config = {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'cache.db'}"}
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    monkeypatch.delenv('RESPONSE_CACHE_BACKEND', raising=False)
+    app = create_app(config, migrations=False)
+    assert app.config['RESPONSE_CACHE_BACKEND'] == 'none'
+    assert response_cache.backend is None
+
+    monkeypatch.setenv('RESPONSE_CACHE_BACKEND', 'lru')
+    with pytest.raises(ValueError, match='WEB_CONCURRENCY'):
+        create_app(config, migrations=False)
@@ -0,0 +1,35 @@
+from models import db, CatalogVersion, Reward
+
+
+def test_bump_catalog_creates_the_version_row(app):
+    # create_all databases have no catalog_version row
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['bump-catalog'])
+    assert result.exit_code == 0, result.output
+    assert 'version 1' in result.output
+    assert 'version 2' in runner.invoke(args=['bump-catalog']).output
+    with app.app_context():
+        assert db.session.get(CatalogVersion, 'rewards').version == 2
+
+
+def test_system_reward_changes_reach_the_store(app, client, make_user):
+    _, headers = make_user()
+    first = client.get('/api/rewards', headers=headers)
+    assert first.get_json()['rewards'] == []
+    version = int(first.headers['X-Catalog-Version'])
+
+    with app.app_context():
+        db.session.add(Reward(name='Coffee', coins_cost=30))
+        db.session.commit()
+    second = client.get('/api/rewards', headers=headers)
+    assert int(second.headers['X-Catalog-Version']) == version + 1
+    assert [r['name'] for r in second.get_json()['rewards']] == ['Coffee']
+
+
+def test_custom_rewards_leave_the_version_alone(app, client, make_user):
+    user_id, headers = make_user()
+    version = client.get('/api/rewards', headers=headers).headers['X-Catalog-Version']
+    with app.app_context():
+        db.session.add(Reward(user_id=user_id, name='Mine', coins_cost=5))
+        db.session.commit()
+        assert (db.session.get(CatalogVersion, 'rewards') or CatalogVersion(version=0)).version == int(version)
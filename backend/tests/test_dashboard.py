@@ -0,0 +1,78 @@
+from dashboard import SectionLoader, loader
+
+STANDALONE = {
+    'profile': '/api/user/profile',
+    'tasks': '/api/tasks?limit=20',
+    'habits': '/api/habits',
+    'pomodoro': '/api/pomodoro',
+    'progress': '/api/progress',
+}
+
+
+def seed(client, headers, tasks=3, habits=2):
+    for i in range(tasks):
+        client.post('/api/tasks', json={'title': f'task {i}'}, headers=headers)
+    for i in range(habits):
+        client.post('/api/habits', json={'name': f'habit {i}'}, headers=headers)
+    session_id = client.post('/api/pomodoro', json={'duration': 25}, headers=headers).get_json()['id']
+    client.post(f'/api/pomodoro/{session_id}/complete', headers=headers)
+
+
+def dashboard(client, headers, query=''):
+    return client.get(f'/api/dashboard{query}', headers=headers)
+
+
+def test_sections_match_the_standalone_routes(client, make_user):
+    _, headers = make_user(coins=5)
+    seed(client, headers)
+    assert loader._executor is not None
+
+    body = dashboard(client, headers).get_json()
+    assert list(body) == list(STANDALONE)
+    assert body['habits'].pop('has_more') is False
+    for name, path in STANDALONE.items():
+        assert body[name] == client.get(path, headers=headers).get_json(), name
+
+
+def test_serial_loading_gives_the_same_body(app, client, make_user):
+    _, headers = make_user()
+    seed(client, headers)
+    concurrent = dashboard(client, headers).get_json()
+
+    executor = loader._executor
+    loader._executor = None
+    try:
+        assert dashboard(client, headers).get_json() == concurrent
+    finally:
+        loader._executor = executor
+
+
+def test_zero_workers_means_no_pool():
+    serial = SectionLoader()
+
+    class App:
+        config = {'DASHBOARD_WORKERS': 0}
+
+    serial.init_app(App)
+    assert serial._executor is None
+    assert serial.run({'a': lambda: 1, 'b': lambda: 2}) == {'a': 1, 'b': 2}
+
+
+def test_selected_sections_only(client, make_user):
+    _, headers = make_user()
+    seed(client, headers)
+    body = dashboard(client, headers, '?sections=tasks,profile').get_json()
+    assert list(body) == ['tasks', 'profile']
+    assert dashboard(client, headers, '?sections=tasks,nope').status_code == 400
+
+
+def test_limits_and_cursors(client, make_user):
+    _, headers = make_user()
+    seed(client, headers, tasks=5, habits=3)
+    body = dashboard(client, headers, '?sections=tasks,habits&tasks_limit=2&habits_limit=2').get_json()
+    assert len(body['tasks']['tasks']) == 2
+    assert body['habits']['has_more'] is True
+
+    # The tasks cursor continues on /api/tasks
+    rest = client.get(f"/api/tasks?cursor={body['tasks']['next_cursor']}", headers=headers).get_json()
+    assert [t['title'] for t in rest['tasks']] == ['task 2', 'task 3', 'task 4']
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from benchmarks import datagen
+
+NOW = datetime(2026, 6, 1)
+
+
+def dump(engine):
+    with engine.connect() as conn:
+        return {table: conn.execute(text(f'SELECT * FROM {table} ORDER BY id')).all()
+                for table in ('task', 'habit', 'pomodoro_session', 'reward')}
+
+
+def test_same_seed_same_data(tmp_path):
+    engines = [create_engine(f"sqlite:///{tmp_path / f'{i}.db'}") for i in range(2)]
+    counts = [datagen.generate(engine, 20, now=NOW) for engine in engines]
+    assert counts[0] == counts[1]
+    assert counts[0]['user'] == 20 and counts[0]['task'] > 0
+    assert dump(engines[0]) == dump(engines[1])
+
+
+def test_generated_users_can_log_in(tmp_path):
+    url = f"sqlite:///{tmp_path / 'seed.db'}"
+    datagen.generate(create_engine(url), 5, now=NOW)
+    app = datagen.load_app(url)
+    datagen.rebuild_materialized(app)
+    response = app.test_client().post('/api/login', json={'email': 'user1@example.com',
+                                                          'password': datagen.PASSWORD})
+    assert response.status_code == 200
@@ -0,0 +1,63 @@
+import asyncio
+
+from events import broker
+from models import db, User
+
+
+def collect(channels, action, timeout=0.2):
+    """Subscribe, run ``action`` on a thread, return what arrived."""
+    async def run():
+        sub = broker.subscribe(channels)
+        try:
+            await asyncio.to_thread(action)
+            received = []
+            while True:
+                try:
+                    received.append(await asyncio.wait_for(sub.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    return received, sub
+        finally:
+            broker.unsubscribe(sub)
+    return asyncio.run(run())
+
+
+def test_events_are_published_after_commit(client, make_user):
+    user_id, headers = make_user()
+    task_id = client.post('/api/tasks', json={'title': 't', 'coins_reward': 4}, headers=headers).get_json()['id']
+
+    received, _ = collect([f'user:{user_id}', 'scores'],
+                          lambda: client.post(f'/api/tasks/{task_id}/complete', headers=headers))
+    assert (f'user:{user_id}', {'type': 'coins', 'coins': 4}) in received
+    assert ('scores', {'user_ids': [user_id]}) in received
+
+
+def test_rolled_back_events_are_dropped(app, make_user):
+    user_id, _ = make_user()
+
+    def rolled_back():
+        with app.app_context():
+            broker.publish_after_commit(db.session(), f'user:{user_id}', {'type': 'coins', 'coins': 1})
+            db.session.rollback()
+            db.session.get(User, user_id)
+            db.session.commit()
+
+    received, _ = collect([f'user:{user_id}'], rolled_back)
+    assert received == []
+
+
+def test_slow_subscriber_overflows(monkeypatch):
+    monkeypatch.setattr(broker, 'queue_size', 2)
+    monkeypatch.setattr(broker, 'max_dropped', 3)
+
+    async def run():
+        sub = broker.subscribe(['user:1'])
+        for i in range(10):
+            broker.deliver('user:1', {'n': i})
+        await asyncio.sleep(0)
+        broker.unsubscribe(sub)
+        return sub
+
+    sub = asyncio.run(run())
+    assert sub.overflowed
+    assert [sub.queue.get_nowait()[1]['n'] for _ in range(2)] == [8, 9]
+    assert not broker.has_subscribers('user:1')
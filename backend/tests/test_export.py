@@ -0,0 +1,53 @@
+import csv
+import gzip
+import io
+import json
+
+import export
+
+
+def seed(client, headers):
+    for i in range(3):
+        client.post('/api/tasks', json={'title': f'task {i}'}, headers=headers)
+    client.post('/api/habits', json={'name': 'read'}, headers=headers)
+    client.post('/api/pomodoro', json={'duration': 25}, headers=headers)
+
+
+def test_ndjson_has_every_row_tagged(client, make_user):
+    user_id, headers = make_user()
+    seed(client, headers)
+    response = client.get('/api/export', headers=headers)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data().splitlines()]
+    assert [line['type'] for line in lines] == ['tasks'] * 3 + ['habits', 'pomodoro']
+    assert [line['title'] for line in lines[:3]] == ['task 0', 'task 1', 'task 2']
+    assert all(line['user_id'] == user_id for line in lines)
+
+
+def test_csv_and_gzip(client, make_user):
+    _, headers = make_user()
+    seed(client, headers)
+    response = client.get('/api/export?entities=tasks&format=csv',
+                          headers=dict(headers, **{'Accept-Encoding': 'gzip'}))
+    assert response.headers['Content-Encoding'] == 'gzip'
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.get_data()).decode('utf-8'))))
+    assert rows[0][0] == 'user_id' and len(rows) == 4
+
+
+def test_invalid_arguments(client, make_user):
+    _, headers = make_user()
+    assert client.get('/api/export?entities=nope', headers=headers).status_code == 400
+    assert client.get('/api/export?entities=tasks,habits&format=csv', headers=headers).status_code == 400
+
+
+def test_export_all_writes_one_file_per_entity_and_chunk(app, client, make_user, tmp_path):
+    from models import db
+
+    for name in ('ann', 'bob', 'cat'):
+        _, headers = make_user(name)
+        seed(client, headers)
+    with app.app_context():
+        paths = export.export_all(db.engine, str(tmp_path), ('tasks',), 'ndjson', chunk_size=2, workers=2)
+    assert len(paths) == 2
+    lines = [json.loads(line) for path in sorted(paths) for line in gzip.open(path).read().splitlines()]
+    assert [line['user_id'] for line in lines] == [1, 1, 1, 2, 2, 2, 3, 3, 3]
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import analytics
+from routes import habits as habit_routes
+
+
+def freeze(monkeypatch, now):
+    class Frozen(datetime):
+        @classmethod
+        def utcnow(cls):
+            return now
+
+    monkeypatch.setattr(habit_routes, 'datetime', Frozen)
+    monkeypatch.setattr(analytics, 'datetime', Frozen)
+
+
+def test_stats_are_not_served_from_yesterday(client, make_user, monkeypatch):
+    _, headers = make_user()
+    day = datetime(2026, 3, 10, 12)
+    freeze(monkeypatch, day)
+    habit_id = client.post('/api/habits', json={'name': 'read'}, headers=headers).get_json()['id']
+    client.post(f'/api/habits/{habit_id}/complete', headers=headers)
+
+    today = client.get('/api/habits/stats?days=7', headers=headers).get_json()
+    assert today['start'] == '2026-03-04'
+
+    # No write since, but the date moved on: the window and streaks must follow
+    freeze(monkeypatch, day + timedelta(days=1))
+    tomorrow = client.get('/api/habits/stats?days=7', headers=headers).get_json()
+    assert tomorrow['start'] == '2026-03-05'
+    assert tomorrow != today
+
+
+def test_checkins_build_streaks(client, make_user, monkeypatch):
+    _, headers = make_user()
+    day = datetime(2026, 3, 10, 12)
+    habit_id = None
+    for offset in range(3):
+        freeze(monkeypatch, day + timedelta(days=offset))
+        if habit_id is None:
+            habit_id = client.post('/api/habits', json={'name': 'read'}, headers=headers).get_json()['id']
+        body = client.post(f'/api/habits/{habit_id}/complete', headers=headers).get_json()
+        assert body['streak'] == offset + 1
+    assert client.post(f'/api/habits/{habit_id}/complete', headers=headers).status_code == 400
+
+    stats = client.get('/api/habits/stats?days=7&per_habit=true', headers=headers).get_json()
+    assert stats['habits'][0]['current_streak'] == 3
@@ -0,0 +1,45 @@
+from flask_jwt_extended import create_access_token
+
+import identity
+from models import db, User
+
+
+def create_reward(client, headers):
+    return client.post('/api/rewards', json={'name': 'movie', 'coins_cost': 10}, headers=headers)
+
+
+def test_premium_comes_from_the_token(app, client, make_user):
+    user_id, headers = make_user()
+    assert create_reward(client, headers).status_code == 403
+    with app.app_context():
+        token = create_access_token(identity=user_id, additional_claims={'premium': True})
+    assert create_reward(client, {'Authorization': 'Bearer ' + token}).status_code == 201
+
+
+def test_upgrade_applies_to_tokens_issued_before_it(client, make_user):
+    _, headers = make_user()
+    response = client.post('/api/premium/upgrade', headers=headers)
+    assert response.status_code == 200 and response.get_json()['token']
+    # The old token still says premium: false; the refreshed claims win
+    assert create_reward(client, headers).status_code == 201
+
+
+def test_tokens_without_claims_fall_back_to_the_row(app, client, make_user):
+    user_id, _ = make_user()
+    with app.app_context():
+        db.session.get(User, user_id).is_premium = True
+        db.session.commit()
+        token = create_access_token(identity=user_id)
+    assert create_reward(client, {'Authorization': 'Bearer ' + token}).status_code == 201
+
+
+def test_user_row_is_loaded_once(app, make_user, monkeypatch):
+    user_id, _ = make_user()
+    loads = []
+    with app.app_context():
+        real_get = db.session.get
+        monkeypatch.setattr(db.session, 'get', lambda *a, **kw: loads.append(a) or real_get(*a, **kw))
+        current = identity.Identity(user_id, {'premium': False})
+        assert current.is_premium is False and loads == []
+        assert current.user.id == current.user.id == user_id
+        assert len(loads) == 1
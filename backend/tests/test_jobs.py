@@ -0,0 +1,65 @@
+import pytest
+
+from jobs import Worker, queue
+from models import db, Job, User
+
+
+@pytest.fixture
+def queued(app, monkeypatch):
+    monkeypatch.setattr(queue, 'mode', 'queue')
+    monkeypatch.setattr(queue, 'handlers', dict(queue.handlers))
+    return Worker(app, queue, threads=1, name='test')
+
+
+def test_side_effects_wait_for_the_worker(app, client, make_user, queued):
+    user_id, headers = make_user()
+    task_id = client.post('/api/tasks', json={'title': 't', 'coins_reward': 10}, headers=headers).get_json()['id']
+    client.post(f'/api/tasks/{task_id}/complete', headers=headers)
+    with app.app_context():
+        assert db.session.get(User, user_id).coins == 0
+        assert Job.query.count() > 0
+        assert queued.run_pending() > 0
+        assert db.session.get(User, user_id).coins == 10
+        assert Job.query.count() == 0
+
+
+def test_failing_job_is_isolated_and_retried(app, queued, monkeypatch):
+    seen = []
+
+    def handler(payloads):
+        if any(p['bad'] for p in payloads):
+            raise RuntimeError('boom')
+        seen.extend(p['n'] for p in payloads)
+
+    queue.handlers['test'] = handler
+    monkeypatch.setattr('jobs.backoff', lambda attempts: 60)
+    with app.app_context():
+        for n, bad in ((1, False), (2, True), (3, False)):
+            queue.enqueue('test', n=n, bad=bad)
+        db.session.commit()
+
+        queued.run_pending()
+        assert sorted(seen) == [1, 3]
+        job = Job.query.one()
+        assert job.payload['n'] == 2 and job.status == 'queued' and job.attempts == 1
+
+        # Not due again until its backoff has passed
+        assert queued.run_pending() == 0
+        job.run_at = job.created_at
+        db.session.commit()
+        queued.max_attempts = 2
+        queued.run_pending()
+        job = Job.query.one()
+        assert job.status == 'failed' and 'boom' in job.last_error
+
+
+def test_local_mode_runs_inline(app):
+    calls = []
+    queue.handlers['inline'] = calls.extend
+    try:
+        with app.app_context():
+            queue.enqueue('inline', n=1)
+            assert calls == [{'n': 1}]
+            assert Job.query.count() == 0
+    finally:
+        del queue.handlers['inline']
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import leaderboard
+from models import db, LeaderboardEntry, Task
+
+
+def entries(app):
+    with app.app_context():
+        return {(e.user_id, e.period): (e.tasks_completed, e.total_streak)
+                for e in LeaderboardEntry.query.all()}
+
+
+def test_rebuild_matches_live_counters(app, client, make_user):
+    user_id, headers = make_user()
+    for title in ('a', 'b', 'c'):
+        client.post('/api/tasks', json={'title': title}, headers=headers)
+    client.post('/api/tasks/1/complete', headers=headers)
+    client.post('/api/tasks/2/complete', headers=headers)
+    for name in ('read', 'run'):
+        habit_id = client.post('/api/habits', json={'name': name}, headers=headers).get_json()['id']
+        assert client.post(f'/api/habits/{habit_id}/complete', headers=headers).status_code == 200
+
+    live = entries(app)
+    assert live[user_id, 'all-time'] == (2, 2)
+    with app.app_context():
+        leaderboard.rebuild()
+    assert entries(app) == live
+
+
+def test_checkins_since_masks_days_before_start(app, client, make_user):
+    import analytics
+
+    user_id, headers = make_user()
+    habit_id = client.post('/api/habits', json={'name': 'read'}, headers=headers).get_json()['id']
+    with app.app_context():
+        day = datetime(2026, 3, 10).date()
+        for offset in (-2, -1, 0, 1):
+            analytics.record_checkin(user_id, habit_id, day + timedelta(days=offset))
+        db.session.commit()
+        assert leaderboard.checkins_since(day) == {user_id: 2}
+        assert leaderboard.checkins_since(leaderboard.ALL_TIME_BUCKET) == {user_id: 4}
+
+
+def test_rank_counts_entries_ahead(app, client, make_user):
+    users = [make_user(name) for name in ('ann', 'bob', 'cat')]
+    for done, (_, headers) in zip((1, 3, 2), users):
+        for i in range(done):
+            task_id = client.post('/api/tasks', json={'title': str(i)}, headers=headers).get_json()['id']
+            client.post(f'/api/tasks/{task_id}/complete', headers=headers)
+
+    body = client.get('/api/leaderboard?timeframe=all-time', headers=users[0][1]).get_json()
+    assert [e['username'] for e in body['leaderboard']] == ['bob', 'cat', 'ann']
+    assert body['me']['rank'] == 3
+
+
+def test_tasks_count_in_the_bucket_of_their_completion(app, client, make_user):
+    user_id, headers = make_user()
+    task_id = client.post('/api/tasks', json={'title': 'old'}, headers=headers).get_json()['id']
+    with app.app_context():
+        db.session.get(Task, task_id).created_at = datetime.utcnow() - timedelta(days=40)
+        db.session.commit()
+    client.post(f'/api/tasks/{task_id}/complete', headers=headers)
+
+    live = entries(app)
+    assert live[user_id, 'weekly'] == (1, 0)
+    assert live[user_id, 'monthly'] == (1, 0)
+    with app.app_context():
+        leaderboard.rebuild()
+    assert entries(app) == live
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import ledger
+from models import db, CoinTransaction, CoinSnapshot
+
+
+def complete_task(client, headers, coins):
+    task_id = client.post('/api/tasks', json={'title': 't', 'coins_reward': coins}, headers=headers).get_json()['id']
+    client.post(f'/api/tasks/{task_id}/complete', headers=headers)
+
+
+def test_compact_keeps_pre_ledger_coins(app, client, make_user):
+    # 40 coins from before the ledger, no snapshot yet
+    user_id, headers = make_user(coins=40)
+    complete_task(client, headers, 10)
+    complete_task(client, headers, 5)
+    with app.app_context():
+        assert ledger.balance(user_id) == 55
+        CoinTransaction.query.update({'created_at': datetime.utcnow() - timedelta(days=200)})
+        db.session.commit()
+
+        opened, removed = ledger.compact(timedelta(days=90))
+        assert (opened, removed) == (1, 2)
+        assert CoinTransaction.query.count() == 0
+        assert db.session.get(CoinSnapshot, user_id).balance == 55
+        assert ledger.reconcile(user_id) == ledger.balance(user_id) == 55
+
+
+def test_reconcile_after_compact_and_newer_rows(app, client, make_user):
+    user_id, headers = make_user()
+    complete_task(client, headers, 10)
+    with app.app_context():
+        CoinTransaction.query.update({'created_at': datetime.utcnow() - timedelta(days=200)})
+        db.session.commit()
+        ledger.compact(timedelta(days=90))
+    complete_task(client, headers, 7)
+    with app.app_context():
+        assert CoinTransaction.query.count() == 1
+        assert ledger.reconcile(user_id) == ledger.balance(user_id) == 17
+
+
+def test_debit_never_overdraws(app, make_user):
+    user_id, _ = make_user(coins=30)
+    with app.app_context():
+        assert ledger.debit(user_id, 20, 'reward') == 10
+        assert ledger.debit(user_id, 20, 'reward') is None
+        db.session.commit()
+        assert ledger.balance(user_id) == 10
+        assert [t.amount for t in CoinTransaction.query.all()] == [-20]
+
+
+def test_credit_batch_sums_per_user(app, make_user):
+    alice, _ = make_user('alice')
+    bob, _ = make_user('bob')
+    with app.app_context():
+        balances = ledger.credit_batch([(alice, 5, 'task', 1), (bob, 3, 'task', 2), (alice, 2, 'habit', 3)])
+        db.session.commit()
+        assert balances == {alice: 7, bob: 3}
+        assert CoinTransaction.query.count() == 3
@@ -0,0 +1,45 @@
+import logging
+
+from app import create_app
+
+
+def query_count(response):
+    db_timing = [t for t in response.headers.getlist('Server-Timing') if t.startswith('db;')][0]
+    return int(db_timing.split('desc="')[1].split()[0])
+
+
+def test_statements_counted_once_per_app_built(app, client, make_user):
+    _, headers = make_user()
+    first = query_count(client.get('/api/habits', headers=headers))
+    # Another app in the same process must not double the engine hooks
+    create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'}, migrations=False)
+    client.post('/api/habits', json={'name': 'read'}, headers=headers)
+    assert query_count(client.get('/api/habits', headers=headers)) == first
+
+
+def test_export_has_route_series(client, make_user):
+    _, headers = make_user()
+    client.get('/api/tasks', headers=headers)
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{route="/api/tasks",method="GET",status="200"}' in body
+    assert 'db_queries_per_request_bucket{route="/api/tasks",le="+Inf"}' in body
+
+
+def test_repeated_statement_is_flagged(app, caplog):
+    from sqlalchemy import text
+
+    from metrics import metrics
+    from models import db
+
+    def n_plus_one():
+        for _ in range(3):
+            db.session.execute(text('SELECT 1')).all()
+        return 'ok'
+
+    app.add_url_rule('/n-plus-one', 'n_plus_one', n_plus_one)
+    metrics.n_plus_one_threshold = 3
+    before = metrics.n_plus_one['/n-plus-one']
+    with caplog.at_level(logging.WARNING, logger='metrics'):
+        app.test_client().get('/n-plus-one')
+    assert metrics.n_plus_one['/n-plus-one'] == before + 1
+    assert any('Possible N+1' in r.getMessage() for r in caplog.records)
@@ -0,0 +1,67 @@
+from datetime import datetime, time
+
+from models import db, Habit
+from reminders import ReminderScheduler
+
+DAY = datetime(2026, 3, 2)
+
+
+class ListSink:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, reminders):
+        self.sent.extend(reminders)
+
+
+def row(habit_id, reminder_time, last_completed=None):
+    return (habit_id, 1, f'habit {habit_id}', reminder_time, last_completed, DAY)
+
+
+def scheduler(*rows):
+    sink = ListSink()
+    wheel = ReminderScheduler(sink, batch_size=2, clock=lambda: DAY)
+    wheel.apply(rows)
+    return wheel, sink
+
+
+def test_tick_dispatches_the_minutes_that_passed():
+    wheel, sink = scheduler(row(1, time(7, 0)), row(2, time(7, 1)), row(3, time(7, 5)), row(4, time(8, 0)))
+    wheel.tick(DAY.replace(hour=6, minute=59))
+    assert wheel.tick(DAY.replace(hour=7, minute=2)) == 2
+    assert [r.habit_id for r in sink.sent] == [1, 2]
+    assert wheel.tick(DAY.replace(hour=7, minute=2)) == 0
+    assert wheel.tick(DAY.replace(hour=7, minute=30)) == 1
+
+
+def test_completed_today_is_skipped_and_moves_reschedule():
+    wheel, sink = scheduler(row(1, time(7, 0), DAY.replace(hour=6)), row(2, time(7, 0)))
+    wheel.apply([row(2, time(9, 0))])
+    wheel.tick(DAY.replace(hour=6, minute=59))
+    assert wheel.tick(DAY.replace(hour=7, minute=0)) == 0
+    assert wheel.tick(DAY.replace(hour=9, minute=0)) == 1
+    assert sink.sent[0].habit_id == 2
+
+    wheel.apply([row(2, None)])
+    assert len(wheel) == 1
+
+
+def test_catch_up_is_bounded():
+    wheel, sink = scheduler(row(1, time(7, 0)), row(2, time(11, 0)))
+    wheel.tick(DAY.replace(hour=6))
+    # Stopped for five hours: only the last hour is replayed
+    assert wheel.tick(DAY.replace(hour=11, minute=30)) == 1
+    assert [r.habit_id for r in sink.sent] == [2]
+
+
+def test_load_and_sync_follow_the_table(app, client, make_user):
+    _, headers = make_user()
+    client.post('/api/habits', json={'name': 'read', 'reminder_time': '07:00'}, headers=headers)
+    wheel = ReminderScheduler(ListSink())
+    with app.app_context():
+        assert wheel.load(db.session) == 1
+        client.post('/api/habits', json={'name': 'run', 'reminder_time': '08:30'}, headers=headers)
+        client.post('/api/habits', json={'name': 'none'}, headers=headers)
+        wheel.sync(db.session)
+        assert len(wheel) == 2
+        assert wheel.slots[db.session.query(Habit.id).filter_by(name='run').scalar()] == 8 * 60 + 30
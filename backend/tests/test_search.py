@@ -0,0 +1,86 @@
+from sqlalchemy import text
+
+from models import db
+
+
+def add_task(client, headers, title, **data):
+    return client.post('/api/tasks', json=dict(data, title=title), headers=headers).get_json()['id']
+
+
+def search(client, headers, query):
+    return client.get(f'/api/tasks/search?{query}', headers=headers)
+
+
+def test_prefix_match_ranks_title_hits_first(client, make_user):
+    _, headers = make_user()
+    in_description = add_task(client, headers, 'Weekly chores', description='groceries and laundry')
+    in_title = add_task(client, headers, 'Buy groceries')
+    add_task(client, headers, 'Call mom')
+
+    body = search(client, headers, 'q=groc').get_json()
+    assert [task['id'] for task in body['tasks']] == [in_title, in_description]
+    assert body['next_page'] is None
+
+
+def test_every_word_must_match(client, make_user):
+    _, headers = make_user()
+    both = add_task(client, headers, 'Write quarterly report')
+    add_task(client, headers, 'Write letter')
+
+    assert [t['id'] for t in search(client, headers, 'q=wri%20rep').get_json()['tasks']] == [both]
+
+
+def test_filters_combine_with_the_query(client, make_user):
+    _, headers = make_user()
+    work = add_task(client, headers, 'Plan sprint', category='work', priority='high')
+    add_task(client, headers, 'Plan holiday', category='home', priority='high')
+
+    body = search(client, headers, 'q=plan&category=work').get_json()
+    assert [task['id'] for task in body['tasks']] == [work]
+    assert search(client, headers, 'q=plan&priority=low').get_json()['tasks'] == []
+
+
+def test_updates_and_deletes_keep_the_index_in_sync(client, make_user):
+    _, headers = make_user()
+    task_id = add_task(client, headers, 'Dentist')
+
+    client.put(f'/api/tasks/{task_id}', json={'title': 'Doctor'}, headers=headers)
+    assert search(client, headers, 'q=dentist').get_json()['tasks'] == []
+    assert [t['id'] for t in search(client, headers, 'q=doc').get_json()['tasks']] == [task_id]
+
+    client.delete(f'/api/tasks/{task_id}', headers=headers)
+    assert search(client, headers, 'q=doc').get_json()['tasks'] == []
+
+
+def test_results_are_private(client, make_user):
+    _, alice = make_user('alice')
+    _, bob = make_user('bob')
+    add_task(client, alice, 'Secret plan')
+
+    assert search(client, bob, 'q=secret').get_json()['tasks'] == []
+
+
+def test_pages_and_bad_requests(client, make_user):
+    _, headers = make_user()
+    for i in range(3):
+        add_task(client, headers, f'Read chapter {i}')
+
+    first = search(client, headers, 'q=read&limit=2').get_json()
+    second = search(client, headers, 'q=read&limit=2&page=2').get_json()
+    assert first['next_page'] == 2 and second['next_page'] is None
+    assert len(first['tasks']) + len(second['tasks']) == 3
+    assert search(client, headers, 'q=%20%2A').status_code == 400
+    assert search(client, headers, 'q=read&fields=nope').status_code == 400
+
+
+def test_rebuild_search_refills_the_index(app, client, make_user):
+    _, headers = make_user()
+    task_id = add_task(client, headers, 'Renew passport')
+    with app.app_context():
+        db.session.execute(text("INSERT INTO task_fts(task_fts) VALUES ('delete-all')"))
+        db.session.commit()
+        assert db.session.execute(text("SELECT count(*) FROM task_fts WHERE task_fts MATCH 'passport'")).scalar() == 0
+
+    result = app.test_cli_runner().invoke(args=['rebuild-search'])
+    assert 'rebuilt' in result.output
+    assert [t['id'] for t in search(client, headers, 'q=passport').get_json()['tasks']] == [task_id]
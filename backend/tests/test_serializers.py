@@ -0,0 +1,37 @@
+import json
+from datetime import datetime, time
+from types import SimpleNamespace
+
+import serializers
+
+
+def test_rows_follow_the_requested_fields():
+    rows = [(1, 'write', datetime(2026, 1, 2, 3, 4, 5))]
+    items = serializers.TASK.rows(rows, ('id', 'title', 'created_at'))
+    # Datetimes are either converted here or left to the orjson encoder
+    assert json.loads(serializers.dumps(items)) == [{'id': 1, 'title': 'write', 'created_at': '2026-01-02T03:04:05'}]
+
+
+def test_converters_apply_per_field():
+    habit = SimpleNamespace(id=1, name='read', description=None, streak=2, target_days=7,
+                            reminder_time=time(7, 30), last_completed=None)
+    item = serializers.HABIT.dump(habit)
+    assert item['reminder_time'] == '07:30'
+    assert item['last_completed'] is None
+
+
+def test_compiled_functions_are_reused():
+    assert serializers.TASK.compile(('id', 'title')) is serializers.TASK.compile(('id', 'title'))
+
+
+def test_dumps_writes_datetimes_as_iso():
+    assert json.loads(serializers.dumps({'at': datetime(2026, 1, 2, 3, 4, 5), 'n': 1})) == \
+        {'at': '2026-01-02T03:04:05', 'n': 1}
+
+
+def test_api_responses_use_the_same_shapes(client, make_user):
+    _, headers = make_user()
+    created = client.post('/api/tasks', json={'title': 'a', 'due_date': '2026-05-01T09:00:00'},
+                          headers=headers).get_json()
+    task = client.get('/api/tasks?fields=id,title,due_date', headers=headers).get_json()['tasks'][0]
+    assert task == {'id': created['id'], 'title': 'a', 'due_date': '2026-05-01T09:00:00'}
@@ -0,0 +1,22 @@
+import pytest
+
+import serve
+
+
+def test_sync_mode_defaults_to_one_worker_per_cpu(monkeypatch):
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    monkeypatch.setattr(serve.os, 'cpu_count', lambda: 6)
+    assert serve.worker_count('sync') == '6'
+
+
+def test_async_mode_needs_shared_events_for_several_workers(monkeypatch):
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    monkeypatch.delenv('EVENTS_BACKEND', raising=False)
+    assert serve.worker_count('async') == '1'
+
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    with pytest.raises(SystemExit, match='EVENTS_BACKEND=redis'):
+        serve.worker_count('async')
+
+    monkeypatch.setenv('EVENTS_BACKEND', 'redis')
+    assert serve.worker_count('async') == '4'
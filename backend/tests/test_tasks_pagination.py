@@ -0,0 +1,71 @@
+def create_tasks(client, headers, count, **data):
+    return [client.post('/api/tasks', json=dict(data, title=f'task {i}'), headers=headers).get_json()['id']
+            for i in range(count)]
+
+
+def test_cursor_pages_cover_every_task_once(client, make_user):
+    _, headers = make_user()
+    ids = create_tasks(client, headers, 12)
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/tasks?limit=5' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url, headers=headers).get_json()
+        seen += [task['id'] for task in body['tasks']]
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+    assert seen == ids
+
+
+def test_invalid_cursor_is_rejected(client, make_user):
+    _, headers = make_user()
+    assert client.get('/api/tasks?cursor=not-a-cursor', headers=headers).status_code == 400
+
+
+def test_filters_and_field_projection(client, make_user):
+    _, headers = make_user()
+    create_tasks(client, headers, 2, priority='high', category='work')
+    create_tasks(client, headers, 3, priority='low')
+
+    body = client.get('/api/tasks?priority=high&fields=id,title', headers=headers).get_json()
+    assert len(body['tasks']) == 2
+    assert all(set(task) == {'id', 'title'} for task in body['tasks'])
+    assert client.get('/api/tasks?fields=id,nope', headers=headers).status_code == 400
+
+
+def test_tasks_are_private(client, make_user):
+    _, alice = make_user('alice')
+    _, bob = make_user('bob')
+    create_tasks(client, alice, 3)
+    assert client.get('/api/tasks', headers=bob).get_json()['tasks'] == []
+
+
+def test_cursor_breaks_created_at_ties_by_id(app, client, make_user):
+    from datetime import datetime
+
+    from models import db, Task
+
+    user_id, headers = make_user()
+    with app.app_context():
+        stamp = datetime(2026, 1, 1)
+        db.session.add_all(Task(user_id=user_id, title=str(i), created_at=stamp) for i in range(4))
+        db.session.commit()
+
+    first = client.get('/api/tasks?limit=2', headers=headers).get_json()
+    second = client.get(f"/api/tasks?limit=2&cursor={first['next_cursor']}", headers=headers).get_json()
+    assert [t['title'] for t in first['tasks'] + second['tasks']] == ['0', '1', '2', '3']
+    assert second['next_cursor'] is None
+
+
+def test_default_page_is_bounded_and_continues_to_the_newest(client, make_user):
+    from routes.tasks import DEFAULT_TASK_PAGE_SIZE
+
+    _, headers = make_user()
+    ids = create_tasks(client, headers, DEFAULT_TASK_PAGE_SIZE + 5)
+
+    first = client.get('/api/tasks', headers=headers).get_json()
+    assert len(first['tasks']) == DEFAULT_TASK_PAGE_SIZE
+    rest = client.get(f"/api/tasks?cursor={first['next_cursor']}", headers=headers).get_json()
+    assert [task['id'] for task in rest['tasks']] == ids[-5:]
+    assert rest['next_cursor'] is None
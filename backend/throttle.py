@@ -0,0 +1,54 @@
+"""In-process fixed-window attempt counters.
+
+Used by the login route to turn away bursts per client IP and repeated
+failures per account before any bcrypt work is done. State is per process;
+with several workers each one enforces the limits on its own share of the
+traffic.
+"""
+import threading
+import time
+
+
+class AttemptThrottle:
+    def __init__(self, limit, window, max_keys=100000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def _current(self, key, now):
+        start, count = self._counts.get(key, (now, 0))
+        if now - start >= self.window:
+            return now, 0
+        return start, count
+
+    def retry_after(self, key, now=None):
+        """Seconds until ``key`` may try again, or 0 if it is not blocked."""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            start, count = self._current(key, now)
+        if count < self.limit:
+            return 0
+        return max(1, int(start + self.window - now + 0.999))
+
+    def hit(self, key, now=None):
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            start, count = self._current(key, now)
+            self._counts[key] = (start, count + 1)
+            if len(self._counts) > self.max_keys:
+                self._prune(now)
+
+    def reset(self, key):
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def _prune(self, now):
+        expired = [k for k, (start, _) in self._counts.items() if now - start >= self.window]
+        for key in expired:
+            del self._counts[key]
+        # Still full of live keys: drop the oldest windows
+        if len(self._counts) > self.max_keys:
+            for key, _ in sorted(self._counts.items(), key=lambda item: item[1][0])[:len(self._counts) - self.max_keys]:
+                del self._counts[key]
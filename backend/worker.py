@@ -0,0 +1,46 @@
+"""Background job worker entry point.
+
+Runs the jobs enqueued by the API when it is started with
+``JOBS_MODE=queue`` (see jobs.py). JOB_PROCESSES worker processes each run
+JOB_THREADS threads; every thread claims its own batches.
+
+    JOBS_MODE=queue python worker.py
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def run_process(threads):
+    import effects  # registers the job handlers
+    from app import create_app
+    from jobs import queue, Worker
+
+    Worker(create_app(blueprints=(), migrations=False), queue, threads=threads).run()
+
+
+def main():
+    processes = int(os.getenv('JOB_PROCESSES', '1'))
+    threads = int(os.getenv('JOB_THREADS', '4'))
+
+    if processes == 1:
+        run_process(threads)
+        return
+
+    children = [multiprocessing.Process(target=run_process, args=(threads,), name=f'job-worker-{i}')
+                for i in range(processes)]
+    for child in children:
+        child.start()
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        for child in children:
+            child.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,9 @@ import { AdapterDateFns } from '@mui/x-date-pickers/AdapterDateFns';
 import { LocalizationProvider, DateTimePicker } from '@mui/x-date-pickers';
 import axios from 'axios';
 
+// The largest page /api/tasks serves
+const TASK_PAGE_SIZE = 500;
+
 const TodoList = () => {
   const [tasks, setTasks] = useState([]);
   const [openDialog, setOpenDialog] = useState(false);
@@ -54,8 +57,16 @@ const TodoList = () => {
 
   const fetchTasks = async () => {
     try {
-      const response = await axios.get('/api/tasks');
-      setTasks(response.data.tasks);
+      // /api/tasks is paged oldest first; follow next_cursor to the newest task
+      const loaded = [];
+      let cursor;
+      do {
+        // axios leaves out the cursor param while it is undefined
+        const response = await axios.get('/api/tasks', { params: { limit: TASK_PAGE_SIZE, cursor } });
+        loaded.push(...response.data.tasks);
+        cursor = response.data.next_cursor;
+      } while (cursor);
+      setTasks(loaded);
     } catch (error) {
       console.error('Failed to fetch tasks:', error);
       showAlert('Failed to load tasks', 'error');